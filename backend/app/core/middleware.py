@@ -0,0 +1,53 @@
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class MultipartBodySizeLimitMiddleware:
+    """
+    Rejects oversized 'multipart/form-data' bodies BEFORE they get spooled to memory/disk by the form parser.
+
+    > If the client declares a 'Content-Length' that is too large, we answer 413 without reading the body at all
+    > Otherwise (e.g. chunked uploads), the body is counted as it streams in, and aborted once over the limit
+
+    This is a coarse, app-wide ceiling. The finer, per-image limits are checked by 'validate_image_upload'.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            response = JSONResponse(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                content={"detail": "Request body is too large"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received_bytes = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                received_bytes += len(message.get("body", b""))
+                if received_bytes > self.max_body_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail="Request body is too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,6 +28,13 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str
     S3_BUCKET_REGION: str
 
+    # Where uploaded files are stored. "s3" (AWS/LocalStack), or for running fully offline:
+    # "local" (files on disk, under LOCAL_STORAGE_DIR) / "memory" (tests, benchmarks)
+    # The non-S3 backends are served by the app itself, from LOCAL_STORAGE_BASE_URL
+    STORAGE_BACKEND: Literal["s3", "local", "memory"] = "s3"
+    LOCAL_STORAGE_DIR: str = "./local_storage"
+    LOCAL_STORAGE_BASE_URL: str = "http://localhost:8000/storage"
+
     JWT_EXP_SECONDS: int
 
     STREAM_API_KEY: str | None = None
@@ -37,6 +46,15 @@ class Settings(BaseSettings):
 
     PRESIGNED_URL_EXP_SECONDS: int
 
+    # The fraction of risk predictions whose inputs & results are logged (the rest only feed "/risk/stats")
+    RISK_LOG_SAMPLE_RATE: float = 0.01
+
+    # How stale (at most) a worker's in-memory reference data can be, after another worker changed it
+    REFERENCE_DATA_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    # The (IANA) timezone of the mothers who haven't set their own, which decides what "today" is for them
+    DEFAULT_TIMEZONE: str = "Asia/Singapore"
+
     DOCS_USERNAME: str | None = None
     DOCS_PASSWORD: str | None = None
 
@@ -46,6 +46,11 @@ async def get_db():
             await db.close()
 
 
+# For endpoints that run independent queries concurrently, each on its own session (i.e. its own pooled connection)
+def get_db_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return AsyncSessionLocal
+
+
 # Dedicated async session dependency for FastAPI endpoints
 async def get_async_db():
     async with AsyncSessionLocal() as db:
@@ -5,7 +5,7 @@ from datetime import date, datetime
 from enum import Enum
 
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTableUUID
-from sqlalchemy import JSON, CheckConstraint, Date, DateTime, ForeignKey, Integer, String, Text, func, text
+from sqlalchemy import JSON, CheckConstraint, Date, DateTime, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PgUUID
@@ -138,6 +138,7 @@ class PregnantWoman(User):
     pregnancy_stage: Mapped[str | None] = mapped_column(String(20), nullable=True)
     pregnancy_week: Mapped[int | None] = mapped_column(Integer, nullable=True)
     expected_due_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    timezone: Mapped[str | None] = mapped_column(String(64), nullable=True)  # IANA name, e.g. "Asia/Singapore"
     baby_date_of_birth: Mapped[date | None] = mapped_column(Date, nullable=True)
 
     blood_type: Mapped[str | None] = mapped_column(String(5), nullable=True)
@@ -316,6 +317,10 @@ class BinaryMetric(Base):
 
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
+    # A mother has (at most) one entry per day, and her entries are listed newest first
+    __table_args__ = (
+        Index("uq_journal_entries_author_id_logged_on", "author_id", text("logged_on DESC"), unique=True),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
 
     author_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("pregnant_women.id"))
@@ -329,6 +334,9 @@ class JournalEntry(Base):
     systolic: Mapped[int] = mapped_column(server_default=text("0"))
     diastolic: Mapped[int] = mapped_column(server_default=text("0"))
 
+    # Bumped by every write, so that offline edits made on an older revision are detected (see "/journals/sync")
+    revision: Mapped[int] = mapped_column(server_default=text("1"))
+
     # NOTE: The actual chosen options are inside each "Metric Log"
     journal_binary_metric_logs: Mapped[list["JournalBinaryMetricLog"]] = relationship(
         back_populates="journal_entry", cascade="all, delete-orphan"
@@ -553,16 +561,20 @@ class KickTrackerSession(Base):
     __tablename__ = "kick_tracker_sessions"
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    mother_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("pregnant_women.id"))
+    mother_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("pregnant_women.id"), index=True)
     mother: Mapped["PregnantWoman"] = relationship(back_populates="kick_tracker_sessions")
 
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Incremented with every kick recorded into the session (see "kick_tracker_rollups.py")
+    kick_count: Mapped[int] = mapped_column(server_default=text("0"))
     kicks: Mapped[list["KickTrackerDataPoint"]] = relationship(back_populates="session")
 
 
 class KickTrackerDataPoint(Base):
     __tablename__ = "kick_tracker_data_points"
+    # A session's kicks are read by time range
+    __table_args__ = (Index("ix_kick_tracker_data_points_session_id_kick_at", "session_id", "kick_at"),)
     id: Mapped[int] = mapped_column(primary_key=True)
     kick_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
@@ -570,6 +582,16 @@ class KickTrackerDataPoint(Base):
     session: Mapped["KickTrackerSession"] = relationship(back_populates="kicks")
 
 
+class KickDailyRollup(Base):
+    """Per-day kick counts of each mother, by her local date (maintained on insert, see "kick_tracker_rollups.py")"""
+
+    __tablename__ = "kick_daily_rollups"
+    mother_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("pregnant_women.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    kick_count: Mapped[int] = mapped_column(server_default=text("0"))
+
+
 # ==============================================
 # ============= PRODUCT/MERCHANT ===============
 # ==============================================
@@ -661,6 +683,10 @@ class ShoppingCartItem(Base):
 # ===========================================
 class UserAppFeedback(Base):
     __tablename__ = "user_app_feedback"
+    __table_args__ = (
+        # The sentiment views filter & sort (and paginate) on (compound_score, id)
+        Index("ix_user_app_feedback_compound_score_id", "compound_score", "id"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
 
     author_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
@@ -674,6 +700,20 @@ class UserAppFeedback(Base):
     negative_score: Mapped[float]
     compound_score: Mapped[float]
 
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class FeedbackDailyRollup(Base):
+    """Per-day feedback counts, by rating & sentiment bucket (maintained on insert, see "feedback_rollups.py")"""
+
+    __tablename__ = "feedback_daily_rollups"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    rating: Mapped[int] = mapped_column(primary_key=True)
+    sentiment: Mapped[str] = mapped_column(String(8), primary_key=True)  # "positive" | "neutral" | "negative"
+
+    count: Mapped[int] = mapped_column(server_default=text("0"))
+    compound_sum: Mapped[float] = mapped_column(server_default=text("0"))
+
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -767,3 +807,17 @@ class Page(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+# ===========================================
+# ============ Reference Data ===============
+# ===========================================
+class ReferenceDataVersion(Base):
+    """
+    A single row, bumped whenever reference data (metric definitions, categories, specialisations) changes,
+    so that every worker knows when its in-memory copy is stale (see "reference_data.py").
+    """
+
+    __tablename__ = "reference_data_version"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(server_default=text("0"))
@@ -0,0 +1,14 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: AsyncSession | Session, table):
+    """
+    An INSERT that supports "ON CONFLICT DO UPDATE/NOTHING" for the session's database
+    (PostgreSQL in production, SQLite in the tests). Both dialects share the same API.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(table)
+    return pg_insert(table)
@@ -1,8 +1,10 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.db.db_schema import (
     BinaryMetric,
     BinaryMetricCategory,
+    ReferenceDataVersion,
     ScalarMetric,
 )
 
@@ -12,6 +14,10 @@ class DefaultsGenerator:
     def generate_defaults(db: Session) -> tuple[list[BinaryMetric], list[ScalarMetric]]:
         binary_metrics = DefaultsGenerator.init_binary_metrics(db)
         scalar_metrics = DefaultsGenerator.init_scalar_metrics(db)
+
+        # The metrics were replaced, so any running server's cached copy is stale
+        db.execute(update(ReferenceDataVersion).values(version=ReferenceDataVersion.version + 1))
+        db.commit()
         return binary_metrics, scalar_metrics
 
     # Each "Metric Option" has a "Metric Category"
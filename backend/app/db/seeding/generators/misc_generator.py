@@ -26,6 +26,8 @@ from app.db.db_schema import (
     UserAppFeedback,
     VolunteerDoctor,
 )
+from app.features.feedback.feedback_rollups import rebuild_feedback_rollups
+from app.features.kick_tracker.kick_tracker_rollups import rebuild_kick_counts
 from app.shared.s3_storage_interface import S3StorageInterface
 from app.shared.utils import generate_unique_mcr_numbers
 
@@ -86,6 +88,9 @@ class MiscGenerator:
             )
             db.add(user_feedback)
 
+        db.flush()
+        rebuild_feedback_rollups(db)
+
     @staticmethod
     def generate_appointments(
         db: Session,
@@ -151,6 +156,8 @@ class MiscGenerator:
                 kick_tracker_sessions.append(kick_session)
 
         db.add_all(kick_tracker_sessions)
+        db.flush()
+        rebuild_kick_counts(db)
         return kick_tracker_sessions
 
     @staticmethod
@@ -298,9 +305,7 @@ class MiscGenerator:
             db.flush()
 
             # Upload image to S3
-            img_key = S3StorageInterface.put_product_img_from_filepath(
-                new_product.id, str(products_path / product_json.photo_url)
-            )
+            img_key = S3StorageInterface.put_product_img_from_filepath(str(products_path / product_json.photo_url))
 
             if img_key is None:
                 raise ValueError(f"Failed to upload image for product '{new_product.name}'")
@@ -101,9 +101,7 @@ class RecipesGenerator:
             db.add(new_recipe)
             db.flush()
 
-            img_key = S3StorageInterface.put_recipe_img_from_filepath(
-                new_recipe.id, recipes_path / recipe_json.photo_url
-            )
+            img_key = S3StorageInterface.put_recipe_img_from_filepath(str(recipes_path / recipe_json.photo_url))
             new_recipe.img_key = img_key
             if img_key is None:
                 raise ValueError(f"Failed to upload image for recipe '{new_recipe.name}'")
@@ -60,7 +60,7 @@ class UsersGenerator:
             db.add(preg_woman)
             db.flush()
 
-            obj_key = S3StorageInterface.put_profile_img_from_filepath(preg_woman.id, str(folder_item))
+            obj_key = S3StorageInterface.put_profile_img_from_filepath(str(folder_item))
             preg_woman.profile_img_key = obj_key
             all_preg_women.append(preg_woman)
         return all_preg_women
@@ -114,7 +114,7 @@ class UsersGenerator:
             # Random image from "qualifications" folder
             qualification_img_filepath = random.choice(list(pathlib.Path(qualifications_img_folder).iterdir()))
             qualification_s3_key = S3StorageInterface.put_qualification_img_from_filepath(
-                doctor.id, str(qualification_img_filepath)
+                str(qualification_img_filepath)
             )
             if qualification_s3_key is None:
                 raise ValueError("Failed to upload medical degree image to S3 storage")
@@ -122,7 +122,7 @@ class UsersGenerator:
 
             # Assign the profile picture
             profile_img_filepath = str(folder_item)
-            profile_s3_key = S3StorageInterface.put_profile_img_from_filepath(doctor.id, profile_img_filepath)
+            profile_s3_key = S3StorageInterface.put_profile_img_from_filepath(profile_img_filepath)
             if profile_s3_key is None:
                 raise ValueError("Failed to upload profile image to S3 storage")
             doctor.profile_img_key = profile_s3_key
@@ -173,7 +173,7 @@ class UsersGenerator:
             # Random image from "qualifications" img folder
             qualification_img_filepath = random.choice(list(pathlib.Path(qualifications_img_folder).iterdir()))
             qualification_s3_key = S3StorageInterface.put_qualification_img_from_filepath(
-                nutritionist.id, str(qualification_img_filepath)
+                str(qualification_img_filepath)
             )
             if qualification_s3_key is None:
                 raise ValueError("Failed to upload medical degree image to S3 storage")
@@ -181,7 +181,7 @@ class UsersGenerator:
 
             # Assign the profile picture
             profile_img_filepath = str(folder_item)
-            profile_s3_key = S3StorageInterface.put_profile_img_from_filepath(nutritionist.id, profile_img_filepath)
+            profile_s3_key = S3StorageInterface.put_profile_img_from_filepath(profile_img_filepath)
             if profile_s3_key is None:
                 raise ValueError("Failed to upload profile image to S3 storage")
             nutritionist.profile_img_key = profile_s3_key
@@ -221,7 +221,7 @@ class UsersGenerator:
             db.flush()
 
             # Assign profile image
-            profile_img_key = S3StorageInterface.put_profile_img_from_filepath(merchant.id, str(folder_item))
+            profile_img_key = S3StorageInterface.put_profile_img_from_filepath(str(folder_item))
             merchant.profile_img_key = profile_img_key
             all_merchants.append(merchant)
         return all_merchants
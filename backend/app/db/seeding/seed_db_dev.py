@@ -1,4 +1,5 @@
 from faker import Faker
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.core.password_hasher import get_password_hasher
@@ -13,6 +14,7 @@ from app.db.db_schema import (
     Merchant,
     Nutritionist,
     PregnantWoman,
+    ReferenceDataVersion,
     ThreadCategory,
     ThreadComment,
     User,
@@ -130,6 +132,9 @@ if __name__ == "__main__":
         MiscGenerator.generate_mother_like_product(db_session, preg_women, all_products)
         print("Finished seeding miscellaneous content!\n")
 
+        # The categories & specialisations were replaced too
+        db_session.execute(update(ReferenceDataVersion).values(version=ReferenceDataVersion.version + 1))
+
         db_session.commit()
         print("Finished seeding the database!")
     except Exception as e:
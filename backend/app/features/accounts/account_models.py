@@ -56,6 +56,13 @@ class RejectAccountCreationRequestReason(CustomBaseModel):
     reject_reason: str
 
 
+class AccountCreationRequestApprovalResult(CustomBaseModel):
+    request_id: int
+    user_role: Literal["VOLUNTEER_DOCTOR", "NUTRITIONIST"]
+    approved: bool
+    detail: str | None = None  # Why it could not be approved
+
+
 # .................
 # User profile models
 # .................
@@ -84,9 +91,10 @@ class MerchantUpdateRequest(UserUpdateRequest):
     shop_name: str
 
 
-# Pregnant woman update (includes DOB)
+# Pregnant woman update (includes DOB, and the timezone which is left unchanged when not given)
 class PregnantWomanUpdateRequest(UserUpdateRequest):
     date_of_birth: date | None = None
+    timezone: str | None = None  # IANA name, e.g. "Asia/Singapore"
 
 
 # Response model for any user
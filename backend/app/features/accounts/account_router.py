@@ -1,6 +1,5 @@
 from argon2 import PasswordHasher
 from fastapi import APIRouter, Depends, File, Form, UploadFile, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.password_hasher import get_password_hasher
@@ -9,7 +8,6 @@ from app.core.users_manager import current_active_user
 from app.db.db_config import get_db
 from app.db.db_schema import (
     Admin,
-    DoctorSpecialisation,
     Merchant,
     Nutritionist,
     PregnantWoman,
@@ -18,6 +16,7 @@ from app.db.db_schema import (
     VolunteerDoctor,
 )
 from app.features.accounts.account_models import (
+    AccountCreationRequestApprovalResult,
     AccountCreationRequestView,
     DoctorUpdateRequest,
     HealthProfileUpdateRequest,
@@ -30,6 +29,7 @@ from app.features.accounts.account_models import (
 )
 from app.features.accounts.account_service import AccountService
 from app.features.admin.admin_models import DoctorSpecialisationModel
+from app.shared.reference_data import reference_data_cache
 
 account_router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
@@ -89,8 +89,7 @@ async def get_doctor_specialisations(
     db: AsyncSession = Depends(get_db),
 ) -> list[DoctorSpecialisationModel]:
     """Get all available doctor specialisations (public endpoint)"""
-    result = await db.execute(select(DoctorSpecialisation).order_by(DoctorSpecialisation.specialisation))
-    specialisations = result.scalars().all()
+    specialisations = (await reference_data_cache.get(db)).doctor_specialisations
     return [DoctorSpecialisationModel(id=spec.id, specialisation=spec.specialisation) for spec in specialisations]
 
 
@@ -152,6 +151,22 @@ async def submit_nutritionist_account_creation_request(
         raise
 
 
+@account_router.patch("/accept-all", response_model=list[AccountCreationRequestApprovalResult])
+async def accept_all_pending_account_creation_requests(
+    _: Admin = Depends(require_role(Admin)),
+    service: AccountService = Depends(get_account_service),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    db: AsyncSession = Depends(get_db),
+) -> list[AccountCreationRequestApprovalResult]:
+    try:
+        results = await service.accept_all_pending_account_creation_requests(password_hasher)
+        await db.commit()
+        return results
+    except:
+        await db.rollback()
+        raise
+
+
 @account_router.patch("/doctors/{request_id}/accept", status_code=status.HTTP_204_NO_CONTENT)
 async def accept_doctor_account_creation_request(
     request_id: int,
@@ -1,7 +1,11 @@
+import asyncio
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from argon2 import PasswordHasher
 from fastapi import HTTPException, UploadFile, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.core.settings import settings
 from app.db.db_schema import (
@@ -18,6 +22,7 @@ from app.db.db_schema import (
     VolunteerDoctor,
 )
 from app.features.accounts.account_models import (
+    AccountCreationRequestApprovalResult,
     AccountCreationRequestView,
     DoctorUpdateRequest,
     HealthProfileUpdateRequest,
@@ -27,8 +32,10 @@ from app.features.accounts.account_models import (
     PregnancyDetailsUpdateRequest,
     PregnantWomanUpdateRequest,
 )
+from app.features.kick_tracker.kick_tracker_rollups import rebuild_mother_kick_days
+from app.shared.image_validation import validate_image_upload
 from app.shared.s3_storage_interface import S3StorageInterface
-from app.shared.utils import is_valid_image
+from app.shared.utils import local_timezone
 
 
 class AccountService:
@@ -173,11 +180,8 @@ class AccountService:
         if user_role not in (UserRole.VOLUNTEER_DOCTOR.value, UserRole.NUTRITIONIST.value):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user role")
 
-        if qualification_img is not None and (not is_valid_image(qualification_img)):
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-                detail="Invalid qualification image file",
-            )
+        if qualification_img is not None:
+            validate_image_upload(qualification_img, S3StorageInterface.STAGING_QUALIFICATION_PREFIX)
 
         stmt = (
             select(VolunteerDoctor).where(VolunteerDoctor.email == email)
@@ -239,11 +243,8 @@ class AccountService:
         if user_role not in (UserRole.VOLUNTEER_DOCTOR.value, UserRole.NUTRITIONIST.value):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user role")
 
-        if qualification_img is not None and (not is_valid_image(qualification_img)):
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-                detail="Invalid qualification image file",
-            )
+        if qualification_img is not None:
+            validate_image_upload(qualification_img, S3StorageInterface.STAGING_QUALIFICATION_PREFIX)
 
         stmt = select(Nutritionist).where(Nutritionist.email == email)
         existing_user_with_email = (await self.db.execute(stmt)).scalar_one_or_none()
@@ -312,7 +313,6 @@ class AccountService:
         await self.db.flush()  # get new_doctor.id
 
         new_doctor.qualification_img_key = S3StorageInterface.promote_staging_qualification_img(
-            user_id=new_doctor.id,
             staging_img_key=acc_creation_req.qualification_img_key,
         )
         if new_doctor.qualification_img_key is None:
@@ -374,7 +374,6 @@ class AccountService:
         await self.db.flush()  # get new_nutritionist.id
 
         new_nutritionist.qualification_img_key = S3StorageInterface.promote_staging_qualification_img(
-            user_id=new_nutritionist.id,
             staging_img_key=acc_creation_req.qualification_img_key,
         )
         if new_nutritionist.qualification_img_key is None:
@@ -405,6 +404,121 @@ class AccountService:
         acc_creation_req.reject_reason = reject_reason
         await self.db.flush()
 
+    async def accept_all_pending_account_creation_requests(
+        self, password_hasher: PasswordHasher
+    ) -> list[AccountCreationRequestApprovalResult]:
+        """
+        Approves every PENDING doctor & nutritionist account creation request in one go.
+
+        The lookups are batched (one query per table), the password hashing is moved off the event loop,
+        and all the qualification images are promoted concurrently. A request that cannot be approved
+        (unknown MCR number, email or MCR number already taken, failed image promotion, ...) is left PENDING,
+        and reported in the results. Only the requests that pass validation get their password hashed & image promoted.
+        """
+        doctor_reqs_stmt = select(DoctorAccountCreationRequest).where(
+            DoctorAccountCreationRequest.account_status == AccountCreationRequestStatus.PENDING
+        )
+        doctor_reqs = (await self.db.execute(doctor_reqs_stmt)).scalars().all()
+        nutritionist_reqs_stmt = select(NutritionistAccountCreationRequest).where(
+            NutritionistAccountCreationRequest.account_status == AccountCreationRequestStatus.PENDING
+        )
+        nutritionist_reqs = (await self.db.execute(nutritionist_reqs_stmt)).scalars().all()
+        all_reqs = [*doctor_reqs, *nutritionist_reqs]
+        if not all_reqs:
+            return []
+
+        # Each MCR number, along with whether a doctor already holds it
+        mcr_stmt = (
+            select(MCRNumber, VolunteerDoctor.id)
+            .outerjoin(VolunteerDoctor, VolunteerDoctor.mcr_no_id == MCRNumber.id)
+            .where(MCRNumber.value.in_({req.mcr_no for req in doctor_reqs}))
+        )
+        mcr_no_by_value: dict[str, MCRNumber] = {}
+        taken_mcr_nos: set[str] = set()
+        for mcr, holder_id in (await self.db.execute(mcr_stmt)).all():
+            mcr_no_by_value[mcr.value] = mcr
+            if holder_id is not None:
+                taken_mcr_nos.add(mcr.value)
+        specialisation_stmt = select(DoctorSpecialisation).where(
+            DoctorSpecialisation.specialisation.in_({req.specialisation for req in doctor_reqs})
+        )
+        specialisation_by_name = {
+            spec.specialisation: spec for spec in (await self.db.execute(specialisation_stmt)).scalars().all()
+        }
+        taken_emails_stmt = select(User.email).where(User.email.in_({req.email for req in all_reqs}))
+        taken_emails = set((await self.db.execute(taken_emails_stmt)).scalars().all())
+
+        # Validated first (in order, so that the first of two requests with the same email / MCR number wins)
+        detail_by_req: dict[int, str | None] = {}
+        for req in all_reqs:
+            is_doctor = isinstance(req, DoctorAccountCreationRequest)
+            detail: str | None = None
+            if req.email in taken_emails:
+                detail = "Email already in use"
+            elif is_doctor and req.mcr_no not in mcr_no_by_value:
+                detail = "MCR number not found"
+            elif is_doctor and req.mcr_no in taken_mcr_nos:
+                detail = "MCR number already in use"
+            elif is_doctor and req.specialisation not in specialisation_by_name:
+                detail = "Doctor specialisation not found"
+
+            if detail is None:
+                taken_emails.add(req.email)
+                if is_doctor:
+                    taken_mcr_nos.add(req.mcr_no)
+            detail_by_req[id(req)] = detail
+        valid_reqs = [req for req in all_reqs if detail_by_req[id(req)] is None]
+
+        promoted_img_keys, hashed_passwords = await asyncio.gather(
+            run_in_threadpool(
+                S3StorageInterface.promote_staging_qualification_imgs,
+                [req.qualification_img_key for req in valid_reqs],
+            ),
+            run_in_threadpool(lambda: [password_hasher.hash(req.password) for req in valid_reqs]),
+        )
+        hashed_password_by_req = dict(zip(map(id, valid_reqs), hashed_passwords))
+
+        results: list[AccountCreationRequestApprovalResult] = []
+        for req in all_reqs:
+            is_doctor = isinstance(req, DoctorAccountCreationRequest)
+            user_role = UserRole.VOLUNTEER_DOCTOR if is_doctor else UserRole.NUTRITIONIST
+            detail = detail_by_req[id(req)]
+
+            qualification_img_key = promoted_img_keys.get(req.qualification_img_key)
+            if detail is None and qualification_img_key is None:
+                detail = "Failed to promote qualification image"
+
+            if detail is None:
+                common_fields = {
+                    "first_name": req.first_name,
+                    "middle_name": req.middle_name,
+                    "last_name": req.last_name,
+                    "email": req.email,
+                    "hashed_password": hashed_password_by_req[id(req)],
+                    "role": user_role,
+                    "qualification_img_key": qualification_img_key,
+                }
+                if is_doctor:
+                    self.db.add(
+                        VolunteerDoctor(
+                            **common_fields,
+                            mcr_no=mcr_no_by_value[req.mcr_no],
+                            specialisation=specialisation_by_name[req.specialisation],
+                        )
+                    )
+                else:
+                    self.db.add(Nutritionist(**common_fields))
+                req.account_status = AccountCreationRequestStatus.APPROVED
+
+            results.append(
+                AccountCreationRequestApprovalResult(
+                    request_id=req.id, user_role=user_role.value, approved=detail is None, detail=detail
+                )
+            )
+
+        await self.db.flush()
+        return results
+
     # ....................
     # User profile updates
     # ....................
@@ -479,6 +593,16 @@ class AccountService:
         mother.last_name = data.last_name
         mother.email = data.email
         mother.date_of_birth = data.date_of_birth
+        if data.timezone is not None:
+            try:
+                ZoneInfo(data.timezone)
+            except (ValueError, ZoneInfoNotFoundError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown timezone")
+            # Her kicks' local dates move with her timezone, so the daily counts are re-bucketed
+            timezone_changed = local_timezone(data.timezone) != local_timezone(mother.timezone)
+            mother.timezone = data.timezone
+            if timezone_changed:
+                await rebuild_mother_kick_days(self.db, mother)
         await self.db.flush()
 
     async def get_profile_image_url(self, user: User) -> str | None:
@@ -487,13 +611,9 @@ class AccountService:
         return S3StorageInterface.get_presigned_url(user.profile_img_key, expires_in_seconds=3600)
 
     async def update_profile_image_url(self, image_file: UploadFile, user: User) -> None:
-        if not is_valid_image(image_file):
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-                detail="Invalid profile image file",
-            )
+        validate_image_upload(image_file, S3StorageInterface.PROFILE_PREFIX)
 
-        new_img_key = S3StorageInterface.put_profile_img(user.id, image_file)
+        new_img_key = S3StorageInterface.put_profile_img(image_file)
         if new_img_key is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
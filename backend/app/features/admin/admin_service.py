@@ -21,6 +21,7 @@ from app.features.admin.admin_models import (
     MotherModel,
     UserModel,
 )
+from app.shared.reference_data import bump_reference_data_version, reference_data_cache
 from app.shared.utils import format_user_fullname
 
 
@@ -94,8 +95,7 @@ class AdminService:
         user.is_active = is_active
 
     async def get_all_specialisations(self) -> list[DoctorSpecialisationModel]:
-        result = await self.db.execute(select(DoctorSpecialisation).order_by(DoctorSpecialisation.specialisation))
-        specialisations = result.scalars().all()
+        specialisations = (await reference_data_cache.get(self.db)).doctor_specialisations
         return [
             DoctorSpecialisationModel(
                 id=spec.id,
@@ -119,6 +119,7 @@ class AdminService:
         new_spec = DoctorSpecialisation(specialisation=specialisation)
         self.db.add(new_spec)
         await self.db.flush()
+        await bump_reference_data_version(self.db)
 
         return DoctorSpecialisationModel(
             id=new_spec.id,
@@ -147,6 +148,7 @@ class AdminService:
 
         spec.specialisation = specialisation
         await self.db.flush()
+        await bump_reference_data_version(self.db)
 
         return DoctorSpecialisationModel(
             id=spec.id,
@@ -174,3 +176,4 @@ class AdminService:
             )
 
         await self.db.delete(spec)
+        await bump_reference_data_version(self.db)
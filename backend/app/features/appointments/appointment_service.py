@@ -61,6 +61,26 @@ class AppointmentService:
 
         return response
 
+    async def get_next_appointment(self, mother_id: UUID) -> AppointmentPreviewData | None:
+        """The mother's earliest upcoming appointment that wasn't rejected (if any)."""
+        stmt = (
+            select(Appointment.id, Appointment.start_time, Appointment.status, VolunteerDoctor.first_name)
+            .join(VolunteerDoctor, Appointment.volunteer_doctor_id == VolunteerDoctor.id)
+            .where(
+                Appointment.mother_id == mother_id,
+                Appointment.start_time >= datetime.now(timezone.utc),
+                Appointment.status != AppointmentStatus.REJECTED,
+            )
+            .order_by(Appointment.start_time)
+            .limit(1)
+        )
+        row = (await self.db.execute(stmt)).first()
+        if row is None:
+            return None
+        return AppointmentPreviewData(
+            appointment_id=row.id, date_time=row.start_time, doctor_fname=row.first_name, status=row.status.value
+        )
+
     async def get_all_appointments(self, user: User) -> list[AppointmentResponse]:
         is_participant: bool = user.role == UserRole.PREGNANT_WOMAN or user.role == UserRole.VOLUNTEER_DOCTOR
         if not is_participant:
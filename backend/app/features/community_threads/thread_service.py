@@ -10,7 +10,6 @@ from app.db.db_schema import (
     CommentLike,
     CommunityThread,
     CommunityThreadLike,
-    ThreadCategory,
     ThreadComment,
     User,
 )
@@ -24,6 +23,7 @@ from app.features.community_threads.thread_models import (
     ThreadUpdateData,
     UpdateCommentData,
 )
+from app.shared.reference_data import reference_data_cache
 from app.shared.utils import format_user_fullname
 
 
@@ -33,8 +33,7 @@ class ThreadService:
 
     async def get_thread_categories(self) -> list[ThreadCategoryData]:
         """Fetch all available thread categories."""
-        stmt = select(ThreadCategory).order_by(ThreadCategory.label)
-        categories = (await self.db.execute(stmt)).scalars().all()
+        categories = (await reference_data_cache.get(self.db)).thread_categories
         return [ThreadCategoryData(id=cat.id, label=cat.label) for cat in categories]
 
     async def get_thread_previews(self, current_user: User | None = None) -> list[ThreadPreviewData]:
@@ -0,0 +1,12 @@
+from datetime import date
+
+from app.core.custom_base_model import CustomBaseModel
+from app.features.appointments.appointment_models import AppointmentPreviewData
+from app.features.journal.journal_models import JournalPreviewData
+
+
+class DashboardResponse(CustomBaseModel):
+    date: date
+    journal: JournalPreviewData  # Including the day's kick count
+    next_appointment: AppointmentPreviewData | None
+    unread_notification_count: int
@@ -0,0 +1,32 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.security import require_role
+from app.db.db_config import get_db, get_db_sessionmaker
+from app.db.db_schema import PregnantWoman
+from app.features.dashboard.dashboard_models import DashboardResponse
+from app.features.dashboard.dashboard_service import DashboardService
+
+dashboard_router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+def get_dashboard_service(
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_db_sessionmaker),
+) -> DashboardService:
+    return DashboardService(db, session_factory)
+
+
+@dashboard_router.get("/{entry_date}", response_model=DashboardResponse)
+async def get_dashboard(
+    entry_date: date,
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    service: DashboardService = Depends(get_dashboard_service),
+) -> DashboardResponse:
+    """
+    The day's journal metrics & kick count, the next appointment and the unread notification count, at once
+    (i.e. instead of calling "/journals/{entry_date}", "/appointments" and "/notifications/has-unread").
+    """
+    return await service.get_dashboard(mother.id, entry_date)
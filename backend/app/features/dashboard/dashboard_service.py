@@ -0,0 +1,49 @@
+import asyncio
+from datetime import date
+from typing import Awaitable, Callable, TypeVar
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.features.appointments.appointment_service import AppointmentService
+from app.features.dashboard.dashboard_models import DashboardResponse
+from app.features.journal.journal_service import JournalService
+from app.features.notifications.notification_service import NotificationService
+
+T = TypeVar("T")
+
+
+class DashboardService:
+    """
+    Everything the home screen shows, in one response.
+    The parts are independent, so the two heavier ones run on their own sessions (i.e. pooled connections),
+    at the same time as the two single-row counts, which run one after the other on the request's session
+    (that already holds a connection, from authenticating). That's 3 connections per call, rather than 5.
+    """
+
+    def __init__(self, db: AsyncSession, session_factory: async_sessionmaker[AsyncSession]):
+        self.db = db
+        self.session_factory = session_factory
+
+    async def _in_own_session(self, query: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        async with self.session_factory() as db:
+            return await query(db)
+
+    async def _counts(self, mother_id: UUID, day: date) -> tuple[int, int]:
+        kick_count = await JournalService(self.db).count_kicks_on_date(mother_id, day)
+        unread_count = await NotificationService(self.db).count_unread_notifications(mother_id)
+        return kick_count, unread_count
+
+    async def get_dashboard(self, mother_id: UUID, day: date) -> DashboardResponse:
+        journal, next_appointment, (kick_count, unread_count) = await asyncio.gather(
+            self._in_own_session(lambda db: JournalService(db).get_preview_metrics(mother_id, day)),
+            self._in_own_session(lambda db: AppointmentService(db).get_next_appointment(mother_id)),
+            self._counts(mother_id, day),
+        )
+        journal.kick_count = kick_count
+        return DashboardResponse(
+            date=day,
+            journal=journal,
+            next_appointment=next_appointment,
+            unread_notification_count=unread_count,
+        )
@@ -12,6 +12,7 @@ from app.features.educational_articles.edu_article_models import (
     ArticlePreviewData,
     EduArticleCategoryModel,
 )
+from app.shared.reference_data import bump_reference_data_version, reference_data_cache
 from app.shared.utils import format_user_fullname
 
 
@@ -47,9 +48,7 @@ class EduArticleService:
         self.db = db
 
     async def get_article_categories(self) -> list[str]:
-        query = select(EduArticleCategory).order_by(EduArticleCategory.label)
-        result = await self.db.execute(query)
-        categories = result.scalars().all()
+        categories = (await reference_data_cache.get(self.db)).article_categories
         return [cat.label for cat in categories]
 
     async def get_article_previews(self, limit: int) -> list[ArticlePreviewData]:
@@ -245,9 +244,7 @@ class EduArticleService:
         return article
 
     async def get_all_categories(self) -> list[EduArticleCategoryModel]:
-        query = select(EduArticleCategory).order_by(EduArticleCategory.label)
-        result = await self.db.execute(query)
-        categories = result.scalars().all()
+        categories = (await reference_data_cache.get(self.db)).article_categories
         return [EduArticleCategoryModel(id=cat.id, label=cat.label) for cat in categories]
 
     async def create_category(self, label: str) -> EduArticleCategoryModel:
@@ -264,6 +261,7 @@ class EduArticleService:
         new_category = EduArticleCategory(label=label)
         self.db.add(new_category)
         await self.db.flush()
+        await bump_reference_data_version(self.db)
 
         return EduArticleCategoryModel(id=new_category.id, label=new_category.label)
 
@@ -289,6 +287,7 @@ class EduArticleService:
 
         category.label = label
         await self.db.flush()
+        await bump_reference_data_version(self.db)
 
         return EduArticleCategoryModel(id=category.id, label=category.label)
 
@@ -313,6 +312,7 @@ class EduArticleService:
             )
 
         await self.db.delete(category)
+        await bump_reference_data_version(self.db)
 
     async def save_article(self, user: User, article_id: int) -> None:
         """Save an article for a user"""
@@ -0,0 +1,173 @@
+"""
+Per-day feedback rollups (see `FeedbackDailyRollup`), so the feedback analytics never scan `user_app_feedback`.
+
+Every insert into `user_app_feedback` must go through `record_feedback` (in the same transaction), and
+anything that rewrites feedback in bulk (seeding, re-scoring) rebuilds them with `rebuild_feedback_rollups`.
+The days are UTC dates on both sides, whatever the server's / database session's timezone.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
+
+from sqlalchemy import case, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.db_schema import FeedbackDailyRollup, UserAppFeedback
+from app.db.db_upsert import dialect_insert
+
+# VADER's conventional cut-offs for the compound score
+POSITIVE_COMPOUND_THRESHOLD = 0.05
+NEGATIVE_COMPOUND_THRESHOLD = -0.05
+SENTIMENT_BUCKETS: tuple[str, ...] = ("positive", "neutral", "negative")
+
+TrendBucket = Literal["day", "week", "month"]
+
+
+def sentiment_bucket(compound_score: float) -> str:
+    if compound_score >= POSITIVE_COMPOUND_THRESHOLD:
+        return "positive"
+    if compound_score <= NEGATIVE_COMPOUND_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def _utc_date(created_at: datetime) -> date:
+    if created_at.tzinfo is None:  # SQLite doesn't keep the offset (they are all stored in UTC)
+        return created_at.date()
+    return created_at.astimezone(timezone.utc).date()
+
+
+async def record_feedback(db: AsyncSession, feedback: UserAppFeedback) -> None:
+    """Adds a new (not yet committed) feedback to its day's rollup. `created_at` must be set."""
+    stmt = dialect_insert(db, FeedbackDailyRollup).values(
+        day=_utc_date(feedback.created_at),
+        rating=feedback.rating,
+        sentiment=sentiment_bucket(feedback.compound_score),
+        count=1,
+        compound_sum=feedback.compound_score,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FeedbackDailyRollup.day, FeedbackDailyRollup.rating, FeedbackDailyRollup.sentiment],
+        set_={
+            "count": FeedbackDailyRollup.count + 1,
+            "compound_sum": FeedbackDailyRollup.compound_sum + stmt.excluded.compound_sum,
+        },
+    )
+    await db.execute(stmt)
+
+
+def rebuild_feedback_rollups(db: Session) -> None:
+    """
+    Recomputes every rollup from `user_app_feedback` in a single INSERT ... SELECT (doesn't commit).
+
+    On PostgreSQL, the rollups are locked against writes (reads still go through) until the caller commits:
+    the rebuild first waits for the transactions that already recorded feedback to commit, so that its SELECT sees
+    their feedback, and the ones that record feedback meanwhile wait for it, and then add to the rebuilt rollups.
+    (SQLite only ever has one writer at a time anyway.)
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        day = func.date(UserAppFeedback.created_at)
+    else:
+        db.execute(text(f"LOCK TABLE {FeedbackDailyRollup.__tablename__} IN EXCLUSIVE MODE"))
+        # Not the session's timezone's date (which is what casting a "timestamptz" to a date gives)
+        day = func.date(func.timezone("UTC", UserAppFeedback.created_at))
+    sentiment = case(
+        (UserAppFeedback.compound_score >= POSITIVE_COMPOUND_THRESHOLD, "positive"),
+        (UserAppFeedback.compound_score <= NEGATIVE_COMPOUND_THRESHOLD, "negative"),
+        else_="neutral",
+    )
+    grouped = select(
+        day, UserAppFeedback.rating, sentiment, func.count(), func.sum(UserAppFeedback.compound_score)
+    ).group_by(day, UserAppFeedback.rating, sentiment)
+
+    db.execute(delete(FeedbackDailyRollup))
+    db.execute(
+        insert(FeedbackDailyRollup).from_select(
+            ["day", "rating", "sentiment", "count", "compound_sum"],
+            grouped,
+        )
+    )
+
+
+@dataclass
+class FeedbackAggregate:
+    count: int = 0
+    rating_sum: int = 0
+    compound_sum: float = 0.0
+    rating_counts: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    sentiment_counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(SENTIMENT_BUCKETS, 0))
+
+    def add(self, rating: int, sentiment: str, count: int, compound_sum: float) -> None:
+        self.count += count
+        self.rating_sum += rating * count
+        self.compound_sum += compound_sum
+        self.rating_counts[rating] += count
+        self.sentiment_counts[sentiment] = self.sentiment_counts.get(sentiment, 0) + count
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.count if self.count else 0.0
+
+    @property
+    def average_compound(self) -> float:
+        return self.compound_sum / self.count if self.count else 0.0
+
+
+def _period_start(day: date, bucket: TrendBucket) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())  # Weeks start on Monday
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _date_range(start: date | None, end: date | None) -> list:
+    filters = []
+    if start is not None:
+        filters.append(FeedbackDailyRollup.day >= start)
+    if end is not None:
+        filters.append(FeedbackDailyRollup.day <= end)
+    return filters
+
+
+async def get_feedback_totals(
+    db: AsyncSession, start: date | None = None, end: date | None = None
+) -> FeedbackAggregate:
+    """Everything in [start, end] (inclusive, both optional) aggregated, from one read of the rollups."""
+    stmt = (
+        select(
+            FeedbackDailyRollup.rating,
+            FeedbackDailyRollup.sentiment,
+            func.sum(FeedbackDailyRollup.count),
+            func.sum(FeedbackDailyRollup.compound_sum),
+        )
+        .where(*_date_range(start, end))
+        .group_by(FeedbackDailyRollup.rating, FeedbackDailyRollup.sentiment)
+    )
+    totals = FeedbackAggregate()
+    for rating, sentiment, count, compound_sum in (await db.execute(stmt)).all():
+        totals.add(rating, sentiment, int(count), float(compound_sum))
+    return totals
+
+
+async def get_feedback_trend(
+    db: AsyncSession, bucket: TrendBucket, start: date | None = None, end: date | None = None
+) -> list[tuple[date, FeedbackAggregate]]:
+    """The rollups in [start, end], aggregated per day / week / month. Returns: (period start, aggregate), in order"""
+    stmt = select(
+        FeedbackDailyRollup.day,
+        FeedbackDailyRollup.rating,
+        FeedbackDailyRollup.sentiment,
+        FeedbackDailyRollup.count,
+        FeedbackDailyRollup.compound_sum,
+    ).where(*_date_range(start, end))
+
+    periods: dict[date, FeedbackAggregate] = defaultdict(FeedbackAggregate)
+    for day, rating, sentiment, count, compound_sum in (await db.execute(stmt)).all():
+        periods[_period_start(day, bucket)].add(rating, sentiment, count, compound_sum)
+    return sorted(periods.items())
@@ -1,15 +1,21 @@
+import base64
+import binascii
+import json
 import uuid
-from typing import Annotated
+from datetime import datetime, timezone
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select
+from sqlalchemy import Select, and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.db_config import get_async_db
 from app.db.db_schema import UserAppFeedback
 
-from .service import FeedbackSentimentService
+from .feedback_rollups import record_feedback
+from .service import sentiment_scoring_service
 
 Rating = Annotated[int, Field(ge=1, le=5)]
 Content = Annotated[str, Field(min_length=1)]
@@ -35,8 +41,72 @@ class FeedbackResponse(BaseModel):
         orm_mode = True
 
 
+class PositiveFeedbackItem(BaseModel):
+    id: int
+    content: str
+    rating: int
+    compound_score: float
+
+
+class PositiveFeedbackPage(BaseModel):
+    items: list[PositiveFeedbackItem]
+    next_cursor: str | None
+    has_more: bool
+
+
 feedback_router = APIRouter(prefix="/feedback", tags=["Feedback"])
-sentiment_service = FeedbackSentimentService()
+
+# How many rows the "as_text" export fetches from the database at a time
+TEXT_EXPORT_CHUNK_SIZE = 500
+
+
+def encode_cursor(compound_score: float, feedback_id: int) -> str:
+    """Encode the last row's sort key into a base64 cursor"""
+    cursor_json = json.dumps({"compound_score": compound_score, "id": feedback_id})
+    return base64.b64encode(cursor_json.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """Decode base64 cursor back to (compound score, feedback ID)"""
+    try:
+        cursor_data = json.loads(base64.b64decode(cursor.encode()).decode())
+        return float(cursor_data["compound_score"]), int(cursor_data["id"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _sentiment_stmt(threshold: float, positive: bool, cursor: str | None = None) -> Select:
+    """
+    Positive feedback (compound >= threshold) from the most to the least positive,
+    or negative feedback from the most to the least negative. Both are served by the (compound_score, id) index.
+    """
+    score, feedback_id = UserAppFeedback.compound_score, UserAppFeedback.id
+    stmt = select(feedback_id, UserAppFeedback.rating, score, UserAppFeedback.content)
+
+    if positive:
+        stmt = stmt.where(score >= threshold).order_by(score.desc(), feedback_id.desc())
+    else:
+        stmt = stmt.where(score < threshold).order_by(score.asc(), feedback_id.asc())
+
+    # Apply cursor filter if provided (the ID breaks ties between equal scores)
+    if cursor is not None:
+        cursor_score, cursor_id = decode_cursor(cursor)
+        if positive:
+            stmt = stmt.where(or_(score < cursor_score, and_(score == cursor_score, feedback_id < cursor_id)))
+        else:
+            stmt = stmt.where(or_(score > cursor_score, and_(score == cursor_score, feedback_id > cursor_id)))
+    return stmt
+
+
+async def _sentiment_page(
+    db: AsyncSession, threshold: float, positive: bool, limit: int, cursor: str | None
+) -> tuple[list, str | None, bool]:
+    """Returns: (the rows, the cursor of the next page, whether there is a next page)"""
+    rows = (await db.execute(_sentiment_stmt(threshold, positive, cursor).limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].compound_score, rows[-1].id) if rows and has_more else None
+    return rows, next_cursor, has_more
 
 
 @feedback_router.post("/", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
@@ -44,7 +114,7 @@ async def create_feedback(
     feedback: FeedbackCreate,
     db: AsyncSession = Depends(get_async_db),
 ):
-    scores = sentiment_service.analyze(feedback.content)
+    scores = await sentiment_scoring_service.analyze(feedback.content)
 
     new_feedback = UserAppFeedback(
         author_id=feedback.author_id,
@@ -54,90 +124,87 @@ async def create_feedback(
         neutral_score=scores["neu"],
         negative_score=scores["neg"],
         compound_score=scores["compound"],
+        created_at=datetime.now(timezone.utc),
     )
 
     db.add(new_feedback)
+    await record_feedback(db, new_feedback)
     await db.commit()
     await db.refresh(new_feedback)
 
     return new_feedback
 
 
-@feedback_router.get("/positive", status_code=status.HTTP_200_OK)
+@feedback_router.get("/positive", response_model=PositiveFeedbackPage, status_code=status.HTTP_200_OK)
 async def get_positive_feedback(
     threshold: float = 0.05,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_async_db),
-):
-    result = await db.execute(select(UserAppFeedback))
-    feedbacks = result.scalars().all()
+) -> PositiveFeedbackPage:
+    rows, next_cursor, has_more = await _sentiment_page(db, threshold, True, limit, cursor)
+    return PositiveFeedbackPage(
+        items=[
+            PositiveFeedbackItem(id=row.id, content=row.content, rating=row.rating, compound_score=row.compound_score)
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
 
-    def compound_score(entry: UserAppFeedback) -> float:
-        if entry.compound_score is not None:
-            return entry.compound_score
-        scores = sentiment_service.analyze(entry.content)
-        return scores["compound"]
 
-    positive_feedbacks = [f for f in feedbacks if compound_score(f) >= threshold]
+def _sentiment_payload(row) -> dict:
+    return {"id": row.id, "rating": row.rating, "compound": round(row.compound_score, 3), "content": row.content}
 
-    return [
-        {
-            "id": f.id,
-            "content": f.content,
-            "rating": f.rating,
-            "compound_score": compound_score(f),
-        }
-        for f in sorted(positive_feedbacks, key=compound_score, reverse=True)
-    ]
+
+def _sentiment_line(row) -> str:
+    return f"  id={row.id} | rating={row.rating} | compound={round(row.compound_score, 3)} | content={row.content}\n"
 
 
 @feedback_router.get("/sentiment", status_code=status.HTTP_200_OK)
 async def get_feedback_by_sentiment(
     threshold: float = 0.05,
     as_text: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    positive_cursor: str | None = None,
+    negative_cursor: str | None = None,
     db: AsyncSession = Depends(get_async_db),
 ):
-    result = await db.execute(select(UserAppFeedback))
-    feedbacks = result.scalars().all()
-
-    positive: list[dict] = []
-    negative: list[dict] = []
-
-    for f in feedbacks:
-        compound = (
-            round(f.compound_score, 3)
-            if f.compound_score is not None
-            else round(sentiment_service.analyze(f.content)["compound"], 3)
+    """
+    Positive feedback from the most to the least positive, and negative feedback from the most to the least negative.
+    The JSON is paginated (each list with its own cursor), while "as_text" streams every piece of feedback.
+    """
+    score = UserAppFeedback.compound_score
+    counts = (
+        await db.execute(
+            select(
+                func.count().filter(score >= threshold).label("positive"),
+                func.count().filter(score < threshold).label("negative"),
+            )
         )
-        payload = {"id": f.id, "rating": f.rating, "compound": compound, "content": f.content}
-        if compound >= threshold:
-            positive.append(payload)
-        else:
-            negative.append(payload)
-
-    # Sort for readability: positive high->low, negative low->high
-    positive_sorted = sorted(positive, key=lambda x: x["compound"], reverse=True)
-    negative_sorted = sorted(negative, key=lambda x: x["compound"])
+    ).one()
 
     if as_text:
-        lines: list[str] = []
-        lines.append(f"threshold={threshold}")
-        lines.append(f"positive ({len(positive_sorted)}):")
-        for item in positive_sorted:
-            lines.append(
-                f"  id={item['id']} | rating={item['rating']} | compound={item['compound']} | content={item['content']}"
-            )
-        lines.append("")
-        lines.append(f"negative ({len(negative_sorted)}):")
-        for item in negative_sorted:
-            lines.append(
-                f"  id={item['id']} | rating={item['rating']} | compound={item['compound']} | content={item['content']}"
-            )
-        body = "\n".join(lines)
-        return Response(content=body, media_type="text/plain")
 
+        async def stream_lines() -> AsyncIterator[str]:
+            yield f"threshold={threshold}\n"
+            for positive, title in ((True, "positive"), (False, "negative")):
+                if not positive:
+                    yield "\n"
+                yield f"{title} ({counts.positive if positive else counts.negative}):\n"
+                stmt = _sentiment_stmt(threshold, positive).execution_options(yield_per=TEXT_EXPORT_CHUNK_SIZE)
+                async for row in await db.stream(stmt):
+                    yield _sentiment_line(row)
+
+        return StreamingResponse(stream_lines(), media_type="text/plain")
+
+    positive_rows, next_positive_cursor, _ = await _sentiment_page(db, threshold, True, limit, positive_cursor)
+    negative_rows, next_negative_cursor, _ = await _sentiment_page(db, threshold, False, limit, negative_cursor)
     return {
         "threshold": threshold,
-        "counts": {"positive": len(positive_sorted), "negative": len(negative_sorted)},
-        "positive": positive_sorted,
-        "negative": negative_sorted,
+        "counts": {"positive": counts.positive, "negative": counts.negative},
+        "positive": [_sentiment_payload(row) for row in positive_rows],
+        "negative": [_sentiment_payload(row) for row in negative_rows],
+        "next_positive_cursor": next_positive_cursor,
+        "next_negative_cursor": next_negative_cursor,
     }
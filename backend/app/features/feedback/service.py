@@ -1,15 +1,155 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
+# How many requests' texts get scored together (by a single round trip to the pool)
+SENTIMENT_BATCH_MAX_SIZE = 64
+# How long the first text of a batch waits for others to join it
+SENTIMENT_BATCH_WINDOW_SECONDS = 0.005
+SENTIMENT_POOL_MAX_WORKERS = 2
+# Scores of the most recently scored texts, keyed by their content hash
+SENTIMENT_MEMO_MAX_SIZE = 10_000
+
+
+# ===========================================================
+# ========= POOL WORKERS (run in a separate process) ========
+# ===========================================================
+_worker_analyzer: SentimentIntensityAnalyzer | None = None
+
+
+def init_sentiment_worker() -> None:
+    # The lexicon is loaded once per worker process, not once per batch
+    global _worker_analyzer
+    _worker_analyzer = SentimentIntensityAnalyzer()
+
+
+def score_texts(texts: list[str]) -> list[dict]:
+    """VADER's scores for every text, in order (meant to run in the pool, but works anywhere)."""
+    analyzer = _worker_analyzer or SentimentIntensityAnalyzer()
+    return [analyzer.polarity_scores(text) for text in texts]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class SentimentScoringService:
+    """
+    Scores texts with VADER in a process pool, so the event loop never does the CPU-bound NLP.
+
+    Texts submitted concurrently (i.e. by different requests) within SENTIMENT_BATCH_WINDOW_SECONDS are sent
+    to the pool together, and texts that have already been scored are answered from a bounded LRU memo.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = SENTIMENT_POOL_MAX_WORKERS,
+        batch_max_size: int = SENTIMENT_BATCH_MAX_SIZE,
+        batch_window_seconds: float = SENTIMENT_BATCH_WINDOW_SECONDS,
+        memo_max_size: int = SENTIMENT_MEMO_MAX_SIZE,
+    ) -> None:
+        self.max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+        self.batch_max_size = batch_max_size
+        self.batch_window_seconds = batch_window_seconds
+        self.memo_max_size = memo_max_size
+
+        self._memo: OrderedDict[str, dict] = OrderedDict()
+        # Content hash -> the future of its (pending or in flight) score, so that duplicates are scored once
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._pending: list[tuple[str, str]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created lazily (i.e. not at import time), and with "spawn" so that workers don't inherit the event loop
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_sentiment_worker,
+            )
+        return self._pool
+
+    def _remember(self, key: str, scores: dict) -> None:
+        self._memo[key] = scores
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_max_size:
+            self._memo.popitem(last=False)
+
+    async def analyze(self, text: str) -> dict:
+        """VADER's scores for the text (see `score_texts`), off the event loop."""
+        key = content_hash(text)
+        scores = self._memo.get(key)
+        if scores is not None:
+            self._memo.move_to_end(key)
+            return scores
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures & timers belong to a single loop (i.e. a new one per test), so batching starts over
+            self._loop = loop
+            self._in_flight, self._pending, self._flush_handle = {}, [], None
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = loop.create_future()
+            self._pending.append((key, text))
+            if len(self._pending) >= self.batch_max_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window_seconds, self._flush)
+
+        # Shielded, so that a cancelled request doesn't cancel the score that other requests wait for too
+        return await asyncio.shield(future)
+
+    async def analyze_many(self, texts: list[str]) -> list[dict]:
+        return list(await asyncio.gather(*(self.analyze(text) for text in texts)))
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._score_batch(batch))
+            # Keep a reference, so that the task isn't garbage collected while running
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _score_batch(self, batch: list[tuple[str, str]]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                results = await loop.run_in_executor(self._get_pool(), score_texts, [text for _, text in batch])
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM killed), start over with a fresh pool
+                self._pool = None
+                results = await loop.run_in_executor(self._get_pool(), score_texts, [text for _, text in batch])
+        except Exception as e:
+            for key, _ in batch:
+                future = self._in_flight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for (key, _), scores in zip(batch, results):
+            self._remember(key, scores)
+            future = self._in_flight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(scores)
 
-class FeedbackSentimentService:
-    def __init__(self) -> None:
-        self.analyzer = SentimentIntensityAnalyzer()
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
-    def is_positive(self, text: str, threshold: float = 0.05) -> bool:
-        if not text:
-            return False
-        scores = self.analyzer.polarity_scores(text)
-        return scores["compound"] >= threshold
 
-    def analyze(self, text: str) -> dict:
-        return self.analyzer.polarity_scores(text)
+sentiment_scoring_service = SentimentScoringService()
@@ -0,0 +1,126 @@
+"""
+A mother's whole journal & kick history as a single CSV, for doctors to load into their own tools.
+
+Every query is read through a server-side cursor (`yield_per`) and each batch of rows is encoded and sent on its own,
+so the memory used stays the same however long the history is. Every date is the mother's local date (kicks too,
+like their daily counts), and "recorded_at" is in UTC. One row per recorded value ("long" format):
+
+    record_type,date,recorded_at,category,name,value,unit
+    note,2025-11-02,,,,"Felt tired today",
+    blood_pressure,2025-11-02,,,systolic,118,mmHg
+    scalar_metric,2025-11-02,,,Weight,64.2,KG
+    binary_metric,2025-11-02,,MOOD,Happy,1,
+    kick,2025-11-02,2025-11-02T09:14:03+00:00,session 12,kick,1,
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import AsyncIterator, Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_schema import (
+    JournalBinaryMetricLog,
+    JournalEntry,
+    JournalScalarMetricLog,
+    KickTrackerDataPoint,
+    KickTrackerSession,
+)
+from app.shared.reference_data import ReferenceData
+from app.shared.utils import local_date, local_timezone
+
+# How many rows are fetched from the database (and sent) at a time
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = ("record_type", "date", "recorded_at", "category", "name", "value", "unit")
+
+# A text cell starting with one of these is run as a formula by spreadsheet apps (i.e. "CSV injection")
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _escape_formula(cell):
+    if isinstance(cell, str) and cell.startswith(FORMULA_PREFIXES):
+        return f"'{cell}"
+    return cell
+
+
+def _encode(rows: Iterable[tuple]) -> str:
+    """The rows as CSV lines, with every text cell that a spreadsheet would evaluate as a formula quoted with `'`."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(tuple(map(_escape_formula, row)) for row in rows)
+    return buffer.getvalue()
+
+
+async def _stream_partitions(db: AsyncSession, stmt) -> AsyncIterator[list]:
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+    async for partition in result.partitions():
+        yield partition
+
+
+async def stream_journal_export_csv(
+    db: AsyncSession, mother_id: UUID, timezone: str | None, ref: ReferenceData
+) -> AsyncIterator[str]:
+    """
+    The CSV's lines, a chunk at a time: the entries' notes & blood pressure, their metrics, then the kicks.
+    `timezone` is the mother's (`PregnantWoman.timezone`), which the kicks' dates are in.
+    """
+    yield _encode([EXPORT_COLUMNS])
+
+    entries_stmt = (
+        select(JournalEntry.logged_on, JournalEntry.content, JournalEntry.systolic, JournalEntry.diastolic)
+        .where(JournalEntry.author_id == mother_id)
+        .order_by(JournalEntry.logged_on)
+    )
+    async for partition in _stream_partitions(db, entries_stmt):
+        rows = []
+        for logged_on, content, systolic, diastolic in partition:
+            if content:
+                rows.append(("note", logged_on, "", "", "", content, ""))
+            if systolic > 0:  # 0 means that it wasn't logged
+                rows.append(("blood_pressure", logged_on, "", "", "systolic", systolic, "mmHg"))
+            if diastolic > 0:
+                rows.append(("blood_pressure", logged_on, "", "", "diastolic", diastolic, "mmHg"))
+        yield _encode(rows)
+
+    scalar_stmt = (
+        select(JournalEntry.logged_on, JournalScalarMetricLog.scalar_metric_id, JournalScalarMetricLog.value)
+        .join(JournalScalarMetricLog, JournalScalarMetricLog.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.author_id == mother_id)
+        .order_by(JournalEntry.logged_on, JournalScalarMetricLog.scalar_metric_id)
+    )
+    async for partition in _stream_partitions(db, scalar_stmt):
+        rows = []
+        for logged_on, metric_id, value in partition:
+            definition = ref.scalar_metrics_by_id[metric_id]
+            rows.append(("scalar_metric", logged_on, "", "", definition.label, value, definition.unit_of_measurement))
+        yield _encode(rows)
+
+    binary_stmt = (
+        select(JournalEntry.logged_on, JournalBinaryMetricLog.binary_metric_id)
+        .join(JournalBinaryMetricLog, JournalBinaryMetricLog.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.author_id == mother_id)
+        .order_by(JournalEntry.logged_on, JournalBinaryMetricLog.binary_metric_id)
+    )
+    async for partition in _stream_partitions(db, binary_stmt):
+        rows = []
+        for logged_on, metric_id in partition:
+            definition = ref.binary_metrics_by_id[metric_id]
+            rows.append(("binary_metric", logged_on, "", definition.category, definition.label, 1, ""))
+        yield _encode(rows)
+
+    kicks_stmt = (
+        select(KickTrackerDataPoint.kick_at, KickTrackerDataPoint.session_id)
+        .join(KickTrackerSession, KickTrackerSession.id == KickTrackerDataPoint.session_id)
+        .where(KickTrackerSession.mother_id == mother_id)
+        .order_by(KickTrackerDataPoint.kick_at)
+    )
+    zone = local_timezone(timezone)
+    async for partition in _stream_partitions(db, kicks_stmt):
+        yield _encode(
+            ("kick", local_date(kick_at, zone), kick_at.isoformat(), f"session {session_id}", "kick", 1, "")
+            for kick_at, session_id in partition
+        )
@@ -1,7 +1,11 @@
 from dataclasses import dataclass
 from datetime import date
+from typing import Literal
+
+from pydantic import Field
 
 from app.core.custom_base_model import CustomBaseModel
+from app.features.journal.journal_series import SeriesBucket, SeriesPeriod
 
 
 @dataclass
@@ -37,6 +41,56 @@ class ScalarMetricView:
     unit_of_measurement: str
 
 
+# ===== Compact format: the metric catalog is fetched once, entries only reference it by ID =====
+@dataclass
+class BinaryMetricDefinitionData:
+    id: int
+    label: str
+    category: str
+
+
+@dataclass
+class ScalarMetricDefinitionData:
+    id: int
+    label: str
+    unit_of_measurement: str
+
+
+class MetricCatalogResponse(CustomBaseModel):
+    binary_metrics: list[BinaryMetricDefinitionData]
+    scalar_metrics: list[ScalarMetricDefinitionData]
+
+
+@dataclass
+class ScalarMetricValue:
+    metric_id: int
+    value: float
+
+
+@dataclass
+class CompactJournalEntry:
+    id: int
+    logged_on: date
+    content: str
+    binary_metric_ids: list[int]  # Only the selected ones
+    scalar_metrics: list[ScalarMetricValue]
+    blood_pressure: BloodPressureData
+    revision: int
+
+
+class CompactJournalEntriesResponse(CustomBaseModel):
+    catalog_etag: str  # The catalog's ETag the entries were written against (re-fetch it when it differs)
+    entries: list[CompactJournalEntry]
+
+
+class MetricSeriesResponse(CustomBaseModel):
+    label: str
+    unit_of_measurement: str
+    bucket: SeriesBucket
+    points: list[SeriesPeriod]
+    downsampled: bool  # Whether each point spans several buckets (i.e. there were more than "max_points")
+
+
 class JournalPreviewData(CustomBaseModel):
     bp_systolic: int | None
     bp_diastolic: int | None
@@ -53,6 +107,13 @@ class GetJournalEntryResponse(CustomBaseModel):
     binary_metrics: list[BinaryMetricCategoryGroup]
     scalar_metrics: list[ScalarMetricView]
     blood_pressure: BloodPressureData
+    revision: int  # What offline edits of this entry are based on (see "/journals/sync")
+
+
+class JournalEntriesPaginatedResponse(CustomBaseModel):
+    entries: list[GetJournalEntryResponse]
+    next_cursor: date | None  # The "logged_on" of the last entry (the next page has the older ones)
+    has_more: bool
 
 
 class UpsertJournalEntryRequest(CustomBaseModel):
@@ -60,3 +121,31 @@ class UpsertJournalEntryRequest(CustomBaseModel):
     binary_metric_ids: list[int] | None = None
     scalar_metrics: list[ScalarMetricUpsert] | None = None
     blood_pressure: BloodPressureData | None = None
+
+
+# ===== Offline sync: many days' edits in one request =====
+JOURNAL_SYNC_MAX_ENTRIES = 366
+
+
+class JournalSyncEntry(UpsertJournalEntryRequest):
+    logged_on: date
+    # The revision of the entry that the edit was made on (None or 0: the day had no entry yet)
+    base_revision: int | None = None
+
+
+class JournalSyncRequest(CustomBaseModel):
+    entries: list[JournalSyncEntry] = Field(max_length=JOURNAL_SYNC_MAX_ENTRIES)
+
+
+@dataclass
+class JournalSyncResult:
+    logged_on: date
+    # "conflict": The entry has changed since (re-fetch it, and redo the edit on "revision")
+    # "invalid": The edit can never be applied (see "detail")
+    status: Literal["applied", "conflict", "invalid"]
+    revision: int | None  # The entry's current revision, if known
+    detail: str | None = None
+
+
+class JournalSyncResponse(CustomBaseModel):
+    results: list[JournalSyncResult]  # In the order of the request's entries
@@ -1,16 +1,25 @@
 from datetime import date
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import require_role
 from app.db.db_config import get_db
-from app.db.db_schema import PregnantWoman, User
+from app.db.db_schema import PregnantWoman, User, VolunteerDoctor
 from app.features.journal.journal_models import (
+    CompactJournalEntriesResponse,
     GetJournalEntryResponse,
+    JournalEntriesPaginatedResponse,
     JournalPreviewData,
+    JournalSyncRequest,
+    JournalSyncResponse,
+    MetricCatalogResponse,
+    MetricSeriesResponse,
     UpsertJournalEntryRequest,
 )
+from app.features.journal.journal_series import BloodPressureSeries, SeriesBucket
 from app.features.journal.journal_service import JournalService
 
 journal_router = APIRouter(prefix="/journals", tags=["Journal"])
@@ -32,6 +41,68 @@ async def get_metrics_template(
     return await service.get_metrics_template()
 
 
+@journal_router.get("/metrics/catalog", response_model=MetricCatalogResponse)
+async def get_metric_catalog(
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    _: User = Depends(require_role(User)),
+    service: JournalService = Depends(get_journal_service),
+):
+    """
+    All binary & scalar metric definitions, for rendering the compact journal entries ("/journals/compact").
+    Changes very rarely, so clients should keep it and revalidate with "If-None-Match" (304 when unchanged).
+    """
+    etag, catalog = await service.get_metric_catalog()
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return catalog
+
+
+@journal_router.get("/metrics/series", response_model=MetricSeriesResponse)
+async def get_metric_series(
+    response: Response,
+    bucket: SeriesBucket = "day",
+    metric_id: int | None = None,
+    blood_pressure: BloodPressureSeries | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    max_points: int = Query(120, ge=1, le=1000),
+    if_none_match: str | None = Header(default=None),
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    service: JournalService = Depends(get_journal_service),
+):
+    """
+    The min / max / avg / last value of a scalar metric ("metric_id") or of the blood pressure, per day/week/month.
+    Revalidate with "If-None-Match" (304 when none of the range's entries changed).
+    Example: GET /journals/metrics/series?metric_id=4&bucket=week&start_date=2025-01-01
+    """
+    etag, series = await service.get_metric_series(
+        mother.id, bucket, max_points, metric_id, blood_pressure, start_date, end_date, if_none_match
+    )
+    if series is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return series
+
+
+@journal_router.get("/compact", response_model=CompactJournalEntriesResponse)
+async def get_compact_journal_entries(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    service: JournalService = Depends(get_journal_service),
+) -> CompactJournalEntriesResponse:
+    """
+    Journal entries (optionally within a date range) with only the selected metrics' IDs & the scalar values,
+    to be rendered against the metric catalog ("/journals/metrics/catalog", whose ETag is "catalog_etag").
+    Example: GET /journals/compact?start_date=2025-11-01&end_date=2025-11-14
+    """
+    return await service.get_compact_journal_entries(mother.id, start_date, end_date)
+
+
 @journal_router.get("/range", response_model=list[GetJournalEntryResponse])
 async def get_journal_entries_in_range(
     start_date: date,
@@ -46,6 +117,24 @@ async def get_journal_entries_in_range(
     return await service.get_journal_entries_in_range(mother.id, start_date, end_date)
 
 
+@journal_router.get("/mothers/{mother_id}/export")
+async def export_mother_journal(
+    mother_id: UUID,
+    doctor: VolunteerDoctor = Depends(require_role(VolunteerDoctor)),
+    service: JournalService = Depends(get_journal_service),
+) -> StreamingResponse:
+    """
+    The mother's whole journal & kick history as a CSV (one row per recorded value), streamed as it is read.
+    Only for the doctors that the mother has had an appointment accepted by.
+    """
+    lines = await service.export_journal_csv(doctor.id, mother_id)
+    return StreamingResponse(
+        lines,
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="journal-{mother_id}.csv"'},
+    )
+
+
 @journal_router.get("/{entry_date}", response_model=JournalPreviewData)
 async def scalar_metrics_and_kick_count_on_date(
     entry_date: date,
@@ -55,11 +144,38 @@ async def scalar_metrics_and_kick_count_on_date(
     return await service.scalar_metrics_and_kick_count_on_date(mother.id, entry_date)
 
 
-@journal_router.get("", response_model=list[GetJournalEntryResponse])
+@journal_router.get("", response_model=JournalEntriesPaginatedResponse)
 async def get_all_journal_entries_for_mother(
-    mother: PregnantWoman = Depends(require_role(PregnantWoman)), service: JournalService = Depends(get_journal_service)
-) -> list[GetJournalEntryResponse]:
-    return await service.get_journal_entries_for_mother(mother.id)
+    limit: int = Query(30, ge=1, le=366),
+    cursor: date | None = None,
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    service: JournalService = Depends(get_journal_service),
+) -> JournalEntriesPaginatedResponse:
+    """
+    The mother's journal entries, newest first.
+    Example: GET /journals?limit=30, then GET /journals?limit=30&cursor=<next_cursor> for the older ones
+    """
+    return await service.get_journal_entries_for_mother(mother.id, limit, cursor)
+
+
+@journal_router.post("/sync", response_model=JournalSyncResponse)
+async def sync_journal_entries(
+    request: JournalSyncRequest,
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    db: AsyncSession = Depends(get_db),
+    service: JournalService = Depends(get_journal_service),
+) -> JournalSyncResponse:
+    """
+    Uploads the edits made offline (to any number of days) in one go, in a single transaction.
+    Each day's edit is only applied if the entry is still at its "base_revision", and gets its own result.
+    """
+    try:
+        result = await service.sync_journal_entries(mother.id, request.entries)
+        await db.commit()
+        return result
+    except:
+        await db.rollback()
+        raise
 
 
 @journal_router.put("/{entry_date}")
@@ -0,0 +1,175 @@
+"""
+Per-period time series of a mother's journal metrics (a scalar metric, or the blood pressure), for the charts.
+
+The periods are aggregated by the database (min / max / avg / count, and the last value through a window function),
+so only one row per period is ever read. Long ranges are then downsampled to at most `max_points` points.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_schema import JournalEntry, JournalScalarMetricLog
+
+SeriesBucket = Literal["day", "week", "month"]
+BloodPressureSeries = Literal["systolic", "diastolic"]
+
+
+@dataclass
+class SeriesPeriod:
+    period_start: date
+    min: float
+    max: float
+    avg: float
+    last: float  # The value of the period's latest entry
+    count: int
+
+
+def _period_start(db: AsyncSession, bucket: SeriesBucket, logged_on):
+    """`date_trunc` on PostgreSQL, and its equivalent on SQLite (the tests). Weeks start on Monday."""
+    if db.get_bind().dialect.name == "sqlite":
+        if bucket == "week":
+            return func.date(logged_on, "weekday 0", "-6 days")
+        if bucket == "month":
+            return func.date(logged_on, "start of month")
+        return func.date(logged_on)
+    return cast(func.date_trunc(bucket, logged_on), Date)
+
+
+def _value_and_filters(
+    mother_id: UUID,
+    scalar_metric_id: int | None,
+    blood_pressure: BloodPressureSeries | None,
+    start: date | None,
+    end: date | None,
+) -> tuple:
+    filters = [JournalEntry.author_id == mother_id]
+    if start is not None:
+        filters.append(JournalEntry.logged_on >= start)
+    if end is not None:
+        filters.append(JournalEntry.logged_on <= end)
+
+    if blood_pressure is not None:
+        value = JournalEntry.systolic if blood_pressure == "systolic" else JournalEntry.diastolic
+        filters.append(value > 0)  # 0 means that it wasn't logged
+        return value, filters
+
+    filters.append(JournalScalarMetricLog.scalar_metric_id == scalar_metric_id)
+    return JournalScalarMetricLog.value, filters
+
+
+def _source(stmt, blood_pressure: BloodPressureSeries | None):
+    if blood_pressure is not None:
+        return stmt.select_from(JournalEntry)
+    return stmt.select_from(JournalEntry).join(
+        JournalScalarMetricLog, JournalScalarMetricLog.journal_entry_id == JournalEntry.id
+    )
+
+
+async def series_etag(
+    db: AsyncSession,
+    mother_id: UUID,
+    scalar_metric_id: int | None,
+    blood_pressure: BloodPressureSeries | None,
+    start: date | None,
+    end: date | None,
+    cache_key: str,
+) -> str:
+    """
+    Changes whenever any entry in the range does (every write bumps the entry's revision), computed with a single
+    aggregate over the range's entries, so that an unchanged series is revalidated without being aggregated.
+    `cache_key` is everything else that shapes the response (i.e. the bucket & max points).
+    """
+    _, filters = _value_and_filters(mother_id, scalar_metric_id, blood_pressure, start, end)
+    stmt = _source(
+        select(
+            func.count(), func.coalesce(func.sum(JournalEntry.id), 0), func.coalesce(func.sum(JournalEntry.revision), 0)
+        ),
+        blood_pressure,
+    ).where(*filters)
+    count, id_sum, revision_sum = (await db.execute(stmt)).one()
+    key = f"{mother_id}:{scalar_metric_id}:{blood_pressure}:{start}:{end}:{cache_key}:{count}:{id_sum}:{revision_sum}"
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+async def get_series_periods(
+    db: AsyncSession,
+    mother_id: UUID,
+    bucket: SeriesBucket,
+    scalar_metric_id: int | None = None,
+    blood_pressure: BloodPressureSeries | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[SeriesPeriod]:
+    """One aggregated row per period (that has any values), in order."""
+    value, filters = _value_and_filters(mother_id, scalar_metric_id, blood_pressure, start, end)
+    period_start = _period_start(db, bucket, JournalEntry.logged_on)
+
+    # Every value, alongside its period's last value (the same for all the period's rows)
+    values = (
+        _source(
+            select(
+                period_start.label("period_start"),
+                value.label("value"),
+                func.first_value(value)
+                .over(partition_by=period_start, order_by=JournalEntry.logged_on.desc())
+                .label("last"),
+            ),
+            blood_pressure,
+        )
+        .where(*filters)
+        .subquery()
+    )
+    stmt = (
+        select(
+            values.c.period_start,
+            func.min(values.c.value),
+            func.max(values.c.value),
+            func.avg(values.c.value),
+            func.max(values.c.last),
+            func.count(),
+        )
+        .group_by(values.c.period_start)
+        .order_by(values.c.period_start)
+    )
+    return [
+        SeriesPeriod(
+            period_start=row[0] if isinstance(row[0], date) else date.fromisoformat(row[0]),
+            min=float(row[1]),
+            max=float(row[2]),
+            avg=float(row[3]),
+            last=float(row[4]),
+            count=int(row[5]),
+        )
+        for row in (await db.execute(stmt)).all()
+    ]
+
+
+def downsample(periods: list[SeriesPeriod], max_points: int) -> list[SeriesPeriod]:
+    """Merges runs of consecutive periods so that there are at most `max_points` (each starting at its first period)."""
+    if len(periods) <= max_points:
+        return periods
+
+    run_length = -(-len(periods) // max_points)  # Ceil division
+    merged = []
+    for i in range(0, len(periods), run_length):
+        run = periods[i : i + run_length]
+        count = sum(period.count for period in run)
+        merged.append(
+            SeriesPeriod(
+                period_start=run[0].period_start,
+                min=min(period.min for period in run),
+                max=max(period.max for period in run),
+                avg=sum(period.avg * period.count for period in run) / count,
+                last=run[-1].last,
+                count=count,
+            )
+        )
+    return merged
@@ -1,31 +1,52 @@
 from collections import defaultdict
-from datetime import date, datetime, time, timedelta
-from typing import Sequence
+from datetime import date
+from typing import AsyncIterator
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import and_, delete, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.db.db_schema import (
-    BinaryMetric,
+    Appointment,
+    AppointmentStatus,
     JournalBinaryMetricLog,
     JournalEntry,
     JournalScalarMetricLog,
-    KickTrackerDataPoint,
-    KickTrackerSession,
-    ScalarMetric,
+    KickDailyRollup,
+    PregnantWoman,
 )
+from app.db.db_upsert import dialect_insert
+from app.features.journal.journal_export import stream_journal_export_csv
 from app.features.journal.journal_models import (
     BinaryMetricCategoryGroup,
+    BinaryMetricDefinitionData,
     BinaryMetricView,
     BloodPressureData,
+    CompactJournalEntriesResponse,
+    CompactJournalEntry,
     GetJournalEntryResponse,
+    JournalEntriesPaginatedResponse,
     JournalPreviewData,
+    JournalSyncEntry,
+    JournalSyncResponse,
+    JournalSyncResult,
+    MetricCatalogResponse,
+    MetricSeriesResponse,
+    ScalarMetricDefinitionData,
+    ScalarMetricValue,
     ScalarMetricView,
     UpsertJournalEntryRequest,
 )
+from app.features.journal.journal_series import (
+    BloodPressureSeries,
+    SeriesBucket,
+    downsample,
+    get_series_periods,
+    series_etag,
+)
+from app.shared.reference_data import ReferenceData, reference_data_cache
 
 
 class JournalService:
@@ -33,172 +54,462 @@ class JournalService:
         self.db = db
 
     async def scalar_metrics_and_kick_count_on_date(self, mother_id: UUID, entry_date: date) -> JournalPreviewData:
+        preview = await self.get_preview_metrics(mother_id, entry_date)
+        preview.kick_count = await self.count_kicks_on_date(mother_id, entry_date)
+        return preview
+
+    async def get_preview_metrics(self, mother_id: UUID, entry_date: date) -> JournalPreviewData:
+        """The day's blood pressure & preview scalar metrics (without the kick count), in a single query."""
+        metric_ids = (await reference_data_cache.get(self.db)).preview_metric_ids
         stmt = (
-            select(JournalEntry)
-            .where(JournalEntry.author_id == mother_id, JournalEntry.logged_on == entry_date)
-            .options(
-                selectinload(JournalEntry.journal_scalar_metric_logs).joinedload(JournalScalarMetricLog.scalar_metric)
+            select(
+                JournalEntry.systolic,
+                JournalEntry.diastolic,
+                JournalScalarMetricLog.scalar_metric_id,
+                JournalScalarMetricLog.value,
+            )
+            .outerjoin(
+                JournalScalarMetricLog,
+                and_(
+                    JournalScalarMetricLog.journal_entry_id == JournalEntry.id,
+                    JournalScalarMetricLog.scalar_metric_id.in_(metric_ids.values()),
+                ),
             )
+            .where(JournalEntry.author_id == mother_id, JournalEntry.logged_on == entry_date)
         )
-        entry: JournalEntry | None = (await self.db.execute(stmt)).scalars().first()
+        rows = (await self.db.execute(stmt)).all()  # One per logged preview metric (or one without any)
 
         bp_systolic = None
         bp_diastolic = None
-        sugar_level = 0
-        heart_rate = 0
-        weight = 0
-
-        if entry is not None:
-            if entry.systolic > 0 and entry.diastolic > 0:
-                bp_systolic = entry.systolic
-                bp_diastolic = entry.diastolic
-
-            for log in entry.journal_scalar_metric_logs:
-                label_lower = log.scalar_metric.label.lower()
-
-                if "sugar" in label_lower:
-                    sugar_level = int(log.value)
-                elif "heart" in label_lower:
-                    heart_rate = int(log.value)
-                elif "weight" in label_lower:
-                    weight = int(log.value)
-
-        start_of_day = datetime.combine(entry_date, time.min)
-        end_of_day = start_of_day + timedelta(days=1)
-        kicks_stmt = (
-            select(func.count(KickTrackerDataPoint.id))
-            .join(KickTrackerSession, KickTrackerDataPoint.session_id == KickTrackerSession.id)
-            .where(
-                KickTrackerSession.mother_id == mother_id,
-                KickTrackerDataPoint.kick_at >= start_of_day,
-                KickTrackerDataPoint.kick_at < end_of_day,
-            )
-        )
-        kick_count = (await self.db.execute(kicks_stmt)).scalar_one_or_none()
+        if rows and rows[0].systolic > 0 and rows[0].diastolic > 0:
+            bp_systolic = rows[0].systolic
+            bp_diastolic = rows[0].diastolic
+        values = {row.scalar_metric_id: row.value for row in rows if row.scalar_metric_id is not None}
 
         return JournalPreviewData(
             bp_systolic=bp_systolic,
             bp_diastolic=bp_diastolic,
-            sugar_level=sugar_level,
-            heart_rate=heart_rate,
-            weight=weight,
-            kick_count=kick_count,
+            sugar_level=int(values.get(metric_ids.get("sugar_level"), 0)),
+            heart_rate=int(values.get(metric_ids.get("heart_rate"), 0)),
+            weight=int(values.get(metric_ids.get("weight"), 0)),
+            kick_count=None,
+        )
+
+    async def count_kicks_on_date(self, mother_id: UUID, entry_date: date) -> int:
+        """From the daily kick rollup (by the mother's local date, like the journal's)"""
+        stmt = select(KickDailyRollup.kick_count).where(
+            KickDailyRollup.mother_id == mother_id, KickDailyRollup.day == entry_date
         )
+        return (await self.db.execute(stmt)).scalar_one_or_none() or 0
 
-    async def get_journal_entries_for_mother(self, mother_id: UUID) -> list[GetJournalEntryResponse]:
-        # Fetch all possible options
-        #
-        # We need this to render the "unselected" options (False).
-        # We sort by ID so the UI always renders them in the same order.
-        binary_defs_result = await self.db.execute(select(BinaryMetric).order_by(BinaryMetric.id))
-        all_binary_defs: Sequence[BinaryMetric] = binary_defs_result.scalars().all()
+    @staticmethod
+    def _to_response(entry: JournalEntry, ref: ReferenceData) -> GetJournalEntryResponse:
+        selected_ids: set[int] = {log.binary_metric_id for log in entry.journal_binary_metric_logs}
 
-        # Fetch user data
+        # Every option is rendered (the unselected ones as False), in the same order
+        grouped_binary: defaultdict[str, list[BinaryMetricView]] = defaultdict(list)
+        for definition in ref.binary_metrics:
+            view_model = BinaryMetricView(
+                metric_id=definition.id,  # ID for future edits
+                label=definition.label,  # Text for display
+                category=definition.category,
+                is_selected=definition.id in selected_ids,
+            )
+            grouped_binary[definition.category].append(view_model)
+
+        binary_metrics_response: list[BinaryMetricCategoryGroup] = [  # Convert to list
+            BinaryMetricCategoryGroup(category=cat, binary_metric_logs=logs) for cat, logs in grouped_binary.items()
+        ]
+
+        scalar_metrics_response = []
+        for log in entry.journal_scalar_metric_logs:
+            definition = ref.scalar_metrics_by_id[log.scalar_metric_id]
+            scalar_metrics_response.append(
+                ScalarMetricView(
+                    metric_id=definition.id,  # ID for future edits
+                    label=definition.label,
+                    value=log.value,
+                    unit_of_measurement=definition.unit_of_measurement,
+                )
+            )
+
+        return GetJournalEntryResponse(
+            id=entry.id,
+            logged_on=entry.logged_on,
+            content=entry.content,
+            binary_metrics=binary_metrics_response,
+            scalar_metrics=scalar_metrics_response,
+            blood_pressure=BloodPressureData(systolic=entry.systolic, diastolic=entry.diastolic),
+            revision=entry.revision,
+        )
+
+    async def get_journal_entries_for_mother(
+        self, mother_id: UUID, limit: int, cursor: date | None = None
+    ) -> JournalEntriesPaginatedResponse:
+        """
+        The mother's entries, newest first, `limit` at a time.
+        There is at most one entry per day, so the last entry's date is all the cursor needs to be.
+        """
+        # The metric definitions come from the in-memory reference data, so only the entries are queried
+        ref = await reference_data_cache.get(self.db)
         stmt = (
             select(JournalEntry)
             .where(JournalEntry.author_id == mother_id)
             .options(
                 selectinload(JournalEntry.journal_binary_metric_logs),
-                selectinload(JournalEntry.journal_scalar_metric_logs).joinedload(JournalScalarMetricLog.scalar_metric),
+                selectinload(JournalEntry.journal_scalar_metric_logs),
             )
             .order_by(JournalEntry.logged_on.desc())
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            stmt = stmt.where(JournalEntry.logged_on < cursor)
+        entries = (await self.db.execute(stmt)).scalars().all()
+
+        # The extra entry only tells whether there is another page
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        return JournalEntriesPaginatedResponse(
+            entries=[self._to_response(entry, ref) for entry in entries],
+            next_cursor=entries[-1].logged_on if has_more else None,
+            has_more=has_more,
         )
-        entries_result = await self.db.execute(stmt)
-        entries = entries_result.scalars().all()
-
-        response_list: list[GetJournalEntryResponse] = []
-        for entry in entries:
-            selected_ids: set[int] = {log.binary_metric_id for log in entry.journal_binary_metric_logs}
 
-            grouped_binary: defaultdict[str, list[BinaryMetricView]] = defaultdict(list)
-            for definition in all_binary_defs:
-                is_selected: bool = definition.id in selected_ids
-                view_model = BinaryMetricView(
-                    metric_id=definition.id,  # ID for future edits
-                    label=definition.label,  # Text for display
-                    category=definition.category.value,
-                    is_selected=is_selected,
-                )
-                grouped_binary[definition.category.value].append(view_model)
-
-            binary_metrics_response: list[BinaryMetricCategoryGroup] = [  # Convert to list
-                BinaryMetricCategoryGroup(category=cat, binary_metric_logs=logs) for cat, logs in grouped_binary.items()
-            ]
-
-            scalar_metrics_response = []
-            for log in entry.journal_scalar_metric_logs:
-                scalar_metrics_response.append(
-                    ScalarMetricView(
-                        metric_id=log.scalar_metric.id,  # ID for future edits
-                        label=log.scalar_metric.label,
-                        value=log.value,
-                        unit_of_measurement=log.scalar_metric.unit_of_measurement,
-                    )
+    async def get_metric_catalog(self) -> tuple[str, MetricCatalogResponse]:
+        """Returns: (the catalog's ETag, the catalog)"""
+        ref = await reference_data_cache.get(self.db)
+        catalog = MetricCatalogResponse(
+            binary_metrics=[
+                BinaryMetricDefinitionData(id=metric.id, label=metric.label, category=metric.category)
+                for metric in ref.binary_metrics
+            ],
+            scalar_metrics=[
+                ScalarMetricDefinitionData(
+                    id=metric.id, label=metric.label, unit_of_measurement=metric.unit_of_measurement
                 )
+                for metric in ref.scalar_metrics
+            ],
+        )
+        return ref.metric_catalog_etag, catalog
+
+    async def get_metric_series(
+        self,
+        mother_id: UUID,
+        bucket: SeriesBucket,
+        max_points: int,
+        scalar_metric_id: int | None = None,
+        blood_pressure: BloodPressureSeries | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        if_none_match: str | None = None,
+    ) -> tuple[str, MetricSeriesResponse | None]:
+        """Returns: (the series' ETag, the series), the series being None when it matches `if_none_match`."""
+        if (scalar_metric_id is None) == (blood_pressure is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Either metric_id or blood_pressure is required"
+            )
+        if start_date is not None and end_date is not None and start_date > end_date:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be before end_date")
+
+        if blood_pressure is not None:
+            label, unit_of_measurement = blood_pressure.capitalize(), "mmHg"
+        else:
+            definition = (await reference_data_cache.get(self.db)).scalar_metrics_by_id.get(scalar_metric_id)
+            if definition is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scalar metric not found")
+            label, unit_of_measurement = definition.label, definition.unit_of_measurement
+
+        etag = await series_etag(
+            self.db, mother_id, scalar_metric_id, blood_pressure, start_date, end_date, f"{bucket}:{max_points}"
+        )
+        if if_none_match == etag:
+            return etag, None
 
-            response_list.append(
-                GetJournalEntryResponse(
-                    id=entry.id,
-                    logged_on=entry.logged_on,
-                    content=entry.content,
-                    binary_metrics=binary_metrics_response,
-                    scalar_metrics=scalar_metrics_response,
-                    blood_pressure=BloodPressureData(systolic=entry.systolic, diastolic=entry.diastolic),
-                )
+        periods = await get_series_periods(
+            self.db, mother_id, bucket, scalar_metric_id, blood_pressure, start_date, end_date
+        )
+        points = downsample(periods, max_points)
+        return etag, MetricSeriesResponse(
+            label=label,
+            unit_of_measurement=unit_of_measurement,
+            bucket=bucket,
+            points=points,
+            downsampled=len(points) < len(periods),
+        )
+
+    async def get_compact_journal_entries(
+        self, mother_id: UUID, start_date: date | None = None, end_date: date | None = None
+    ) -> CompactJournalEntriesResponse:
+        """
+        The same entries as `get_journal_entries_in_range` (or all of them), but only with the selected metrics' IDs,
+        i.e. without expanding the whole metric catalog into every entry. Plain column reads, no ORM objects.
+        """
+        ref = await reference_data_cache.get(self.db)
+
+        filters = [JournalEntry.author_id == mother_id]
+        if start_date is not None:
+            filters.append(JournalEntry.logged_on >= start_date)
+        if end_date is not None:
+            filters.append(JournalEntry.logged_on <= end_date)
+
+        entries_stmt = (
+            select(
+                JournalEntry.id,
+                JournalEntry.logged_on,
+                JournalEntry.content,
+                JournalEntry.systolic,
+                JournalEntry.diastolic,
+                JournalEntry.revision,
             )
-        return response_list
+            .where(*filters)
+            .order_by(JournalEntry.logged_on.desc())
+        )
+        binary_stmt = (
+            select(JournalBinaryMetricLog.journal_entry_id, JournalBinaryMetricLog.binary_metric_id)
+            .join(JournalEntry, JournalEntry.id == JournalBinaryMetricLog.journal_entry_id)
+            .where(*filters)
+            .order_by(JournalBinaryMetricLog.binary_metric_id)
+        )
+        scalar_stmt = (
+            select(
+                JournalScalarMetricLog.journal_entry_id,
+                JournalScalarMetricLog.scalar_metric_id,
+                JournalScalarMetricLog.value,
+            )
+            .join(JournalEntry, JournalEntry.id == JournalScalarMetricLog.journal_entry_id)
+            .where(*filters)
+            .order_by(JournalScalarMetricLog.scalar_metric_id)
+        )
+
+        binary_ids: defaultdict[int, list[int]] = defaultdict(list)
+        for entry_id, metric_id in (await self.db.execute(binary_stmt)).all():
+            binary_ids[entry_id].append(metric_id)
+        scalar_values: defaultdict[int, list[ScalarMetricValue]] = defaultdict(list)
+        for entry_id, metric_id, value in (await self.db.execute(scalar_stmt)).all():
+            scalar_values[entry_id].append(ScalarMetricValue(metric_id=metric_id, value=value))
+
+        return CompactJournalEntriesResponse(
+            catalog_etag=ref.metric_catalog_etag,
+            entries=[
+                CompactJournalEntry(
+                    id=row.id,
+                    logged_on=row.logged_on,
+                    content=row.content,
+                    binary_metric_ids=binary_ids.get(row.id, []),
+                    scalar_metrics=scalar_values.get(row.id, []),
+                    blood_pressure=BloodPressureData(systolic=row.systolic, diastolic=row.diastolic),
+                    revision=row.revision,
+                )
+                for row in (await self.db.execute(entries_stmt)).all()
+            ],
+        )
 
     async def upsert_journal_entry(self, mother_id: UUID, entry_date: date, request: UpsertJournalEntryRequest) -> None:
+        """
+        Creates or updates the mother's entry for the day, touching only what the request changes:
+        the entry itself is a single INSERT ... ON CONFLICT (author_id, logged_on), and for each kind of log
+        that the request provides, the new/changed ones are upserted & the dropped ones deleted in one statement each.
+        """
         if entry_date > date.today():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Journal entry date cannot be in the future"
             )
 
-        # 1. Check for Existing Entry (Eager load relationships for update/create)
-        stmt = (
-            select(JournalEntry)
-            .options(
-                selectinload(JournalEntry.author),
-                selectinload(JournalEntry.journal_binary_metric_logs).joinedload(JournalBinaryMetricLog.binary_metric),
-                selectinload(JournalEntry.journal_scalar_metric_logs).joinedload(JournalScalarMetricLog.scalar_metric),
-            )
-            .where(JournalEntry.author_id == mother_id, JournalEntry.logged_on == entry_date)
+        entry_id = await self._upsert_entry_row(mother_id, entry_date, request)
+
+        if request.binary_metric_ids is not None:
+            await self._sync_binary_logs({entry_id: set(request.binary_metric_ids)})
+
+        if request.scalar_metrics is not None:
+            # If a metric is repeated, the last value wins
+            await self._sync_scalar_logs({entry_id: {sm.metric_id: sm.value for sm in request.scalar_metrics}})
+
+    async def _upsert_entry_row(self, mother_id: UUID, entry_date: date, request: UpsertJournalEntryRequest) -> int:
+        stmt = dialect_insert(self.db, JournalEntry).values(
+            author_id=mother_id,
+            logged_on=entry_date,
+            content=request.content or "",
+            systolic=request.blood_pressure.systolic if request.blood_pressure else 0,
+            diastolic=request.blood_pressure.diastolic if request.blood_pressure else 0,
+            revision=1,
         )
-        result = await self.db.execute(stmt)
-        entry = result.scalars().first()
-
-        if entry is None:
-            entry = JournalEntry(
-                author_id=mother_id,
-                logged_on=entry_date,
-                content=request.content or "",
-                systolic=request.blood_pressure.systolic if request.blood_pressure else 0,
-                diastolic=request.blood_pressure.diastolic if request.blood_pressure else 0,
+
+        # An existing entry only gets the fields that were provided (and a new revision, see "/journals/sync")
+        updates = {"revision": JournalEntry.revision + 1}
+        if request.content is not None:
+            updates["content"] = stmt.excluded.content
+        if request.blood_pressure is not None:
+            updates["systolic"] = stmt.excluded.systolic
+            updates["diastolic"] = stmt.excluded.diastolic
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JournalEntry.author_id, JournalEntry.logged_on], set_=updates
+        ).returning(JournalEntry.id)
+        return (await self.db.execute(stmt)).scalar_one()
+
+    async def _sync_binary_logs(self, selections: dict[int, set[int]]) -> None:
+        """
+        Makes the given metric IDs each entry's (entry ID -> metric IDs) selected binary metrics,
+        leaving the ones that are already selected alone.
+        """
+        pairs = [(entry_id, metric_id) for entry_id, metric_ids in selections.items() for metric_id in metric_ids]
+        if pairs:
+            insert_stmt = dialect_insert(self.db, JournalBinaryMetricLog).values(
+                [{"journal_entry_id": entry_id, "binary_metric_id": metric_id} for entry_id, metric_id in pairs]
             )
-            self.db.add(entry)
-            await self.db.flush()
+            await self.db.execute(insert_stmt.on_conflict_do_nothing())
 
-            # Refresh the entry with eager loading to prevent greenlet spawn errors
-            await self.db.refresh(entry, ["journal_binary_metric_logs", "journal_scalar_metric_logs"])
+        await self.db.execute(
+            delete(JournalBinaryMetricLog).where(
+                JournalBinaryMetricLog.journal_entry_id.in_(selections),
+                tuple_(JournalBinaryMetricLog.journal_entry_id, JournalBinaryMetricLog.binary_metric_id).not_in(pairs),
+            )
+        )
 
-        if request.content is not None:
-            entry.content = request.content
+    async def _sync_scalar_logs(self, values: dict[int, dict[int, float]]) -> None:
+        """
+        Makes the given values each entry's (entry ID -> metric ID -> value) scalar metrics,
+        without rewriting the unchanged ones.
+        """
+        rows = [
+            {"journal_entry_id": entry_id, "scalar_metric_id": metric_id, "value": value}
+            for entry_id, entry_values in values.items()
+            for metric_id, value in entry_values.items()
+        ]
+        if rows:
+            insert_stmt = dialect_insert(self.db, JournalScalarMetricLog).values(rows)
+            await self.db.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=[JournalScalarMetricLog.journal_entry_id, JournalScalarMetricLog.scalar_metric_id],
+                    set_={"value": insert_stmt.excluded.value},
+                    where=JournalScalarMetricLog.value != insert_stmt.excluded.value,
+                )
+            )
 
-        if request.blood_pressure is not None:
-            entry.systolic = request.blood_pressure.systolic
-            entry.diastolic = request.blood_pressure.diastolic
+        await self.db.execute(
+            delete(JournalScalarMetricLog).where(
+                JournalScalarMetricLog.journal_entry_id.in_(values),
+                tuple_(JournalScalarMetricLog.journal_entry_id, JournalScalarMetricLog.scalar_metric_id).not_in(
+                    [(row["journal_entry_id"], row["scalar_metric_id"]) for row in rows]
+                ),
+            )
+        )
 
-        if request.scalar_metrics is not None:
-            entry.journal_scalar_metric_logs.clear()
-            for sm in request.scalar_metrics:
-                entry.journal_scalar_metric_logs.append(
-                    JournalScalarMetricLog(scalar_metric_id=sm.metric_id, value=sm.value)
+    def _validate_sync_entry(self, entry: JournalSyncEntry, ref: ReferenceData, seen_dates: set[date]) -> str | None:
+        """Returns why the entry can't be applied (or None)."""
+        if entry.logged_on in seen_dates:
+            return "The same date is in the batch more than once"
+        if entry.logged_on > date.today():
+            return "Journal entry date cannot be in the future"
+        if entry.binary_metric_ids is not None and not {m.id for m in ref.binary_metrics}.issuperset(
+            entry.binary_metric_ids
+        ):
+            return "Unknown binary metric"
+        if entry.scalar_metrics is not None and not ref.scalar_metrics_by_id.keys() >= {
+            sm.metric_id for sm in entry.scalar_metrics
+        }:
+            return "Unknown scalar metric"
+        return None
+
+    async def sync_journal_entries(self, mother_id: UUID, entries: list[JournalSyncEntry]) -> JournalSyncResponse:
+        """
+        Applies a batch of (offline) edits, each only if the day's entry is still at the revision the edit was based on.
+        Everything is validated up front, and then written with one statement per table (doesn't commit).
+        """
+        ref = await reference_data_cache.get(self.db)
+        results: list[JournalSyncResult | None] = [None] * len(entries)
+
+        valid: list[int] = []
+        seen_dates: set[date] = set()
+        for idx, entry in enumerate(entries):
+            detail = self._validate_sync_entry(entry, ref, seen_dates)
+            seen_dates.add(entry.logged_on)
+            if detail is None:
+                valid.append(idx)
+            else:
+                results[idx] = JournalSyncResult(
+                    logged_on=entry.logged_on, status="invalid", revision=None, detail=detail
                 )
 
-        if request.binary_metric_ids is not None:
-            entry.journal_binary_metric_logs.clear()
-            for bm_id in request.binary_metric_ids:
-                entry.journal_binary_metric_logs.append(JournalBinaryMetricLog(binary_metric_id=bm_id))
+        current_stmt = select(
+            JournalEntry.logged_on,
+            JournalEntry.content,
+            JournalEntry.systolic,
+            JournalEntry.diastolic,
+            JournalEntry.revision,
+        ).where(
+            JournalEntry.author_id == mother_id, JournalEntry.logged_on.in_([entries[idx].logged_on for idx in valid])
+        )
+        current = {row.logged_on: row for row in (await self.db.execute(current_stmt)).all()} if valid else {}
+
+        # The full rows to write (the fields that an edit leaves out are the current ones)
+        to_write: dict[int, dict] = {}
+        for idx in valid:
+            entry = entries[idx]
+            row = current.get(entry.logged_on)
+            current_revision = row.revision if row is not None else None
+            # Revisions start at 1, so a 0 (the template's, see "/journals/metrics/template") is also "no entry yet"
+            if (current_revision or 0) != (entry.base_revision or 0):
+                results[idx] = JournalSyncResult(
+                    logged_on=entry.logged_on,
+                    status="conflict",
+                    revision=current_revision,
+                    detail="The entry was changed since this edit was made",
+                )
+                continue
+
+            bp = entry.blood_pressure
+            to_write[idx] = {
+                "author_id": mother_id,
+                "logged_on": entry.logged_on,
+                "content": entry.content if entry.content is not None else (row.content if row is not None else ""),
+                "systolic": bp.systolic if bp is not None else (row.systolic if row is not None else 0),
+                "diastolic": bp.diastolic if bp is not None else (row.diastolic if row is not None else 0),
+                "revision": (current_revision or 0) + 1,
+            }
+
+        written = {}
+        if to_write:
+            stmt = dialect_insert(self.db, JournalEntry).values(list(to_write.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[JournalEntry.author_id, JournalEntry.logged_on],
+                set_={
+                    "content": stmt.excluded.content,
+                    "systolic": stmt.excluded.systolic,
+                    "diastolic": stmt.excluded.diastolic,
+                    "revision": stmt.excluded.revision,
+                },
+                # Also catches a concurrent write that happened after the read above (the row isn't returned)
+                where=JournalEntry.revision == stmt.excluded.revision - 1,
+            ).returning(JournalEntry.id, JournalEntry.logged_on, JournalEntry.revision)
+            written = {row.logged_on: row for row in (await self.db.execute(stmt)).all()}
+
+        selections: dict[int, set[int]] = {}
+        values: dict[int, dict[int, float]] = {}
+        for idx in to_write:
+            entry = entries[idx]
+            row = written.get(entry.logged_on)
+            if row is None:
+                results[idx] = JournalSyncResult(
+                    logged_on=entry.logged_on,
+                    status="conflict",
+                    revision=None,
+                    detail="The entry was changed while syncing",
+                )
+                continue
+
+            results[idx] = JournalSyncResult(logged_on=entry.logged_on, status="applied", revision=row.revision)
+            if entry.binary_metric_ids is not None:
+                selections[row.id] = set(entry.binary_metric_ids)
+            if entry.scalar_metrics is not None:
+                values[row.id] = {sm.metric_id: sm.value for sm in entry.scalar_metrics}
+
+        if selections:
+            await self._sync_binary_logs(selections)
+        if values:
+            await self._sync_scalar_logs(values)
+
+        return JournalSyncResponse(results=[result for result in results if result is not None])
 
     async def get_journal_entries_in_range(
         self, mother_id: UUID, start_date: date, end_date: date
@@ -207,11 +518,7 @@ class JournalService:
         Fetch journal entries within a date range.
         This enables efficient sliding window fetching.
         """
-        # Fetch all possible binary metric options
-        binary_defs_result = await self.db.execute(select(BinaryMetric).order_by(BinaryMetric.id))
-        all_binary_defs: Sequence[BinaryMetric] = binary_defs_result.scalars().all()
-
-        # Fetch entries in date range
+        ref = await reference_data_cache.get(self.db)
         stmt = (
             select(JournalEntry)
             .where(
@@ -221,54 +528,29 @@ class JournalService:
             )
             .options(
                 selectinload(JournalEntry.journal_binary_metric_logs),
-                selectinload(JournalEntry.journal_scalar_metric_logs).joinedload(JournalScalarMetricLog.scalar_metric),
+                selectinload(JournalEntry.journal_scalar_metric_logs),
             )
             .order_by(JournalEntry.logged_on.desc())
         )
-        entries_result = await self.db.execute(stmt)
-        entries = entries_result.scalars().all()
-
-        response_list: list[GetJournalEntryResponse] = []
-        for entry in entries:
-            selected_ids: set[int] = {log.binary_metric_id for log in entry.journal_binary_metric_logs}
-
-            grouped_binary: defaultdict[str, list[BinaryMetricView]] = defaultdict(list)
-            for definition in all_binary_defs:
-                is_selected: bool = definition.id in selected_ids
-                view_model = BinaryMetricView(
-                    metric_id=definition.id,
-                    label=definition.label,
-                    category=definition.category.value,
-                    is_selected=is_selected,
-                )
-                grouped_binary[definition.category.value].append(view_model)
-
-            binary_metrics_response: list[BinaryMetricCategoryGroup] = [
-                BinaryMetricCategoryGroup(category=cat, binary_metric_logs=logs) for cat, logs in grouped_binary.items()
-            ]
-
-            scalar_metrics_response = []
-            for log in entry.journal_scalar_metric_logs:
-                scalar_metrics_response.append(
-                    ScalarMetricView(
-                        metric_id=log.scalar_metric.id,
-                        label=log.scalar_metric.label,
-                        value=log.value,
-                        unit_of_measurement=log.scalar_metric.unit_of_measurement,
-                    )
-                )
-
-            response_list.append(
-                GetJournalEntryResponse(
-                    id=entry.id,
-                    logged_on=entry.logged_on,
-                    content=entry.content,
-                    binary_metrics=binary_metrics_response,
-                    scalar_metrics=scalar_metrics_response,
-                    blood_pressure=BloodPressureData(systolic=entry.systolic, diastolic=entry.diastolic),
-                )
+        entries = (await self.db.execute(stmt)).scalars().all()
+        return [self._to_response(entry, ref) for entry in entries]
+
+    async def export_journal_csv(self, doctor_id: UUID, mother_id: UUID) -> AsyncIterator[str]:
+        """Only for the doctors that the mother has had an appointment accepted by."""
+        appointment_stmt = select(Appointment.id).where(
+            Appointment.volunteer_doctor_id == doctor_id,
+            Appointment.mother_id == mother_id,
+            Appointment.status == AppointmentStatus.ACCEPTED,
+        )
+        if (await self.db.execute(appointment_stmt.limit(1))).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only export the journals of mothers whose appointment you accepted",
             )
-        return response_list
+        timezone_stmt = select(PregnantWoman.timezone).where(PregnantWoman.id == mother_id)
+        mother_timezone = (await self.db.execute(timezone_stmt)).scalar_one_or_none()
+        ref = await reference_data_cache.get(self.db)
+        return stream_journal_export_csv(self.db, mother_id, mother_timezone, ref)
 
     async def delete_journal_entry(self, mother_id: UUID, entry_date: date) -> None:
         stmt = select(JournalEntry).where(JournalEntry.logged_on == entry_date, JournalEntry.author_id == mother_id)
@@ -284,24 +566,18 @@ class JournalService:
         Returns a template with all available binary and scalar metrics.
         Useful for rendering the journal UI when no entries exist yet.
         """
-        # Fetch all binary metrics
-        binary_defs_result = await self.db.execute(select(BinaryMetric).order_by(BinaryMetric.id))
-        all_binary_defs: Sequence[BinaryMetric] = binary_defs_result.scalars().all()
-
-        # Fetch all scalar metrics
-        scalar_defs_result = await self.db.execute(select(ScalarMetric).order_by(ScalarMetric.id))
-        all_scalar_defs: Sequence[ScalarMetric] = scalar_defs_result.scalars().all()
+        ref = await reference_data_cache.get(self.db)
 
         # Group binary metrics by category (all unselected)
         grouped_binary: defaultdict[str, list[BinaryMetricView]] = defaultdict(list)
-        for definition in all_binary_defs:
+        for definition in ref.binary_metrics:
             view_model = BinaryMetricView(
                 metric_id=definition.id,
                 label=definition.label,
-                category=definition.category.value,
+                category=definition.category,
                 is_selected=False,
             )
-            grouped_binary[definition.category.value].append(view_model)
+            grouped_binary[definition.category].append(view_model)
 
         binary_metrics_response: list[BinaryMetricCategoryGroup] = [
             BinaryMetricCategoryGroup(category=cat, binary_metric_logs=logs) for cat, logs in grouped_binary.items()
@@ -309,7 +585,7 @@ class JournalService:
 
         # Create scalar metrics list with zero values
         scalar_metrics_response = []
-        for definition in all_scalar_defs:
+        for definition in ref.scalar_metrics:
             scalar_metrics_response.append(
                 ScalarMetricView(
                     metric_id=definition.id,
@@ -327,4 +603,5 @@ class JournalService:
             binary_metrics=binary_metrics_response,
             scalar_metrics=scalar_metrics_response,
             blood_pressure=BloodPressureData(systolic=0, diastolic=0),
+            revision=0,
         )
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
+from pydantic import Field
+
 from app.core.custom_base_model import CustomBaseModel
 
 
@@ -9,6 +11,10 @@ class KickRecordRequest(CustomBaseModel):
     kick_at: datetime | None = None
 
 
+class KickBatchRecordRequest(CustomBaseModel):
+    kick_at: list[datetime] = Field(min_length=1, max_length=1000)
+
+
 class KickSessionStartResponse(CustomBaseModel):
     session_id: int
     started_at: datetime
@@ -32,6 +38,13 @@ class KickDailyCount(CustomBaseModel):
     kick_count: int
 
 
+class KickBatchRecordResponse(CustomBaseModel):
+    session_id: int
+    recorded_count: int
+    session_kick_count: int
+    days: list[KickDailyCount]  # The new counts of the days that the kicks were added to
+
+
 class KickCountsResponse(CustomBaseModel):
     start_date: date
     end_date: date
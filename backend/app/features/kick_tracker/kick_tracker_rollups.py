@@ -0,0 +1,188 @@
+"""
+Kick counters maintained on insert: each session's `kick_count`, and each mother's per-day `KickDailyRollup`
+(by her local date), so that recording a kick (or reading the counts) never counts `kick_tracker_data_points`.
+
+Every insert into `kick_tracker_data_points` must go through `add_kick` / `add_kicks` (in the same transaction), and
+anything that writes kicks in bulk (seeding) rebuilds the counters with `rebuild_kick_counts`. A mother's timezone
+change moves her kicks' local dates, so her rollups are rebuilt with `rebuild_mother_kick_days` in that transaction.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.db_schema import KickDailyRollup, KickTrackerDataPoint, KickTrackerSession, PregnantWoman
+from app.db.db_upsert import dialect_insert
+from app.shared.utils import local_date, local_timezone
+
+# How many kicks are read at a time when rebuilding the counters
+REBUILD_CHUNK_SIZE = 5000
+
+
+@dataclass
+class AddedKick:
+    kick_id: int
+    session_id: int
+    session_kick_count: int
+    day_kick_count: int
+
+
+@dataclass
+class AddedKicks:
+    session_id: int
+    session_kick_count: int
+    day_kick_counts: dict[date, int]  # Of the days that the kicks were added to
+
+
+async def _increment_active_session(
+    db: AsyncSession, mother_id: UUID, count: int, started_at: datetime
+) -> tuple[int, int]:
+    """
+    +`count` to the mother's active session's count, or starts one (at `started_at`) when there is none.
+    Returns: (session ID, new count)
+    """
+    active_session_id = (
+        select(KickTrackerSession.id)
+        .where(KickTrackerSession.mother_id == mother_id, KickTrackerSession.ended_at.is_(None))
+        .order_by(KickTrackerSession.started_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(KickTrackerSession)
+        .where(KickTrackerSession.id == active_session_id)
+        .values(kick_count=KickTrackerSession.kick_count + count)
+        .returning(KickTrackerSession.id, KickTrackerSession.kick_count)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is not None:
+        return row[0], row[1]
+
+    # If the client didn't explicitly start a session, we still record the kicks.
+    stmt = (
+        insert(KickTrackerSession)
+        .values(mother_id=mother_id, started_at=started_at, ended_at=None, kick_count=count)
+        .returning(KickTrackerSession.id)
+    )
+    return (await db.execute(stmt)).scalar_one(), count
+
+
+def _increment_days_stmt(db: AsyncSession):
+    stmt = dialect_insert(db, KickDailyRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=[KickDailyRollup.mother_id, KickDailyRollup.day],
+        set_={"kick_count": KickDailyRollup.kick_count + stmt.excluded.kick_count},
+    )
+
+
+async def add_kick(db: AsyncSession, mother: PregnantWoman, kick_at: datetime) -> AddedKick:
+    """
+    Records a kick into the mother's active session (started at the kick when there is none).
+    Three constant-time statements: the session's increment, the kick's insert and the day's increment.
+    """
+    session_id, session_kick_count = await _increment_active_session(db, mother.id, 1, kick_at)
+
+    kick_stmt = (
+        insert(KickTrackerDataPoint).values(session_id=session_id, kick_at=kick_at).returning(KickTrackerDataPoint.id)
+    )
+    kick_id = (await db.execute(kick_stmt)).scalar_one()
+
+    day = kick_at.astimezone(local_timezone(mother.timezone)).date()
+    day_stmt = _increment_days_stmt(db).values(mother_id=mother.id, day=day, kick_count=1)
+    day_kick_count = (await db.execute(day_stmt.returning(KickDailyRollup.kick_count))).scalar_one()
+
+    return AddedKick(
+        kick_id=kick_id,
+        session_id=session_id,
+        session_kick_count=session_kick_count,
+        day_kick_count=day_kick_count,
+    )
+
+
+async def add_kicks(db: AsyncSession, mother: PregnantWoman, kick_times: list[datetime]) -> AddedKicks:
+    """
+    Records many kicks (e.g. tapped offline) into the mother's active session, in as many statements as one kick:
+    the session's increment, a single executemany insert of the kicks, and one executemany upsert of their days.
+    """
+    session_id, session_kick_count = await _increment_active_session(db, mother.id, len(kick_times), min(kick_times))
+
+    await db.execute(
+        insert(KickTrackerDataPoint),
+        [{"session_id": session_id, "kick_at": kick_at} for kick_at in kick_times],
+    )
+
+    zone = local_timezone(mother.timezone)
+    added_per_day = Counter(kick_at.astimezone(zone).date() for kick_at in kick_times)
+    await db.execute(
+        _increment_days_stmt(db),
+        [{"mother_id": mother.id, "day": day, "kick_count": count} for day, count in added_per_day.items()],
+    )
+    days_stmt = select(KickDailyRollup.day, KickDailyRollup.kick_count).where(
+        KickDailyRollup.mother_id == mother.id, KickDailyRollup.day.in_(added_per_day)
+    )
+    return AddedKicks(
+        session_id=session_id,
+        session_kick_count=session_kick_count,
+        day_kick_counts={day: count for day, count in (await db.execute(days_stmt)).all()},
+    )
+
+
+async def rebuild_mother_kick_days(db: AsyncSession, mother: PregnantWoman) -> None:
+    """Recomputes the mother's daily rollups from her kicks, by her current timezone (doesn't commit)."""
+    zone = local_timezone(mother.timezone)
+    per_day: Counter[date] = Counter()
+    stmt = (
+        select(KickTrackerDataPoint.kick_at)
+        .join(KickTrackerSession, KickTrackerSession.id == KickTrackerDataPoint.session_id)
+        .where(KickTrackerSession.mother_id == mother.id)
+        .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+    )
+    async for kick_at in await db.stream_scalars(stmt):
+        per_day[local_date(kick_at, zone)] += 1
+
+    await db.execute(delete(KickDailyRollup).where(KickDailyRollup.mother_id == mother.id))
+    if per_day:
+        await db.execute(
+            insert(KickDailyRollup),
+            [{"mother_id": mother.id, "day": day, "kick_count": count} for day, count in per_day.items()],
+        )
+
+
+def rebuild_kick_counts(db: Session) -> None:
+    """Recomputes every session's count & every daily rollup from `kick_tracker_data_points` (doesn't commit)."""
+    session_count = (
+        select(func.count(KickTrackerDataPoint.id))
+        .where(KickTrackerDataPoint.session_id == KickTrackerSession.id)
+        .scalar_subquery()
+    )
+    db.execute(update(KickTrackerSession).values(kick_count=session_count).execution_options(synchronize_session=False))
+
+    # Each kick's day depends on its mother's timezone, so they are bucketed here rather than by the database
+    zones: dict[str | None, ZoneInfo] = {}
+    per_day: Counter[tuple[UUID, date]] = Counter()
+    stmt = (
+        select(KickTrackerSession.mother_id, PregnantWoman.timezone, KickTrackerDataPoint.kick_at)
+        .join(KickTrackerSession, KickTrackerSession.id == KickTrackerDataPoint.session_id)
+        .join(PregnantWoman, PregnantWoman.id == KickTrackerSession.mother_id)
+        .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+    )
+    for mother_id, tz_name, kick_at in db.execute(stmt):
+        if tz_name not in zones:
+            zones[tz_name] = local_timezone(tz_name)
+        per_day[mother_id, local_date(kick_at, zones[tz_name])] += 1
+
+    db.execute(delete(KickDailyRollup))
+    if per_day:
+        db.execute(
+            insert(KickDailyRollup),
+            [{"mother_id": mother_id, "day": day, "kick_count": count} for (mother_id, day), count in per_day.items()],
+        )
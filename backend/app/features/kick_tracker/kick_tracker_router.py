@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +9,8 @@ from app.core.security import require_role
 from app.db.db_config import get_db
 from app.db.db_schema import PregnantWoman
 from app.features.kick_tracker.kick_tracker_models import (
+    KickBatchRecordRequest,
+    KickBatchRecordResponse,
     KickCountsResponse,
     KickRecordRequest,
     KickRecordResponse,
@@ -16,6 +18,7 @@ from app.features.kick_tracker.kick_tracker_models import (
     KickSessionStopResponse,
 )
 from app.features.kick_tracker.kick_tracker_service import KickTrackerService
+from app.shared.utils import local_timezone
 
 kick_tracker_router = APIRouter(prefix="/kick-tracker", tags=["Kick Tracker"])
 
@@ -31,7 +34,20 @@ async def record_kick(
     db: AsyncSession = Depends(get_db),
     service: KickTrackerService = Depends(get_kick_tracker_service),
 ) -> KickRecordResponse:
-    resp = await service.record_kick(mother.id, request.kick_at)
+    resp = await service.record_kick(mother, request.kick_at)
+    await db.commit()
+    return resp
+
+
+@kick_tracker_router.post("/kicks/batch", response_model=KickBatchRecordResponse)
+async def record_kicks(
+    request: KickBatchRecordRequest,
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    db: AsyncSession = Depends(get_db),
+    service: KickTrackerService = Depends(get_kick_tracker_service),
+) -> KickBatchRecordResponse:
+    """Records many kicks at once (e.g. the ones tapped offline), into the active session."""
+    resp = await service.record_kicks(mother, request.kick_at)
     await db.commit()
     return resp
 
@@ -65,9 +81,9 @@ async def get_kick_counts(
     mother: PregnantWoman = Depends(require_role(PregnantWoman)),
     service: KickTrackerService = Depends(get_kick_tracker_service),
 ) -> KickCountsResponse:
-    # Default to last 14 days (inclusive)
+    # Default to last 14 days (inclusive), of the mother's own calendar
     if end_date is None:
-        end_date = date.today()
+        end_date = datetime.now(local_timezone(mother.timezone)).date()
     if start_date is None:
         start_date = end_date - timedelta(days=13)
 
@@ -1,15 +1,24 @@
 import uuid
+from datetime import date, datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy import desc, func
+from sqlalchemy import desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing_extensions import Annotated
 
 from app.db.db_config import get_db
 from app.db.db_schema import UserAppFeedback
+from app.features.feedback.feedback_rollups import (
+    FeedbackAggregate,
+    TrendBucket,
+    get_feedback_totals,
+    get_feedback_trend,
+    record_feedback,
+)
+from app.features.feedback.service import sentiment_scoring_service
 
 Rating = Annotated[int, Field(greater=1, lesser=5)]
 Content = Annotated[str, Field(min_length=1)]
@@ -38,6 +47,20 @@ class FeedbackStatsResponse(BaseModel):
     total_count: int
     average_rating: float
     rating_distribution: dict
+    sentiment_distribution: dict
+
+
+class FeedbackTrendPoint(BaseModel):
+    period_start: date
+    count: int
+    average_rating: float
+    average_compound: float
+    sentiment_distribution: dict
+
+
+class FeedbackTrendResponse(BaseModel):
+    bucket: TrendBucket
+    points: list[FeedbackTrendPoint]
 
 
 @router.post("/", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
@@ -45,13 +68,20 @@ async def create_feedback(
     feedback: FeedbackCreate,
     db: AsyncSession = Depends(get_db),
 ):
+    scores = await sentiment_scoring_service.analyze(feedback.content)
     new_feedback = UserAppFeedback(
         author_id=feedback.author_id,
         rating=feedback.rating,
         content=feedback.content,
+        positive_score=scores["pos"],
+        neutral_score=scores["neu"],
+        negative_score=scores["neg"],
+        compound_score=scores["compound"],
+        created_at=datetime.now(timezone.utc),
     )
 
     db.add(new_feedback)
+    await record_feedback(db, new_feedback)
     await db.commit()
     await db.refresh(new_feedback)
 
@@ -94,28 +124,53 @@ async def get_all_feedback(
     return feedbacks
 
 
-# Get feedback statistics
-@router.get("/stats", response_model=FeedbackStatsResponse)
-async def get_feedback_stats(db: AsyncSession = Depends(get_db)):
-    # Get total count
-    count_result = await db.execute(select(func.count(UserAppFeedback.id)))
-    total_count = count_result.scalar() or 0
+def _check_date_range(start: date | None, end: date | None) -> None:
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'end' must not be before 'start'")
 
-    # Get average rating
-    avg_result = await db.execute(select(func.avg(UserAppFeedback.rating)))
-    average_rating = float(avg_result.scalar() or 0)
 
-    # Get rating distribution
-    result = await db.execute(select(UserAppFeedback))
-    feedbacks = result.scalars().all()
+# Get feedback statistics (from the per-day rollups, optionally within [start, end])
+@router.get("/stats", response_model=FeedbackStatsResponse)
+async def get_feedback_stats(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    _check_date_range(start, end)
+    totals = await get_feedback_totals(db, start, end)
 
-    rating_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for feedback in feedbacks:
-        if feedback.rating in rating_dist:
-            rating_dist[feedback.rating] += 1
+    rating_dist = {rating: totals.rating_counts.get(rating, 0) for rating in range(1, 6)}
 
     return FeedbackStatsResponse(
-        total_count=total_count, average_rating=round(average_rating, 2), rating_distribution=rating_dist
+        total_count=totals.count,
+        average_rating=round(totals.average_rating, 2),
+        rating_distribution=rating_dist,
+        sentiment_distribution=totals.sentiment_counts,
+    )
+
+
+def _trend_point(period_start: date, aggregate: FeedbackAggregate) -> FeedbackTrendPoint:
+    return FeedbackTrendPoint(
+        period_start=period_start,
+        count=aggregate.count,
+        average_rating=round(aggregate.average_rating, 2),
+        average_compound=round(aggregate.average_compound, 3),
+        sentiment_distribution=aggregate.sentiment_counts,
+    )
+
+
+# Get the average rating & sentiment mix per day / week / month
+@router.get("/stats/trend", response_model=FeedbackTrendResponse)
+async def get_feedback_stats_trend(
+    bucket: TrendBucket = "week",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    _check_date_range(start, end)
+    trend = await get_feedback_trend(db, bucket, start, end)
+    return FeedbackTrendResponse(
+        bucket=bucket, points=[_trend_point(period_start, aggregate) for period_start, aggregate in trend]
     )
 
 
@@ -35,6 +35,8 @@ from app.features.miscellaneous.misc_models import (
     DoctorSpecializationModel,
     UpdateDoctorSpecializationRequest,
 )
+from app.shared.image_validation import validate_image_upload
+from app.shared.reference_data import bump_reference_data_version, reference_data_cache
 from app.shared.s3_storage_interface import S3StorageInterface
 
 misc_router = APIRouter(tags=["Miscellaneous"])
@@ -47,9 +49,7 @@ misc_router = APIRouter(tags=["Miscellaneous"])
 async def get_doctor_specializations(
     db: AsyncSession = Depends(get_db),
 ) -> list[DoctorSpecializationModel]:
-    stmt = select(DoctorSpecialisation).order_by(DoctorSpecialisation.specialisation)
-    result = await db.execute(stmt)
-    specializations = result.scalars().all()
+    specializations = (await reference_data_cache.get(db)).doctor_specialisations
     return [DoctorSpecializationModel(id=s.id, specialisation=s.specialisation) for s in specializations]
 
 
@@ -71,6 +71,7 @@ async def create_doctor_specialization(
         new_spec = DoctorSpecialisation(specialisation=request.specialisation.strip())
         db.add(new_spec)
         await db.flush()
+        await bump_reference_data_version(db)
         await db.commit()
         return DoctorSpecializationModel(id=new_spec.id, specialisation=new_spec.specialisation)
     except Exception:
@@ -99,6 +100,7 @@ async def update_doctor_specialization(
 
         specialization.specialisation = request.specialisation.strip()
         await db.flush()
+        await bump_reference_data_version(db)
         await db.commit()
         return DoctorSpecializationModel(id=specialization.id, specialisation=specialization.specialisation)
     except Exception:
@@ -128,6 +130,7 @@ async def delete_doctor_specialization(
             )
 
         await db.delete(specialization)
+        await bump_reference_data_version(db)
         await db.commit()
     except Exception:
         await db.rollback()
@@ -479,7 +482,8 @@ async def upload_background_image(
             await db.flush()
 
         # Upload image to S3
-        s3_key = S3StorageInterface.put_background_image(slug, background_image)
+        validate_image_upload(background_image, S3StorageInterface.BACKGROUND_IMAGE_PREFIX)
+        s3_key = S3StorageInterface.put_background_image(background_image)
 
         if not s3_key:
             raise HTTPException(status_code=500, detail="Failed to upload image to S3")
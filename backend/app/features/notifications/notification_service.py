@@ -4,7 +4,7 @@ from uuid import UUID
 
 import httpx
 from fastapi import HTTPException, status
-from sqlalchemy import insert, select
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -73,6 +73,10 @@ class NotificationService:
         notification = (await self.db.execute(stmt)).scalar_one_or_none()
         return notification is not None
 
+    async def count_unread_notifications(self, user_id: UUID) -> int:
+        stmt = select(func.count()).where(Notification.recipient_id == user_id, Notification.is_seen.is_(False))
+        return (await self.db.execute(stmt)).scalar_one()
+
     async def get_user_notifications(
         self, user_id: UUID, limit: int = 50, offset: int = 0
     ) -> list[AppNotificationResponse]:
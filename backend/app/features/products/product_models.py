@@ -1,6 +1,8 @@
 from datetime import datetime
 from uuid import UUID
 
+from pydantic import Field
+
 from app.core.custom_base_model import CustomBaseModel
 
 
@@ -68,3 +70,13 @@ class ProductUpdateRequest(CustomBaseModel):
     category_id: int | None = None
     price_cents: int | None = None
     description: str | None = None
+
+
+class BulkPublishDraftsRequest(CustomBaseModel):
+    draft_ids: list[int] = Field(min_length=1, max_length=100)
+
+
+class DraftPublishResult(CustomBaseModel):
+    draft_id: int
+    product_id: int | None  # None if this draft could not be published
+    detail: str | None = None  # Why it could not be published
@@ -8,6 +8,8 @@ from app.core.users_manager import optional_current_active_user
 from app.db.db_config import get_db
 from app.db.db_schema import Merchant, PregnantWoman, User
 from app.features.products.product_models import (
+    BulkPublishDraftsRequest,
+    DraftPublishResult,
     ProductCategoryResponse,
     ProductDetailedResponse,
     ProductDraftCreateRequest,
@@ -114,6 +116,22 @@ async def delete_product_draft(
         raise
 
 
+@product_router.post("/drafts/publish", response_model=list[DraftPublishResult])
+async def publish_product_drafts(
+    request: BulkPublishDraftsRequest,
+    merchant: Merchant = Depends(require_role(Merchant)),
+    service: ProductService = Depends(get_product_service),
+    db: AsyncSession = Depends(get_db),
+) -> list[DraftPublishResult]:
+    try:
+        results = await service.publish_product_drafts(request.draft_ids, merchant)
+        await db.commit()
+        return results
+    except:
+        await db.rollback()
+        raise
+
+
 @product_router.post("/drafts/{draft_id}/publish", status_code=status.HTTP_201_CREATED)
 async def publish_product_draft(
     draft_id: int,
@@ -4,10 +4,12 @@ from fastapi import HTTPException, UploadFile, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
 
 from app.core.settings import settings
 from app.db.db_schema import Merchant, MotherLikeProduct, PregnantWoman, Product, ProductCategory, ProductDraft, User
 from app.features.products.product_models import (
+    DraftPublishResult,
     ProductCategoryResponse,
     ProductDetailedResponse,
     ProductDraftCreateRequest,
@@ -17,6 +19,8 @@ from app.features.products.product_models import (
     ProductPreviewsPaginatedResponse,
     ProductUpdateRequest,
 )
+from app.shared.image_validation import validate_image_upload
+from app.shared.reference_data import reference_data_cache
 from app.shared.s3_storage_interface import S3StorageInterface
 from app.shared.utils import format_user_fullname
 
@@ -26,13 +30,14 @@ class ProductService:
         self.db = db
 
     async def get_product_categories(self) -> list[ProductCategoryResponse]:
-        stmt = select(ProductCategory)
-        categories = (await self.db.execute(stmt)).scalars().all()
+        categories = (await reference_data_cache.get(self.db)).product_categories
         return [ProductCategoryResponse(id=cat.id, label=cat.label) for cat in categories]
 
     async def add_new_product(
         self, name: str, merchant: Merchant, category: str, price_cents: int, description: str, img_file: UploadFile
     ) -> None:
+        validate_image_upload(img_file, S3StorageInterface.PRODUCT_PREFIX)
+
         product_category_stmt = select(ProductCategory).where(ProductCategory.label == category)
         product_category = (await self.db.execute(product_category_stmt)).scalar_one_or_none()
         if not product_category:
@@ -48,7 +53,7 @@ class ProductService:
         self.db.add(new_product)
         await self.db.flush()
 
-        img_key = S3StorageInterface.put_product_img(new_product.id, img_file)
+        img_key = S3StorageInterface.put_product_img(img_file)
         if not img_key:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to upload product image"
@@ -135,7 +140,7 @@ class ProductService:
                 detail="Not authorized to delete this product. Only the merchant who created it can delete it.",
             )
 
-        # If needed, implement a separate cleanup process for S3 image
+        # The (now orphaned) S3 image is cleaned up separately by the 'app.jobs.s3_gc' job
         await self.db.delete(product)
 
     async def get_product_previews(
@@ -393,7 +398,8 @@ class ProductService:
             )
 
         # Upload to S3 using a special prefix for drafts
-        img_key = S3StorageInterface.put_product_draft_img(draft.id, img_file)
+        validate_image_upload(img_file, S3StorageInterface.PRODUCT_DRAFT_PREFIX)
+        img_key = S3StorageInterface.put_product_draft_img(img_file)
         if not img_key:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -421,7 +427,76 @@ class ProductService:
         """Publish a draft as a live product. Validates all required fields are present."""
         stmt = select(ProductDraft).where(ProductDraft.id == draft_id)
         draft = (await self.db.execute(stmt)).scalar_one_or_none()
+        self._check_draft_is_publishable(draft, merchant)
+
+        # Get the category
+        category_stmt = select(ProductCategory).where(ProductCategory.id == draft.category_id)
+        category = (await self.db.execute(category_stmt)).scalar_one_or_none()
+        if not category:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product category")
+
+        # Promote the image from draft storage to product storage
+        img_key = S3StorageInterface.promote_product_draft_img(draft.img_key)
+        new_product = self._product_from_draft(draft, merchant, category, img_key)
+        self.db.add(new_product)
+        await self.db.flush()
+
+        # Delete the draft after successful publication
+        await self.db.delete(draft)
+
+        return new_product
+
+    async def publish_product_drafts(self, draft_ids: list[int], merchant: Merchant) -> list[DraftPublishResult]:
+        """
+        Publishes several drafts at once. Each draft succeeds or fails on its own (per-item results, in order),
+        and all the draft images are promoted concurrently, rather than one after the other.
+        """
+        draft_ids = list(dict.fromkeys(draft_ids))
+        drafts_stmt = select(ProductDraft).where(ProductDraft.id.in_(draft_ids))
+        drafts_by_id = {draft.id: draft for draft in (await self.db.execute(drafts_stmt)).scalars().all()}
+
+        category_ids = {draft.category_id for draft in drafts_by_id.values() if draft.category_id is not None}
+        categories_stmt = select(ProductCategory).where(ProductCategory.id.in_(category_ids))
+        categories_by_id = {cat.id: cat for cat in (await self.db.execute(categories_stmt)).scalars().all()}
+
+        errors: dict[int, str] = {}
+        publishable: list[ProductDraft] = []
+        for draft_id in draft_ids:
+            draft = drafts_by_id.get(draft_id)
+            try:
+                self._check_draft_is_publishable(draft, merchant)
+                if draft.category_id not in categories_by_id:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product category")
+                publishable.append(draft)
+            except HTTPException as e:
+                errors[draft_id] = e.detail
+
+        promoted_img_keys = await run_in_threadpool(
+            S3StorageInterface.promote_product_draft_imgs, [draft.img_key for draft in publishable]
+        )
+
+        new_products: dict[int, Product] = {}
+        for draft in publishable:
+            new_products[draft.id] = self._product_from_draft(
+                draft, merchant, categories_by_id[draft.category_id], promoted_img_keys.get(draft.img_key)
+            )
+        self.db.add_all(new_products.values())
+        await self.db.flush()
 
+        for draft in publishable:
+            await self.db.delete(draft)
+
+        return [
+            DraftPublishResult(
+                draft_id=draft_id,
+                product_id=new_products[draft_id].id if draft_id in new_products else None,
+                detail=errors.get(draft_id),
+            )
+            for draft_id in draft_ids
+        ]
+
+    @staticmethod
+    def _check_draft_is_publishable(draft: ProductDraft | None, merchant: Merchant) -> None:
         if not draft:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product draft not found")
 
@@ -443,37 +518,19 @@ class ProductService:
         if not draft.img_key:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Product image is required")
 
-        # Get the category
-        category_stmt = select(ProductCategory).where(ProductCategory.id == draft.category_id)
-        category = (await self.db.execute(category_stmt)).scalar_one_or_none()
-        if not category:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product category")
-
-        # Create the published product
-        new_product = Product(
+    @staticmethod
+    def _product_from_draft(
+        draft: ProductDraft, merchant: Merchant, category: ProductCategory, promoted_img_key: str | None
+    ) -> Product:
+        return Product(
             name=draft.name,
             merchant=merchant,
             category=category,
             price_cents=draft.price_cents,
             description=draft.description,
+            # Fallback: just use the draft img_key if promotion fails
+            img_key=promoted_img_key or draft.img_key,
         )
-        self.db.add(new_product)
-        await self.db.flush()
-
-        # Copy/promote the draft image to the product image location
-        if draft.img_key:
-            # Promote the image from draft storage to product storage
-            img_key = S3StorageInterface.promote_product_draft_img(new_product.id, draft.img_key)
-            if img_key:
-                new_product.img_key = img_key
-            else:
-                # Fallback: just use the draft img_key if promotion fails
-                new_product.img_key = draft.img_key
-
-        # Delete the draft after successful publication
-        await self.db.delete(draft)
-
-        return new_product
 
     async def _build_draft_response(self, draft: ProductDraft) -> ProductDraftResponse:
         """Helper to build a ProductDraftResponse from a ProductDraft entity."""
@@ -25,6 +25,8 @@ from app.features.recipes.recipe_models import (
     RecipePreviewResponse,
     RecipePreviewsPaginatedResponse,
 )
+from app.shared.image_validation import validate_image_upload
+from app.shared.reference_data import bump_reference_data_version, reference_data_cache
 from app.shared.s3_storage_interface import S3StorageInterface
 
 
@@ -33,8 +35,7 @@ class RecipeService:
         self.db = db
 
     async def get_recipe_categories(self) -> list[RecipeCategoryResponse]:
-        result = await self.db.execute(select(RecipeCategory))
-        categories = result.scalars().all()
+        categories = (await reference_data_cache.get(self.db)).recipe_categories
         return [RecipeCategoryResponse(id=category.id, label=category.label) for category in categories]
 
     async def get_recipe_previews(
@@ -151,6 +152,8 @@ class RecipeService:
         if trimester < 1 or trimester > 3:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Trimester must be 1, 2, or 3")
 
+        validate_image_upload(image_file, S3StorageInterface.RECIPE_PREFIX)
+
         # Validate category exists
         category_stmt = select(RecipeCategory).where(RecipeCategory.id == category_id)
         category = (await self.db.execute(category_stmt)).scalar_one_or_none()
@@ -175,7 +178,7 @@ class RecipeService:
 
         # Now upload image with real recipe ID
         await image_file.seek(0)
-        recipe_img_key = S3StorageInterface.put_recipe_img(new_recipe.id, image_file)
+        recipe_img_key = S3StorageInterface.put_recipe_img(image_file)
         if recipe_img_key is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -363,8 +366,8 @@ class RecipeService:
             )
 
         # Upload to S3 using a special prefix for drafts
-        await img_file.seek(0)
-        img_key = S3StorageInterface.put_recipe_draft_img(draft.id, img_file)
+        validate_image_upload(img_file, S3StorageInterface.RECIPE_DRAFT_PREFIX)
+        img_key = S3StorageInterface.put_recipe_draft_img(img_file)
         if not img_key:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -446,7 +449,7 @@ class RecipeService:
         await self.db.flush()  # Get the recipe ID
 
         # Copy/promote the draft image to the recipe image location
-        img_key = S3StorageInterface.promote_recipe_draft_img(new_recipe.id, draft.img_key)
+        img_key = S3StorageInterface.promote_recipe_draft_img(draft.img_key)
         if not img_key:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -511,6 +514,7 @@ class RecipeService:
         new_category = RecipeCategory(label=label)
         self.db.add(new_category)
         await self.db.flush()
+        await bump_reference_data_version(self.db)
 
         return RecipeCategoryResponse(id=new_category.id, label=new_category.label)
 
@@ -536,6 +540,7 @@ class RecipeService:
 
         category.label = label
         await self.db.flush()
+        await bump_reference_data_version(self.db)
 
         return RecipeCategoryResponse(id=category.id, label=category.label)
 
@@ -560,3 +565,4 @@ class RecipeService:
             )
 
         await self.db.delete(category)
+        await bump_reference_data_version(self.db)
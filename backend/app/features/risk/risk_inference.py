@@ -0,0 +1,220 @@
+"""Pandas-free inference path for the risk model.
+
+The fitted sklearn `StandardScaler` + `LogisticRegression` are "compiled" once into plain NumPy arrays,
+so that scoring is just a subtraction, a division, one matmul and a softmax (no DataFrames, no sklearn
+input validation on the request path). The outputs are the same as `scaler.transform` + `model.predict_proba`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# The order of `RiskInferenceEngine.predict_proba`'s columns
+RISK_LEVELS: tuple[str, ...] = ("low", "mid", "high")
+
+DEFAULT_LABEL_MAP: dict[str, int] = {"low": 0, "mid": 1, "high": 2}
+
+# The order of the columns of the raw feature matrix (see `build_raw_features`).
+# This is also the column order that artifacts without `feature_names_in_` were trained with.
+RAW_FEATURE_NAMES: tuple[str, ...] = ("Age", "SystolicBP", "DiastolicBP", "MeanBP", "BS", "HeartRate")
+
+
+def build_raw_features(
+    age: np.ndarray, systolic_bp: np.ndarray, diastolic_bp: np.ndarray, bs: np.ndarray, heart_rate: np.ndarray
+) -> np.ndarray:
+    """Stacks the readings into a (n_readings, len(RAW_FEATURE_NAMES)) float64 matrix, deriving MeanBP."""
+    systolic_bp = np.asarray(systolic_bp, dtype=np.float64)
+    diastolic_bp = np.asarray(diastolic_bp, dtype=np.float64)
+    mean_bp = (systolic_bp + diastolic_bp) / 2.0
+    return np.column_stack([age, systolic_bp, diastolic_bp, mean_bp, bs, heart_rate]).astype(np.float64, copy=False)
+
+
+# Returned by `rule_based_override_levels` for the readings that no clinical rule applies to
+NO_OVERRIDE = -1
+
+
+def rule_based_override_levels(
+    systolic_bp: np.ndarray, diastolic_bp: np.ndarray, bs: np.ndarray, heart_rate: np.ndarray
+) -> np.ndarray:
+    """Clinical heuristics override, evaluated for many readings at once with boolean masks.
+
+    Also used by `app/ml/train_risk_model.py` to derive the training labels, so both always agree.
+    High-risk rules take precedence over the mid-risk ones.
+
+    Returns: An int array of indices into RISK_LEVELS (1 = "mid", 2 = "high"), or NO_OVERRIDE
+    """
+    systolic_bp, diastolic_bp = np.asarray(systolic_bp), np.asarray(diastolic_bp)
+    bs, heart_rate = np.asarray(bs), np.asarray(heart_rate)
+
+    high = (
+        (bs < 4.0)
+        | (heart_rate > 120)
+        | (systolic_bp > 160)
+        | (diastolic_bp > 100)
+        | (systolic_bp < 80)
+        | (diastolic_bp < 50)
+    )
+    mid = (
+        ((heart_rate > 100) & (heart_rate <= 120))
+        | (systolic_bp > 140)
+        | (diastolic_bp > 90)
+        | (systolic_bp < 90)
+        | (diastolic_bp < 60)
+    )
+    return np.select([high, mid], [RISK_LEVELS.index("high"), RISK_LEVELS.index("mid")], default=NO_OVERRIDE)
+
+
+# eq=False: engines are compared (and hashed) by identity, since comparing their numpy arrays field by field isn't
+# meaningful (caches are keyed on the model's version instead, see "risk_service.py")
+@dataclass(frozen=True, eq=False)
+class RiskInferenceEngine:
+    feature_idx: np.ndarray  # Columns of the raw feature matrix, in the order the scaler was fitted on
+    mean: np.ndarray
+    scale: np.ndarray
+    coef_t: np.ndarray  # (n_features, n_model_classes), i.e. a transposed view of `coef_`, as sklearn multiplies it
+    intercept: np.ndarray
+    one_vs_rest: bool
+    class_to_level_idx: np.ndarray  # Model class (column of coef_t) -> column in RISK_LEVELS
+
+    @classmethod
+    def from_sklearn(cls, scaler, model, label_map: dict[str, int] | None = None) -> RiskInferenceEngine:
+        label_map = label_map or DEFAULT_LABEL_MAP
+        num_to_label = {num: label for label, num in label_map.items()}
+
+        feature_names = list(getattr(scaler, "feature_names_in_", RAW_FEATURE_NAMES))
+        unknown_features = [name for name in feature_names if name not in RAW_FEATURE_NAMES]
+        if unknown_features:
+            raise ValueError(f"Scaler expects unknown features: {unknown_features}")
+
+        class_labels = [num_to_label.get(int(class_idx), str(class_idx)) for class_idx in model.classes_]
+        unknown_labels = [label for label in class_labels if label not in RISK_LEVELS]
+        if unknown_labels:
+            raise ValueError(f"Model predicts unknown risk levels: {unknown_labels}")
+
+        n_features = len(feature_names)
+        mean = getattr(scaler, "mean_", None)
+        scale = getattr(scaler, "scale_", None)
+
+        # Same rules as sklearn's 'LogisticRegression.predict_proba' for which link function to use
+        multi_class = getattr(model, "multi_class", "auto")
+        one_vs_rest = multi_class == "ovr" or (multi_class == "auto" and getattr(model, "solver", "") == "liblinear")
+
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        intercept = np.asarray(model.intercept_, dtype=np.float64)
+        if coef.shape[0] == 1:
+            # Binary model: sigmoid(z) == softmax([0, z]), so add an all-zero row for the negative class
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+            one_vs_rest = False
+
+        return cls(
+            feature_idx=np.array([RAW_FEATURE_NAMES.index(name) for name in feature_names]),
+            mean=np.zeros(n_features) if mean is None or not scaler.with_mean else np.asarray(mean, dtype=np.float64),
+            scale=np.ones(n_features) if scale is None or not scaler.with_std else np.asarray(scale, dtype=np.float64),
+            coef_t=coef.T,
+            intercept=intercept,
+            one_vs_rest=one_vs_rest,
+            class_to_level_idx=np.array([RISK_LEVELS.index(label) for label in class_labels]),
+        )
+
+    def predict_proba(self, raw_features: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            raw_features: A (n_readings, len(RAW_FEATURE_NAMES)) matrix, see `build_raw_features`.
+
+        Returns:
+            A (n_readings, len(RISK_LEVELS)) matrix of probabilities. Levels the model doesn't know are 0.
+        """
+        scaled = (raw_features[:, self.feature_idx] - self.mean) / self.scale
+        logits = scaled @ self.coef_t + self.intercept
+
+        if self.one_vs_rest:
+            probs = 1.0 / (1.0 + np.exp(-logits))
+            probs /= probs.sum(axis=1, keepdims=True)
+        else:
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+
+        level_probs = np.zeros((raw_features.shape[0], len(RISK_LEVELS)))
+        level_probs[:, self.class_to_level_idx] = probs
+        return level_probs
+
+
+def predict_levels(engine: RiskInferenceEngine, raw_features: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns:
+        - The model's probabilities, see `RiskInferenceEngine.predict_proba`
+        - The clinical rules' override levels, see `rule_based_override_levels`
+        - The final levels (indices into RISK_LEVELS): the more severe of the model's and the override's
+    """
+    probs = engine.predict_proba(raw_features)
+    model_level_idx = probs.argmax(axis=1)
+
+    columns = {name: raw_features[:, idx] for idx, name in enumerate(RAW_FEATURE_NAMES)}
+    override_idx = rule_based_override_levels(
+        columns["SystolicBP"], columns["DiastolicBP"], columns["BS"], columns["HeartRate"]
+    )
+    # NO_OVERRIDE is -1, so it never wins against the model's level
+    return probs, override_idx, np.maximum(model_level_idx, override_idx)
+
+
+def score_readings(engine: RiskInferenceEngine, raw_features: np.ndarray) -> list[dict]:
+    """The batch equivalent of the "/risk/predict" endpoint: one pass through the model, and the overrides as masks.
+
+    Returns: One response body (same schema as "/risk/predict") per row of `raw_features`, in order
+    """
+    probs, override_idx, final_level_idx = predict_levels(engine, raw_features)
+    mean_bp = raw_features[:, RAW_FEATURE_NAMES.index("MeanBP")]
+
+    return [
+        prediction_content(
+            RISK_LEVELS[level_idx],
+            dict(zip(RISK_LEVELS, row_probs)),
+            None if override == NO_OVERRIDE else RISK_LEVELS[override],
+            mean_bp,
+        )
+        for level_idx, row_probs, override, mean_bp in zip(
+            final_level_idx.tolist(), probs.tolist(), override_idx.tolist(), mean_bp.tolist()
+        )
+    ]
+
+
+def prediction_content(risk_level: str, model_probs: dict, override_level: str | None, mean_bp: float) -> dict:
+    # Keep probabilities consistent with final risk level when overridden.
+    if override_level is not None and risk_level in {"mid", "high"}:
+        class_probs = {"low": 0.0, "mid": 0.0, "high": 0.0}
+        class_probs[risk_level] = 1.0
+    else:
+        class_probs = model_probs
+
+    risk_probability = float(class_probs.get("high", 0.0))
+    is_high_risk = risk_level == "high"
+
+    if risk_level == "high":
+        message = "go to nearby hospital for checkup"
+    else:
+        message = f"{risk_level.capitalize()} risk assessment. Please follow up as needed."
+
+    return {
+        "risk_level": risk_level,
+        "probabilities": class_probs,
+        "model_probabilities": model_probs,
+        "rule_override": override_level,
+        "message": message,
+        "mean_bp": float(mean_bp),
+        "is_high_risk": is_high_risk,
+        "risk_probability": risk_probability,
+    }
+
+
+def safe_fallback_content(mean_bp: float) -> dict:
+    return {
+        "risk_level": "low",
+        "probabilities": {"low": 1.0, "mid": 0.0, "high": 0.0},
+        "message": "Assessment unavailable due to an internal error. Please try again.",
+        "mean_bp": mean_bp,
+        "is_high_risk": False,
+        "risk_probability": 0.0,
+    }
@@ -0,0 +1,170 @@
+"""
+In-memory operational metrics for the risk endpoints (served by "/risk/stats").
+
+Everything is aggregated into one fixed-size slot per minute (counters, latency histograms, feature sums),
+and only the last `max_slots` minutes are kept, so memory stays constant no matter the traffic.
+The metrics are per worker process (each worker reports the requests it served).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from .risk_inference import NO_OVERRIDE, RAW_FEATURE_NAMES, RISK_LEVELS, RiskInferenceEngine
+
+# Upper bounds (in milliseconds) of the latency histogram's buckets, the last one catches everything slower
+LATENCY_BUCKETS_MS: tuple[float, ...] = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, float("inf"))
+
+# A feature is reported as drifting once its mean moved this many (training) standard deviations away
+DRIFT_MEAN_SHIFT_THRESHOLD = 0.5
+# ... and only once there are enough readings for the comparison to mean anything
+DRIFT_MIN_READINGS = 30
+
+
+@dataclass
+class _MetricsSlot:
+    minute: int
+    requests: Counter[str] = field(default_factory=Counter)
+    fallbacks: Counter[str] = field(default_factory=Counter)
+    latency_counts: dict[str, np.ndarray] = field(default_factory=dict)
+    readings: int = 0
+    overrides: int = 0
+    level_counts: np.ndarray = field(default_factory=lambda: np.zeros(len(RISK_LEVELS), dtype=np.int64))
+    feature_sum: np.ndarray = field(default_factory=lambda: np.zeros(len(RAW_FEATURE_NAMES)))
+    feature_sum_sq: np.ndarray = field(default_factory=lambda: np.zeros(len(RAW_FEATURE_NAMES)))
+
+
+def _latency_percentile_ms(counts: np.ndarray, percentile: float) -> float | None:
+    """Estimated from the histogram, i.e. the upper bound of the bucket the percentile falls in."""
+    total = int(counts.sum())
+    if total == 0:
+        return None
+    bucket_idx = int(np.searchsorted(np.cumsum(counts), percentile / 100 * total))
+    return LATENCY_BUCKETS_MS[min(bucket_idx, len(LATENCY_BUCKETS_MS) - 1)]
+
+
+class RiskMetrics:
+    def __init__(self, max_slots: int = 60, clock: Callable[[], float] = time.time):
+        self.max_slots = max_slots
+        self._clock = clock
+        self._slots: deque[_MetricsSlot] = deque(maxlen=max_slots)
+
+    def _current_slot(self) -> _MetricsSlot:
+        minute = int(self._clock() // 60)
+        if not self._slots or self._slots[-1].minute != minute:
+            self._slots.append(_MetricsSlot(minute=minute))
+        return self._slots[-1]
+
+    def _record_latency(self, slot: _MetricsSlot, endpoint: str, latency_seconds: float) -> None:
+        counts = slot.latency_counts.get(endpoint)
+        if counts is None:
+            counts = slot.latency_counts[endpoint] = np.zeros(len(LATENCY_BUCKETS_MS), dtype=np.int64)
+        counts[np.searchsorted(LATENCY_BUCKETS_MS, latency_seconds * 1000.0)] += 1
+        slot.requests[endpoint] += 1
+
+    def record(
+        self,
+        endpoint: str,
+        latency_seconds: float,
+        raw_features: np.ndarray,
+        final_level_idx: np.ndarray,
+        override_idx: np.ndarray,
+    ) -> None:
+        """Records one (successfully) served request, and the readings it scored."""
+        slot = self._current_slot()
+        self._record_latency(slot, endpoint, latency_seconds)
+        slot.readings += raw_features.shape[0]
+        slot.overrides += int(np.count_nonzero(override_idx != NO_OVERRIDE))
+        slot.level_counts += np.bincount(final_level_idx, minlength=len(RISK_LEVELS))
+        slot.feature_sum += raw_features.sum(axis=0)
+        slot.feature_sum_sq += np.square(raw_features).sum(axis=0)
+
+    def record_fallback(self, endpoint: str, latency_seconds: float) -> None:
+        """Records a request answered with the safe fallback (the model failed)."""
+        slot = self._current_slot()
+        self._record_latency(slot, endpoint, latency_seconds)
+        slot.fallbacks[endpoint] += 1
+
+    def summary(self, window_minutes: int, reference: RiskInferenceEngine | None = None) -> dict:
+        """
+        Args:
+            window_minutes: How many of the most recent minutes to aggregate (at most `max_slots`)
+            reference: The model whose training set the features are compared against (for drift)
+        """
+        since_minute = int(self._clock() // 60) - window_minutes + 1
+        slots = [slot for slot in self._slots if slot.minute >= since_minute]
+
+        requests: Counter[str] = Counter()
+        fallbacks: Counter[str] = Counter()
+        latency_counts: dict[str, np.ndarray] = {}
+        readings, overrides = 0, 0
+        level_counts = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+        feature_sum = np.zeros(len(RAW_FEATURE_NAMES))
+        feature_sum_sq = np.zeros(len(RAW_FEATURE_NAMES))
+        for slot in slots:
+            requests.update(slot.requests)
+            fallbacks.update(slot.fallbacks)
+            for endpoint, counts in slot.latency_counts.items():
+                latency_counts[endpoint] = latency_counts.get(endpoint, 0) + counts
+            readings += slot.readings
+            overrides += slot.overrides
+            level_counts += slot.level_counts
+            feature_sum += slot.feature_sum
+            feature_sum_sq += slot.feature_sum_sq
+
+        return {
+            "window_minutes": window_minutes,
+            "requests": dict(requests),
+            "fallbacks": dict(fallbacks),
+            "latency_ms": {
+                endpoint: {
+                    "buckets": [
+                        {"le": "inf" if bound == float("inf") else bound, "count": int(count)}
+                        for bound, count in zip(LATENCY_BUCKETS_MS, counts)
+                    ],
+                    "p50": _latency_percentile_ms(counts, 50),
+                    "p95": _latency_percentile_ms(counts, 95),
+                    "p99": _latency_percentile_ms(counts, 99),
+                }
+                for endpoint, counts in latency_counts.items()
+            },
+            "readings": readings,
+            "override_rate": overrides / readings if readings else None,
+            "class_distribution": {
+                level: (int(count) / readings if readings else None) for level, count in zip(RISK_LEVELS, level_counts)
+            },
+            "feature_drift": self._feature_drift(readings, feature_sum, feature_sum_sq, reference),
+        }
+
+    @staticmethod
+    def _feature_drift(
+        readings: int, feature_sum: np.ndarray, feature_sum_sq: np.ndarray, reference: RiskInferenceEngine | None
+    ) -> dict:
+        """
+        Compares the live mean & standard deviation of every model feature with the training set's,
+        which the model's fitted scaler already holds (so no extra artifact is needed).
+        """
+        if readings == 0 or reference is None:
+            return {}
+
+        live_mean = feature_sum / readings
+        live_std = np.sqrt(np.maximum(feature_sum_sq / readings - np.square(live_mean), 0.0))
+
+        drift = {}
+        for train_mean, train_std, raw_idx in zip(reference.mean, reference.scale, reference.feature_idx.tolist()):
+            mean_shift = float((live_mean[raw_idx] - train_mean) / train_std)
+            drift[RAW_FEATURE_NAMES[raw_idx]] = {
+                "live_mean": float(live_mean[raw_idx]),
+                "training_mean": float(train_mean),
+                "live_std": float(live_std[raw_idx]),
+                "training_std": float(train_std),
+                "mean_shift_in_training_stds": mean_shift,
+                "std_ratio": float(live_std[raw_idx] / train_std),
+                "drifting": readings >= DRIFT_MIN_READINGS and abs(mean_shift) > DRIFT_MEAN_SHIFT_THRESHOLD,
+            }
+        return drift
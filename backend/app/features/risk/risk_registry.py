@@ -0,0 +1,172 @@
+"""Versioned risk models, hot-swapped from `ml/models/` without restarting the workers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import joblib
+import numpy as np
+from loguru import logger
+
+from app.ml.risk_model_manifest import (
+    LABEL_MAP_FILENAME,
+    LEGACY_VERSION,
+    MANIFEST_FILENAME,
+    MODEL_FILENAME,
+    SCALER_FILENAME,
+    read_manifest,
+    version_dir,
+)
+
+from .risk_inference import DEFAULT_LABEL_MAP, RISK_LEVELS, RiskInferenceEngine
+
+
+@dataclass(frozen=True)
+class LoadedRiskModel:
+    version: str
+    engine: RiskInferenceEngine
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """
+    Everything a request needs, swapped in as a whole (a single attribute assignment),
+    so a request never sees e.g. the new active model together with the old shadow model.
+    """
+
+    active: LoadedRiskModel | None
+    shadow: LoadedRiskModel | None = None
+    manifest_mtime_ns: int | None = None
+
+
+@dataclass
+class ShadowStats:
+    """How often the shadow model's (final) risk level agrees with the active model's."""
+
+    version: str
+    compared: int = 0
+    agreed: int = 0
+    # (active level, shadow level) -> count, for the disagreements
+    disagreements: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    def record(self, active_level_idx: np.ndarray, shadow_level_idx: np.ndarray) -> None:
+        agree_mask = active_level_idx == shadow_level_idx
+        self.compared += len(agree_mask)
+        self.agreed += int(agree_mask.sum())
+        for active_idx, shadow_idx in zip(
+            active_level_idx[~agree_mask].tolist(), shadow_level_idx[~agree_mask].tolist()
+        ):
+            self.disagreements[(RISK_LEVELS[active_idx], RISK_LEVELS[shadow_idx])] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "compared": self.compared,
+            "agreed": self.agreed,
+            "agreement_rate": self.agreed / self.compared if self.compared else None,
+            "disagreements": [
+                {"active": active, "shadow": shadow, "count": count}
+                for (active, shadow), count in self.disagreements.most_common()
+            ],
+        }
+
+
+def _load_version(models_dir: Path, version: str) -> LoadedRiskModel:
+    artifacts_dir = version_dir(models_dir, version)
+    model_path = artifacts_dir / MODEL_FILENAME
+    scaler_path = artifacts_dir / SCALER_FILENAME
+    label_map_path = artifacts_dir / LABEL_MAP_FILENAME
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found: {model_path}. Please run train_risk_model.py first.")
+    if not scaler_path.exists():
+        raise FileNotFoundError(f"Scaler file not found: {scaler_path}. Please run train_risk_model.py first.")
+
+    label_map = joblib.load(label_map_path) if label_map_path.exists() else DEFAULT_LABEL_MAP
+    engine = RiskInferenceEngine.from_sklearn(joblib.load(scaler_path), joblib.load(model_path), label_map)
+    logger.info(f"✓ Risk model version '{version}' loaded from {artifacts_dir}")
+    return LoadedRiskModel(version=version, engine=engine)
+
+
+class RiskModelRegistry:
+    """
+    Serves the version that `manifest.json` marks as active (plus an optional shadow version).
+
+    The manifest is only looked at (a single `stat`) once every `reload_interval_seconds`, not on every request.
+    When it changes, the new versions are fully loaded BEFORE being swapped in. If loading fails,
+    the previous models keep being served, and the error is reported by `load_error`.
+    """
+
+    def __init__(self, models_dir: Path, reload_interval_seconds: float = 30.0):
+        self.models_dir = models_dir
+        self.reload_interval_seconds = reload_interval_seconds
+        self.load_error: str | None = None
+        self.shadow_stats: ShadowStats | None = None
+
+        self._snapshot = RegistrySnapshot(active=None)
+        self._next_check_at = 0.0
+        self._reload_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        return self._snapshot
+
+    def refresh(self, force: bool = False) -> RegistrySnapshot:
+        """Returns the current snapshot, reloading the models first if the manifest has changed."""
+        now = time.monotonic()
+        if not force and now < self._next_check_at:
+            return self._snapshot
+
+        with self._reload_lock:
+            self._next_check_at = now + self.reload_interval_seconds
+            manifest_path = self.models_dir / MANIFEST_FILENAME
+            manifest_mtime_ns = manifest_path.stat().st_mtime_ns if manifest_path.exists() else None
+
+            snapshot = self._snapshot
+            if snapshot.active is not None and snapshot.manifest_mtime_ns == manifest_mtime_ns and not force:
+                return snapshot
+
+            try:
+                self._swap_in(self._load_snapshot(manifest_mtime_ns))
+                self.load_error = None
+            except Exception as e:
+                self.load_error = f"Failed to load model artifacts: {str(e)}"
+                logger.error(self.load_error)
+            return self._snapshot
+
+    def _load_snapshot(self, manifest_mtime_ns: int | None) -> RegistrySnapshot:
+        manifest = read_manifest(self.models_dir)
+        active_version = manifest.active if manifest and manifest.active else LEGACY_VERSION
+        shadow_version = manifest.shadow if manifest else None
+
+        # Versions are immutable once exported, so the ones that are already loaded are reused as is
+        loaded = {m.version: m for m in (self._snapshot.active, self._snapshot.shadow) if m is not None}
+
+        def load(version: str) -> LoadedRiskModel:
+            return loaded.get(version) or _load_version(self.models_dir, version)
+
+        shadow = load(shadow_version) if shadow_version and shadow_version != active_version else None
+        return RegistrySnapshot(active=load(active_version), shadow=shadow, manifest_mtime_ns=manifest_mtime_ns)
+
+    def _swap_in(self, snapshot: RegistrySnapshot) -> None:
+        previous = self._snapshot
+        if snapshot.shadow is None:
+            self.shadow_stats = None
+        elif previous.shadow is None or previous.shadow.version != snapshot.shadow.version:
+            self.shadow_stats = ShadowStats(version=snapshot.shadow.version)
+
+        self._snapshot = snapshot
+        if previous.active is None or previous.active.version != snapshot.active.version:
+            logger.info(f"✓ Serving risk model version '{snapshot.active.version}'")
+
+    def record_shadow_levels(
+        self, snapshot: RegistrySnapshot, active_level_idx: np.ndarray, shadow_level_idx: np.ndarray
+    ):
+        # Skip results from a snapshot that has been swapped out in the meantime
+        stats = self.shadow_stats
+        if stats is not None and snapshot.shadow is not None and stats.version == snapshot.shadow.version:
+            stats.record(active_level_idx, shadow_level_idx)
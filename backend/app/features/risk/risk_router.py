@@ -2,55 +2,70 @@
 
 from __future__ import annotations
 
+import random
+import time
+from datetime import date
 from pathlib import Path
 
-import joblib
-from fastapi import APIRouter, HTTPException, status
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from loguru import logger
-
-from .risk_schemas import RiskPredictionRequest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import require_role
+from app.core.settings import settings
+from app.db.db_config import get_db
+from app.db.db_schema import PregnantWoman
+from app.ml.risk_model_manifest import MODEL_FILENAME, SCALER_FILENAME, read_manifest
+
+from .risk_inference import (
+    NO_OVERRIDE,
+    RAW_FEATURE_NAMES,
+    RISK_LEVELS,
+    build_raw_features,
+    predict_levels,
+    prediction_content,
+    rule_based_override_levels,
+    safe_fallback_content,
+    score_readings,
+)
+from .risk_metrics import RiskMetrics
+from .risk_registry import RegistrySnapshot, RiskModelRegistry
+from .risk_schemas import RiskBatchPredictionRequest, RiskPredictionRequest, RiskTrajectoryResponse
+from .risk_service import RiskService
 
 router = APIRouter(prefix="/risk", tags=["Risk Assessment"])
 
-# Model and scaler cache
-_MODEL = None
-_SCALER = None
-_LOAD_ERROR = None
+
+def get_risk_service(db: AsyncSession = Depends(get_db)) -> RiskService:
+    return RiskService(db)
+
 
 # Paths
 MODELS_DIR = Path(__file__).resolve().parent.parent.parent / "ml" / "models"
-MODEL_PATH = MODELS_DIR / "risk_model.joblib"
-SCALER_PATH = MODELS_DIR / "risk_scaler.joblib"
+# The unversioned artifacts, served when there is no manifest yet (see risk_model_manifest.py)
+MODEL_PATH = MODELS_DIR / MODEL_FILENAME
+SCALER_PATH = MODELS_DIR / SCALER_FILENAME
 
+# The versioned models (hot-swapped whenever the manifest changes)
+_REGISTRY = RiskModelRegistry(MODELS_DIR)
 
-def _rule_based_risk_override(*, systolic_bp: float, diastolic_bp: float, bs: float, heart_rate: float) -> str | None:
-    """Clinical heuristics override.
+# Rolling latency / override / class / drift metrics, served by "/risk/stats"
+_METRICS = RiskMetrics()
 
-    Mirrors the rules used during training label derivation in `app/ml/train_risk_model.py`.
 
-    Returns: "high" | "mid" | None
-    """
+def _should_log_request() -> bool:
+    return random.random() < settings.RISK_LOG_SAMPLE_RATE
 
-    # High-risk overrides
-    if bs < 4.0:
-        return "high"
-    if heart_rate > 120:
-        return "high"
-    if systolic_bp > 160 or diastolic_bp > 100:
-        return "high"
-    if systolic_bp < 80 or diastolic_bp < 50:
-        return "high"
 
-    # Mid-risk overrides
-    if 100 < heart_rate <= 120:
-        return "mid"
-    if systolic_bp > 140 or diastolic_bp > 90:
-        return "mid"
-    if systolic_bp < 90 or diastolic_bp < 60:
-        return "mid"
+def _rule_based_risk_override(*, systolic_bp: float, diastolic_bp: float, bs: float, heart_rate: float) -> str | None:
+    """Clinical heuristics override for a single reading (see `rule_based_override_levels`).
 
-    return None
+    Returns: "high" | "mid" | None
+    """
+    level_idx = int(rule_based_override_levels(systolic_bp, diastolic_bp, bs, heart_rate))
+    return None if level_idx == NO_OVERRIDE else RISK_LEVELS[level_idx]
 
 
 def _more_severe_risk(a: str, b: str) -> str:
@@ -58,60 +73,42 @@ def _more_severe_risk(a: str, b: str) -> str:
     return a if order.get(a, 0) >= order.get(b, 0) else b
 
 
-def _build_features_df(request: RiskPredictionRequest):
-    """Build a single-row DataFrame of features for model/scaler.
+def _build_raw_features(request: RiskPredictionRequest) -> tuple[np.ndarray, float]:
+    """Build a single-row feature matrix (columns in `RAW_FEATURE_NAMES` order) for the compiled model.
 
-    Supports both:
+    The engine picks the columns it was trained on, so this supports both:
     - newer artifacts trained on [Age,SystolicBP,DiastolicBP,BS,HeartRate]
     - older artifacts trained on [Age,MeanBP,BS,HeartRate]
     """
 
-    import pandas as pd
-
     sbp = float(request.systolic_bp)
     dbp = float(request.diastolic_bp)
     mean_bp = (sbp + dbp) / 2.0
 
-    df = pd.DataFrame(
-        [
-            {
-                "Age": float(request.age),
-                "SystolicBP": sbp,
-                "DiastolicBP": dbp,
-                "MeanBP": mean_bp,
-                "BS": float(request.bs),
-                "HeartRate": float(request.heart_rate),
-            }
-        ]
-    )
-    return df, mean_bp
-
-
-def load_model_artifacts() -> None:
-    """Load model and scaler from disk (once)."""
-    global _MODEL, _SCALER, _LOAD_ERROR
-
-    if _MODEL is not None and _SCALER is not None:
-        return
+    raw_features = np.array([[float(request.age), sbp, dbp, mean_bp, float(request.bs), float(request.heart_rate)]])
+    return raw_features, mean_bp
 
+
+def load_model_artifacts() -> RegistrySnapshot:
+    """Returns the models to serve the current request with (reloading them first if a new version is out)."""
+    snapshot = _REGISTRY.refresh()
+    if snapshot.active is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=_REGISTRY.load_error or "Risk prediction model not available. Please train the model first.",
+        )
+    return snapshot
+
+
+def _score_shadow(snapshot: RegistrySnapshot, raw_features: np.ndarray, active_level_idx: np.ndarray) -> None:
+    """Scores the readings with the shadow model (if any), only to compare it with the active one."""
+    if snapshot.shadow is None:
+        return
     try:
-        if not MODEL_PATH.exists():
-            _LOAD_ERROR = f"Model file not found: {MODEL_PATH}. Please run train_risk_model.py first."
-            logger.error(_LOAD_ERROR)
-            return
-
-        if not SCALER_PATH.exists():
-            _LOAD_ERROR = f"Scaler file not found: {SCALER_PATH}. Please run train_risk_model.py first."
-            logger.error(_LOAD_ERROR)
-            return
-
-        _MODEL = joblib.load(MODEL_PATH)
-        _SCALER = joblib.load(SCALER_PATH)
-        logger.info(f"✓ Risk model loaded from {MODEL_PATH}")
-        logger.info(f"✓ Scaler loaded from {SCALER_PATH}")
+        _, _, shadow_level_idx = predict_levels(snapshot.shadow.engine, raw_features)
+        _REGISTRY.record_shadow_levels(snapshot, active_level_idx, shadow_level_idx)
     except Exception as e:
-        _LOAD_ERROR = f"Failed to load model artifacts: {str(e)}"
-        logger.error(_LOAD_ERROR)
+        logger.warning(f"Shadow risk model '{snapshot.shadow.version}' failed: {str(e)}")
 
 
 @router.post(
@@ -121,62 +118,17 @@ def load_model_artifacts() -> None:
     description="Predict high-risk pregnancy based on vital signs and health metrics",
 )
 async def predict_risk(request: RiskPredictionRequest) -> JSONResponse:
-    load_model_artifacts()
-
-    if _MODEL is None or _SCALER is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=_LOAD_ERROR or "Risk prediction model not available. Please train the model first.",
-        )
+    snapshot = load_model_artifacts()
+    started_at = time.perf_counter()
 
     try:
-        features_df, mean_bp = _build_features_df(request)
-
-        # Align to scaler's expected feature order, if available.
-        if hasattr(_SCALER, "feature_names_in_"):
-            expected = list(getattr(_SCALER, "feature_names_in_"))
-            features_df = features_df.reindex(columns=expected)
-
-            # Backfill any NaNs introduced by reindexing.
-            backfill = {
-                "Age": float(request.age),
-                "SystolicBP": float(request.systolic_bp),
-                "DiastolicBP": float(request.diastolic_bp),
-                "MeanBP": float(mean_bp),
-                "BS": float(request.bs),
-                "HeartRate": float(request.heart_rate),
-            }
-            for col, value in backfill.items():
-                if col in features_df.columns and features_df[col].isna().any():
-                    features_df[col] = value
-
-        logger.info("Input features for prediction: {}", features_df.to_dict(orient="records")[0])
-
-        # Scale features
-        features_scaled = _SCALER.transform(features_df)
-
-        # Predict
-        pred = int(_MODEL.predict(features_scaled)[0])
-
-        # Label mapping
-        label_map_path = MODELS_DIR / "risk_label_map.joblib"
-        if label_map_path.exists():
-            num_to_label = {v: k for k, v in joblib.load(label_map_path).items()}
-        else:
-            num_to_label = {0: "low", 1: "mid", 2: "high"}
-
-        # Probabilities (if available)
-        model_probs = {"low": 0.0, "mid": 0.0, "high": 0.0}
-        if hasattr(_MODEL, "predict_proba"):
-            probs = _MODEL.predict_proba(features_scaled)[0]
-            for class_idx, prob in zip(_MODEL.classes_, probs):
-                label = num_to_label.get(int(class_idx), str(class_idx))
-                model_probs[label] = float(prob)
-        else:
-            label = num_to_label.get(pred, str(pred))
-            model_probs[label] = 1.0
-
-        risk_level = max(model_probs, key=lambda k: model_probs[k])
+        raw_features, mean_bp = _build_raw_features(request)
+
+        # Scale features + predict, in one pass through the compiled model
+        probs = snapshot.active.engine.predict_proba(raw_features)[0]
+        model_probs = {label: float(prob) for label, prob in zip(RISK_LEVELS, probs)}
+
+        risk_level = RISK_LEVELS[int(np.argmax(probs))]
 
         # Clinical override so extreme SBP/DBP can't be masked by MeanBP.
         override_level = _rule_based_risk_override(
@@ -188,47 +140,82 @@ async def predict_risk(request: RiskPredictionRequest) -> JSONResponse:
         if override_level is not None:
             risk_level = _more_severe_risk(risk_level, override_level)
 
-        # Keep probabilities consistent with final risk level when overridden.
-        if override_level is not None and risk_level in {"mid", "high"}:
-            class_probs = {"low": 0.0, "mid": 0.0, "high": 0.0}
-            class_probs[risk_level] = 1.0
-        else:
-            class_probs = model_probs
+        content = prediction_content(risk_level, model_probs, override_level, mean_bp)
+        final_level_idx = np.array([RISK_LEVELS.index(risk_level)])
+        override_idx = np.array([NO_OVERRIDE if override_level is None else RISK_LEVELS.index(override_level)])
+        _METRICS.record("predict", time.perf_counter() - started_at, raw_features, final_level_idx, override_idx)
+        if _should_log_request():
+            logger.info(
+                "Sampled risk prediction: {} -> {}",
+                dict(zip(RAW_FEATURE_NAMES, raw_features[0].tolist())),
+                risk_level,
+            )
+
+        _score_shadow(snapshot, raw_features, final_level_idx)
 
-        risk_probability = float(class_probs.get("high", 0.0))
-        is_high_risk = risk_level == "high"
+        return JSONResponse(status_code=status.HTTP_200_OK, content=content)
 
-        if risk_level == "high":
-            message = "go to nearby hospital for checkup"
-        else:
-            message = f"{risk_level.capitalize()} risk assessment. Please follow up as needed."
+    except Exception as e:
+        logger.exception(f"Risk prediction error: {str(e)}")
+        _METRICS.record_fallback("predict", time.perf_counter() - started_at)
+        safe = safe_fallback_content(float(locals().get("mean_bp", 0.0)))
+        return JSONResponse(status_code=status.HTTP_200_OK, content=safe)
 
+
+@router.post(
+    "/predict/batch",
+    status_code=status.HTTP_200_OK,
+    summary="Predict pregnancy health risk for many readings",
+    description="Score up to thousands of readings in one vectorized pass. Results are returned in request order",
+)
+async def predict_risk_batch(request: RiskBatchPredictionRequest) -> JSONResponse:
+    snapshot = load_model_artifacts()
+
+    readings = request.readings
+    sbp = np.fromiter((r.systolic_bp for r in readings), dtype=np.float64, count=len(readings))
+    dbp = np.fromiter((r.diastolic_bp for r in readings), dtype=np.float64, count=len(readings))
+    bs = np.fromiter((r.bs for r in readings), dtype=np.float64, count=len(readings))
+    heart_rate = np.fromiter((r.heart_rate for r in readings), dtype=np.float64, count=len(readings))
+    age = np.fromiter((r.age for r in readings), dtype=np.float64, count=len(readings))
+    raw_features = build_raw_features(age, sbp, dbp, bs, heart_rate)
+
+    started_at = time.perf_counter()
+    try:
+        results = score_readings(snapshot.active.engine, raw_features)
+        final_level_idx = np.array([RISK_LEVELS.index(result["risk_level"]) for result in results])
+        override_idx = np.array(
+            [NO_OVERRIDE if r["rule_override"] is None else RISK_LEVELS.index(r["rule_override"]) for r in results]
+        )
+        _METRICS.record("predict_batch", time.perf_counter() - started_at, raw_features, final_level_idx, override_idx)
+        if _should_log_request():
+            logger.info("Sampled batch risk prediction: {} readings", len(results))
+
+        _score_shadow(snapshot, raw_features, final_level_idx)
+        return JSONResponse(status_code=status.HTTP_200_OK, content=results)
+    except Exception as e:
+        logger.exception(f"Batch risk prediction error: {str(e)}")
+        _METRICS.record_fallback("predict_batch", time.perf_counter() - started_at)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
-                "risk_level": risk_level,
-                "probabilities": class_probs,
-                "model_probabilities": model_probs,
-                "rule_override": override_level,
-                "message": message,
-                "mean_bp": float(mean_bp),
-                "is_high_risk": is_high_risk,
-                "risk_probability": risk_probability,
-            },
+            content=[safe_fallback_content(mean_bp) for mean_bp in ((sbp + dbp) / 2.0).tolist()],
         )
 
-    except Exception as e:
-        logger.exception(f"Risk prediction error: {str(e)}")
-        safe = {
-            "risk_level": "low",
-            "probabilities": {"low": 1.0, "mid": 0.0, "high": 0.0},
-            "message": "Assessment unavailable due to an internal error. Please try again.",
-            "mean_bp": float(locals().get("mean_bp", 0.0)),
-            "is_high_risk": False,
-            "risk_probability": 0.0,
-        }
-        logger.info("Returning safe fallback after exception: {}", safe)
-        return JSONResponse(status_code=status.HTTP_200_OK, content=safe)
+
+@router.get(
+    "/trajectory",
+    response_model=RiskTrajectoryResponse,
+    summary="Risk over time, from the journal",
+    description="Score every journal day in [start, end] that has blood pressure, sugar level and heart rate logged",
+)
+async def get_risk_trajectory(
+    start: date = Query(...),
+    end: date = Query(...),
+    age: float | None = Query(None, gt=0, le=150, description="Only used if the date of birth is not set"),
+    mother: PregnantWoman = Depends(require_role(PregnantWoman)),
+    service: RiskService = Depends(get_risk_service),
+) -> RiskTrajectoryResponse:
+    snapshot = load_model_artifacts()
+    return await service.get_trajectory(mother, snapshot.active, start, end, age)
 
 
 @router.get(
@@ -238,10 +225,49 @@ async def predict_risk(request: RiskPredictionRequest) -> JSONResponse:
     description="Check if risk prediction model is loaded and available",
 )
 async def health_check():
-    load_model_artifacts()
+    snapshot = _REGISTRY.refresh()
+    return {
+        "status": "healthy" if snapshot.active is not None else "unavailable",
+        "model_loaded": snapshot.active is not None,
+        "scaler_loaded": snapshot.active is not None,
+        "model_version": snapshot.active.version if snapshot.active else None,
+        "shadow_model_version": snapshot.shadow.version if snapshot.shadow else None,
+        "error": _REGISTRY.load_error,
+    }
+
+
+@router.get(
+    "/models",
+    status_code=status.HTTP_200_OK,
+    summary="Risk model versions",
+    description="The active & shadow model versions, and how often the shadow model agrees with the active one",
+)
+async def get_model_versions():
+    snapshot = _REGISTRY.refresh()
+    manifest = read_manifest(MODELS_DIR)
+    shadow_stats = _REGISTRY.shadow_stats
+    return {
+        "active_version": snapshot.active.version if snapshot.active else None,
+        "shadow_version": snapshot.shadow.version if snapshot.shadow else None,
+        "available_versions": sorted(manifest.versions) if manifest else [],
+        "shadow_stats": shadow_stats.as_dict() if shadow_stats else None,
+        "error": _REGISTRY.load_error,
+    }
+
+
+@router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    summary="Risk prediction metrics",
+    description=(
+        "Latency histograms, override rate, class distribution and feature drift against the active model's "
+        "training set, over the last `window_minutes` (for the worker that serves this request)"
+    ),
+)
+async def get_risk_stats(window_minutes: int = Query(15, ge=1, le=60)):
+    snapshot = _REGISTRY.refresh()
+    reference = snapshot.active.engine if snapshot.active else None
     return {
-        "status": "healthy" if _MODEL is not None and _SCALER is not None else "unavailable",
-        "model_loaded": _MODEL is not None,
-        "scaler_loaded": _SCALER is not None,
-        "error": _LOAD_ERROR,
+        "model_version": snapshot.active.version if snapshot.active else None,
+        **_METRICS.summary(window_minutes, reference),
     }
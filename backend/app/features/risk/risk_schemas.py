@@ -1,6 +1,7 @@
 """Risk prediction API schemas."""
 
 import re
+from datetime import date
 from typing import Optional
 
 from pydantic import BaseModel, Field, model_validator
@@ -56,6 +57,12 @@ class RiskPredictionRequest(BaseModel):
         }
 
 
+class RiskBatchPredictionRequest(BaseModel):
+    """Request model for batch risk prediction."""
+
+    readings: list[RiskPredictionRequest] = Field(..., min_length=1, max_length=5000)
+
+
 class RiskPredictionResponse(BaseModel):
     """Response model for risk prediction.
 
@@ -72,3 +79,30 @@ class RiskPredictionResponse(BaseModel):
     # Backwards-compatible fields
     is_high_risk: Optional[bool] = Field(None, description="True if high risk detected")
     risk_probability: Optional[float] = Field(None, ge=0, le=1, description="Probability of high risk (0-1)")
+
+
+class RiskTrajectoryPoint(BaseModel):
+    """The risk assessment of a single journal day."""
+
+    journal_entry_id: int
+    logged_on: date
+    systolic_bp: float
+    diastolic_bp: float
+    bs: float
+    heart_rate: float
+
+    risk_level: str = Field(..., description="One of: low, mid, high")
+    risk_probability: float = Field(..., ge=0, le=1, description="Probability of high risk (0-1)")
+    probabilities: dict = Field(..., description="Per-class probabilities, e.g. {'low':0.7,'mid':0.2,'high':0.1}")
+    rule_override: Optional[str] = Field(None, description="The clinical rule's risk level, if one applied")
+
+
+class RiskTrajectoryResponse(BaseModel):
+    """Risk over time, one point per scorable journal day (in date order)."""
+
+    start: date
+    end: date
+    points: list[RiskTrajectoryPoint]
+    skipped_dates: list[date] = Field(
+        ..., description="Journal days without blood pressure, sugar level and heart rate all logged"
+    )
@@ -0,0 +1,140 @@
+"""Risk scoring over a mother's journal history."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.db_schema import JournalEntry, JournalScalarMetricLog, PregnantWoman, ScalarMetric
+
+from .risk_inference import build_raw_features, score_readings
+from .risk_registry import LoadedRiskModel
+from .risk_schemas import RiskTrajectoryPoint, RiskTrajectoryResponse
+
+# The labels of the seeded scalar metrics that feed the model (see "defaults_generator.py")
+SUGAR_METRIC_LABEL = "Sugar Level"
+HEART_RATE_METRIC_LABEL = "Heart Rate"
+
+# Scored journal days, keyed on (entry ID, the exact model inputs, the version of the model that scored them).
+# Editing an entry changes its inputs, and swapping the model changes the version, so stale results are never hit.
+# (The version string rather than the engine itself, so that the cache doesn't keep swapped-out engines alive.)
+_TRAJECTORY_CACHE_MAX_SIZE = 50_000
+_trajectory_cache: OrderedDict[tuple, dict] = OrderedDict()
+
+
+def _age_on(date_of_birth: date, on: date) -> int:
+    return on.year - date_of_birth.year - ((on.month, on.day) < (date_of_birth.month, date_of_birth.day))
+
+
+class RiskService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_trajectory(
+        self,
+        mother: PregnantWoman,
+        model: LoadedRiskModel,
+        start: date,
+        end: date,
+        age: float | None = None,
+    ) -> RiskTrajectoryResponse:
+        """
+        Scores every journal day in [start, end] that has blood pressure, sugar level and heart rate logged.
+        All the metrics are pulled in a single query, and only the days missing from the cache are scored
+        (in one vectorized batch).
+        """
+        if end < start:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'end' must not be before 'start'")
+        if mother.date_of_birth is None and age is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date of birth is not set, please provide an 'age'",
+            )
+
+        sugar_log = aliased(JournalScalarMetricLog)
+        heart_rate_log = aliased(JournalScalarMetricLog)
+        sugar_metric_id = select(ScalarMetric.id).where(ScalarMetric.label == SUGAR_METRIC_LABEL).scalar_subquery()
+        heart_rate_metric_id = (
+            select(ScalarMetric.id).where(ScalarMetric.label == HEART_RATE_METRIC_LABEL).scalar_subquery()
+        )
+        stmt = (
+            select(
+                JournalEntry.id,
+                JournalEntry.logged_on,
+                JournalEntry.systolic,
+                JournalEntry.diastolic,
+                sugar_log.value,
+                heart_rate_log.value,
+            )
+            .select_from(JournalEntry)
+            .outerjoin(
+                sugar_log,
+                and_(sugar_log.journal_entry_id == JournalEntry.id, sugar_log.scalar_metric_id == sugar_metric_id),
+            )
+            .outerjoin(
+                heart_rate_log,
+                and_(
+                    heart_rate_log.journal_entry_id == JournalEntry.id,
+                    heart_rate_log.scalar_metric_id == heart_rate_metric_id,
+                ),
+            )
+            .where(
+                JournalEntry.author_id == mother.id,
+                JournalEntry.logged_on >= start,
+                JournalEntry.logged_on <= end,
+            )
+            .order_by(JournalEntry.logged_on)
+        )
+        rows = (await self.db.execute(stmt)).all()
+
+        # Blood pressure defaults to 0/0 (i.e. "not logged"), and the scalar metrics are optional
+        scorable_rows, skipped_dates = [], []
+        for row in rows:
+            if row[2] > 0 and row[3] > 0 and row[4] is not None and row[5] is not None:
+                scorable_rows.append(row)
+            else:
+                skipped_dates.append(row[1])
+
+        keyed_rows: list[tuple[tuple, tuple]] = []
+        for entry_id, logged_on, systolic, diastolic, sugar, heart_rate in scorable_rows:
+            row_age = float(_age_on(mother.date_of_birth, logged_on)) if mother.date_of_birth else float(age)
+            inputs = (row_age, float(systolic), float(diastolic), float(sugar), float(heart_rate))
+            keyed_rows.append(((entry_id, inputs, model.version), inputs))
+
+        missing = [(key, inputs) for key, inputs in keyed_rows if key not in _trajectory_cache]
+        if missing:
+            columns = np.array([inputs for _, inputs in missing], dtype=np.float64).T
+            raw_features = build_raw_features(*columns)
+            for (key, _), content in zip(missing, score_readings(model.engine, raw_features)):
+                _trajectory_cache[key] = content
+
+        points: list[RiskTrajectoryPoint] = []
+        for (key, inputs), row in zip(keyed_rows, scorable_rows):
+            _trajectory_cache.move_to_end(key)
+            content = _trajectory_cache[key]
+            points.append(
+                RiskTrajectoryPoint(
+                    journal_entry_id=row[0],
+                    logged_on=row[1],
+                    systolic_bp=inputs[1],
+                    diastolic_bp=inputs[2],
+                    bs=inputs[3],
+                    heart_rate=inputs[4],
+                    risk_level=content["risk_level"],
+                    risk_probability=content["risk_probability"],
+                    probabilities=content["probabilities"],
+                    rule_override=content["rule_override"],
+                )
+            )
+
+        # Evict the least recently used days (only now, so that this request's days were all still there)
+        while len(_trajectory_cache) > _TRAJECTORY_CACHE_MAX_SIZE:
+            _trajectory_cache.popitem(last=False)
+
+        return RiskTrajectoryResponse(start=start, end=end, points=points, skipped_dates=skipped_dates)
@@ -0,0 +1,43 @@
+import mimetypes
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import FileResponse, Response
+
+from app.shared.s3_storage_interface import S3StorageInterface
+from app.shared.storage_backends import InMemoryStorageBackend, LocalStorageBackend, StorageError, verify_signed_url
+
+# Serves the objects of the "local" and "memory" storage backends, standing in for S3's presigned URLs.
+# With the (default) S3 backend, clients fetch straight from the bucket and every route here is a 404.
+storage_router = APIRouter(prefix="/storage", tags=["Storage"])
+
+
+@storage_router.get("/{obj_key:path}")
+async def get_stored_object(
+    obj_key: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+) -> Response:
+    backend = S3StorageInterface.backend
+    if not isinstance(backend, (LocalStorageBackend, InMemoryStorageBackend)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+
+    if not verify_signed_url(obj_key, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired signature")
+
+    headers = {"Cache-Control": S3StorageInterface.IMMUTABLE_CACHE_CONTROL}
+
+    if isinstance(backend, InMemoryStorageBackend):
+        obj = backend.get_object(obj_key)
+        if obj is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+        return Response(content=obj.content, media_type=obj.content_type, headers=headers)
+
+    try:
+        path = backend.path_for(obj_key)
+    except StorageError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+
+    media_type, _ = mimetypes.guess_type(path.name)
+    return FileResponse(path, media_type=media_type or "application/octet-stream", headers=headers)
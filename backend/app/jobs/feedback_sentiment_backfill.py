@@ -0,0 +1,199 @@
+r"""(Re-)score the sentiment of every piece of user app feedback.
+
+Needed whenever the scores stored at submission time are stale, for example:
+    > The VADER lexicon (or version) changed
+    > Feedback was imported in bulk without scores (i.e. "scripts/seed_feedback_samples.py")
+
+The feedback is streamed by a server-side cursor, in chunks of `--chunk-size` rows (by ascending ID).
+Each chunk is scored in a process pool (while the previous chunk is being written back), and only the rows
+whose scores actually changed are written back, with a single UPDATE ... FROM (VALUES ...) per chunk.
+The last committed ID is checkpointed after every chunk, so an interrupted run picks up where it left off.
+
+Usage (from backend folder):
+    python -m app.jobs.feedback_sentiment_backfill
+    python -m app.jobs.feedback_sentiment_backfill --workers 8 --chunk-size 5000
+    python -m app.jobs.feedback_sentiment_backfill --restart   # Ignore the checkpoint, re-score everything
+
+Requires the .env to have SYNC_DATABASE_URL set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from sqlalchemy import Float, Integer, Row, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from app.db.db_config import SessionLocal, engine
+from app.db.db_schema import UserAppFeedback
+from app.features.feedback.feedback_rollups import rebuild_feedback_rollups
+from app.features.feedback.service import init_sentiment_worker, score_texts
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_CHECKPOINT_PATH = Path(".feedback_sentiment_backfill.json")
+
+# Scores closer than this to the stored ones are considered unchanged (i.e. not written back)
+SCORE_TOLERANCE = 1e-9
+
+SCORE_COLUMNS = ("positive_score", "neutral_score", "negative_score", "compound_score")
+VADER_KEYS = ("pos", "neu", "neg", "compound")
+
+
+@dataclass
+class BackfillReport:
+    scanned_count: int = 0
+    updated_count: int = 0
+    last_id: int = 0
+
+    def summary(self) -> str:
+        return f"Scanned {self.scanned_count} feedback row(s), updated {self.updated_count} (last ID: {self.last_id})"
+
+
+def read_checkpoint(path: Path) -> int:
+    """Returns the last ID that was committed by a previous (interrupted) run, or 0."""
+    if not path.exists():
+        return 0
+    return int(json.loads(path.read_text())["last_id"])
+
+
+def write_checkpoint(path: Path, last_id: int) -> None:
+    """Written to a temp file and renamed over the old checkpoint, so that it is never left half written."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent.resolve(), prefix=".tmp-checkpoint-")
+    with os.fdopen(fd, "w") as tmp_file:
+        json.dump({"last_id": last_id}, tmp_file)
+    os.replace(tmp_path, path)
+
+
+def iter_feedback_chunks(after_id: int, chunk_size: int) -> Iterator[Sequence[Row]]:
+    """Streams (id, content, *scores) by ascending ID, on its own connection (server-side cursor)."""
+    stmt = (
+        select(UserAppFeedback.id, UserAppFeedback.content, *(getattr(UserAppFeedback, c) for c in SCORE_COLUMNS))
+        .where(UserAppFeedback.id > after_id)
+        .order_by(UserAppFeedback.id)
+    )
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        yield from result.partitions()
+
+
+def _split(items: list, parts: int) -> list[list]:
+    size = max(1, -(-len(items) // parts))  # Ceil division
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _changed_rows(chunk: Sequence[Row], scores: list[dict]) -> list[tuple]:
+    changed = []
+    for row, row_scores in zip(chunk, scores):
+        new = tuple(float(row_scores[key]) for key in VADER_KEYS)
+        old = tuple(getattr(row, c) for c in SCORE_COLUMNS)
+        if any(o is None or abs(o - n) > SCORE_TOLERANCE for o, n in zip(old, new)):
+            changed.append((row.id, *new))
+    return changed
+
+
+def write_scores(db: Session, rows: list[tuple]) -> None:
+    """UPDATE user_app_feedback ... FROM (VALUES (id, pos, neu, neg, compound), ...): one statement per chunk."""
+    if not rows:
+        return
+    scores = values(
+        column("id", Integer),
+        *(column(c, Float) for c in SCORE_COLUMNS),
+        name="new_scores",
+    ).data(rows)
+    db.execute(
+        update(UserAppFeedback)
+        .where(UserAppFeedback.id == scores.c.id)
+        .values({c: scores.c[c] for c in SCORE_COLUMNS}),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def backfill(
+    db: Session,
+    pool,
+    workers: int,
+    chunk_size: int,
+    checkpoint_path: Path,
+    dry_run: bool = False,
+) -> BackfillReport:
+    report = BackfillReport(last_id=read_checkpoint(checkpoint_path))
+    if report.last_id:
+        print(f"Resuming after feedback ID {report.last_id} (from {checkpoint_path})")
+
+    total = db.scalar(select(func.count()).where(UserAppFeedback.id > report.last_id)) or 0
+    started_at = time.monotonic()
+
+    def finish(chunk: Sequence[Row], async_result) -> None:
+        scores = [row_scores for part in async_result.get() for row_scores in part]
+        changed = _changed_rows(chunk, scores)
+        if not dry_run:
+            write_scores(db, changed)
+            db.commit()
+            write_checkpoint(checkpoint_path, chunk[-1].id)
+
+        report.scanned_count += len(chunk)
+        report.updated_count += len(changed)
+        report.last_id = chunk[-1].id
+
+        elapsed = time.monotonic() - started_at
+        rate = report.scanned_count / elapsed if elapsed else 0.0
+        eta = (total - report.scanned_count) / rate if rate else 0.0
+        print(
+            f"{report.scanned_count}/{total} scanned, {report.updated_count} updated "
+            f"({rate:.0f} rows/s, ETA {eta:.0f}s)",
+            flush=True,
+        )
+
+    # While the pool scores chunk N, chunk N-1 is written back
+    in_flight = None
+    for chunk in iter_feedback_chunks(report.last_id, chunk_size):
+        async_result = pool.map_async(score_texts, _split([row.content for row in chunk], workers))
+        if in_flight is not None:
+            finish(*in_flight)
+        in_flight = (chunk, async_result)
+    if in_flight is not None:
+        finish(*in_flight)
+
+    # Re-scoring can move feedback between sentiment buckets (also rebuilt when resuming, for the earlier runs' updates)
+    if not dry_run:
+        rebuild_feedback_rollups(db)
+        db.commit()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="(Re-)score the sentiment of all user app feedback")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (default: CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per DB round trip")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT_PATH, help="Where progress is saved")
+    parser.add_argument("--restart", action="store_true", help="Ignore (and discard) an existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would change")
+    args = parser.parse_args()
+
+    if args.restart:
+        args.checkpoint.unlink(missing_ok=True)
+
+    db_session: Session = SessionLocal()
+    try:
+        with multiprocessing.get_context("spawn").Pool(
+            processes=args.workers, initializer=init_sentiment_worker
+        ) as pool:
+            report = backfill(db_session, pool, args.workers, args.chunk_size, args.checkpoint, dry_run=args.dry_run)
+        print(report.summary())
+        if not args.dry_run:
+            # Completed, so the next run starts from scratch
+            args.checkpoint.unlink(missing_ok=True)
+    finally:
+        db_session.close()
+
+
+if __name__ == "__main__":
+    main()
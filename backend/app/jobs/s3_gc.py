@@ -0,0 +1,211 @@
+r"""Garbage-collect S3 objects that are no longer referenced by any row in the database.
+
+Objects become orphaned when, for example:
+    > A product (or recipe) is deleted, but its image is left behind
+    > A draft is published: its image is copied to the published prefix, and the draft copy is left behind
+    > An image (profile, background, product...) is replaced, since every different upload gets its own key
+    > An account creation request is approved (its staging image was copied) or rejected
+    > An upload's transaction fails after the upload, i.e. its key never gets stored
+
+Usage (from backend folder):
+    python -m app.jobs.s3_gc --dry-run
+    python -m app.jobs.s3_gc --min-age-hours 48
+
+Requires the .env to have SYNC_DATABASE_URL and the storage (S3) settings set.
+Works against whichever backend STORAGE_BACKEND selects.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.db.db_config import SessionLocal
+from app.db.db_schema import (
+    AccountCreationRequestStatus,
+    DoctorAccountCreationRequest,
+    Nutritionist,
+    NutritionistAccountCreationRequest,
+    Page,
+    Product,
+    ProductDraft,
+    Recipe,
+    RecipeDraft,
+    User,
+    VolunteerDoctor,
+)
+from app.shared.s3_storage_interface import S3StorageInterface
+
+# Only the prefixes that have a column pointing back at them are collected.
+# Anything else in the bucket is left alone.
+MANAGED_PREFIXES: tuple[str, ...] = (
+    S3StorageInterface.PRODUCT_PREFIX,
+    S3StorageInterface.PRODUCT_DRAFT_PREFIX,
+    S3StorageInterface.RECIPE_PREFIX,
+    S3StorageInterface.RECIPE_DRAFT_PREFIX,
+    S3StorageInterface.STAGING_QUALIFICATION_PREFIX,
+    S3StorageInterface.QUALIFICATION_PREFIX,
+    S3StorageInterface.PROFILE_PREFIX,
+    S3StorageInterface.BACKGROUND_IMAGE_PREFIX,
+)
+
+# How many rows to pull from the DB per round trip while building the set of referenced keys
+DB_YIELD_PER = 5000
+
+
+@dataclass
+class GarbageCollectionReport:
+    dry_run: bool
+    scanned_count: int = 0
+    orphaned_bytes: int = 0
+    orphaned_per_prefix: Counter[str] = field(default_factory=Counter)
+    failed_keys: list[str] = field(default_factory=list)
+    rereferenced_keys: list[str] = field(default_factory=list)  # Orphaned when listed, but referenced before deletion
+
+    @property
+    def orphaned_count(self) -> int:
+        return sum(self.orphaned_per_prefix.values())
+
+    def summary(self) -> str:
+        verb = "Would delete" if self.dry_run else "Deleted"
+        deleted_count = self.orphaned_count - len(self.failed_keys) - len(self.rereferenced_keys)
+        lines = [
+            f"Scanned {self.scanned_count} object(s) across {len(MANAGED_PREFIXES)} prefix(es)",
+            f"{verb} {deleted_count} orphaned object(s), {self.orphaned_bytes / (1024 * 1024):.2f} MiB in total",
+        ]
+        lines.extend(f"  {prefix:<28} {count}" for prefix, count in sorted(self.orphaned_per_prefix.items()))
+        if self.rereferenced_keys:
+            lines.append(f"Kept {len(self.rereferenced_keys)} object(s) that were referenced again before deletion")
+        if self.failed_keys:
+            lines.append(f"Failed to delete {len(self.failed_keys)} object(s):")
+            lines.extend(f"  {key}" for key in self.failed_keys)
+        return "\n".join(lines)
+
+
+def _referencing_stmts() -> list[tuple[Select, InstrumentedAttribute]]:
+    """(The select of the keys referenced by a table, the column that they are in), for every table that has them."""
+    return [
+        (select(User.profile_img_key), User.profile_img_key),
+        (select(VolunteerDoctor.qualification_img_key), VolunteerDoctor.qualification_img_key),
+        (select(Nutritionist.qualification_img_key), Nutritionist.qualification_img_key),
+        (select(Product.img_key), Product.img_key),
+        (select(ProductDraft.img_key), ProductDraft.img_key),
+        (select(Recipe.img_key), Recipe.img_key),
+        (select(RecipeDraft.img_key), RecipeDraft.img_key),
+        (select(Page.background_image), Page.background_image),
+        # Approved requests have had their image promoted, and rejected ones will never be,
+        # so only the staging images of PENDING requests are still "live"
+        (
+            select(DoctorAccountCreationRequest.qualification_img_key).where(
+                DoctorAccountCreationRequest.account_status == AccountCreationRequestStatus.PENDING
+            ),
+            DoctorAccountCreationRequest.qualification_img_key,
+        ),
+        (
+            select(NutritionistAccountCreationRequest.qualification_img_key).where(
+                NutritionistAccountCreationRequest.account_status == AccountCreationRequestStatus.PENDING
+            ),
+            NutritionistAccountCreationRequest.qualification_img_key,
+        ),
+    ]
+
+
+def iter_referenced_keys(db: Session) -> Iterator[str]:
+    """Streams every S3 key that is still referenced by a row in the database."""
+    for stmt, _ in _referencing_stmts():
+        for key in db.scalars(stmt.execution_options(yield_per=DB_YIELD_PER)):
+            if key:
+                yield key
+
+
+def referenced_keys_among(db: Session, keys: list[str]) -> set[str]:
+    """Which of the `keys` are referenced by a row in the database right now."""
+    referenced: set[str] = set()
+    for stmt, column in _referencing_stmts():
+        referenced.update(db.scalars(stmt.where(column.in_(keys))))
+    return referenced
+
+
+def _delete_unreferenced(db: Session, keys: list[str], report: GarbageCollectionReport) -> None:
+    """
+    Deletes a batch of orphans, but first re-checks them against the database: the listing may have taken long
+    enough for some of them to have been referenced again since the referenced keys were read (e.g. a deduplicated
+    upload of the same image, which reuses the existing object).
+    """
+    db.rollback()  # Ends the previous snapshot (if any), so that the re-check sees the latest commits
+    rereferenced_keys = referenced_keys_among(db, keys)
+    report.rereferenced_keys.extend(rereferenced_keys)
+    report.failed_keys.extend(S3StorageInterface.delete_objects([key for key in keys if key not in rereferenced_keys]))
+
+
+def collect_garbage(db: Session, dry_run: bool, min_age: timedelta, verbose: bool = False) -> GarbageCollectionReport:
+    """
+    Diffs the bucket listing against the set of referenced keys, and deletes the orphans in batches.
+
+    Objects younger than `min_age` are always kept, since uploads happen BEFORE the transaction that
+    stores their key is committed (i.e. a freshly uploaded image is briefly "unreferenced"). Uploads that are
+    deduplicated onto an existing object touch it for the same reason, and each batch is re-checked before deletion.
+    """
+    referenced_keys: set[str] = set(iter_referenced_keys(db))
+    cutoff = datetime.now(timezone.utc) - min_age
+    report = GarbageCollectionReport(dry_run=dry_run)
+
+    pending_deletion: list[str] = []
+    for prefix in MANAGED_PREFIXES:
+        for obj in S3StorageInterface.iter_objects(prefix):
+            report.scanned_count += 1
+            key = obj.key
+            if key in referenced_keys or obj.last_modified > cutoff:
+                continue
+
+            report.orphaned_per_prefix[prefix] += 1
+            report.orphaned_bytes += obj.size
+            if verbose or dry_run:
+                print(f"{'[dry-run] ' if dry_run else ''}Orphaned: {key}")
+            if dry_run:
+                continue
+
+            pending_deletion.append(key)
+            if len(pending_deletion) >= S3StorageInterface.DELETE_OBJECTS_BATCH_SIZE:
+                _delete_unreferenced(db, pending_deletion, report)
+                pending_deletion.clear()
+
+    if pending_deletion:
+        _delete_unreferenced(db, pending_deletion, report)
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete S3 objects that are no longer referenced in the database")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the orphaned objects, delete nothing")
+    parser.add_argument(
+        "--min-age-hours",
+        type=float,
+        default=24,
+        help="Never touch objects modified more recently than this (default: 24)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print every orphaned key, even when deleting")
+    args = parser.parse_args()
+
+    db_session: Session = SessionLocal()
+    try:
+        report = collect_garbage(
+            db_session,
+            dry_run=args.dry_run,
+            min_age=timedelta(hours=args.min_age_hours),
+            verbose=args.verbose,
+        )
+        print(report.summary())
+    finally:
+        db_session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,28 @@
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import HTMLResponse, UJSONResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from loguru import logger
 from sqlalchemy.exc import IntegrityError
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import JSONResponse
 
+from app.core.middleware import MultipartBodySizeLimitMiddleware
 from app.core.settings import settings
 from app.core.users_manager import auth_backend, fastapi_users
+from app.db.db_config import AsyncSessionLocal
 from app.features.accounts.account_router import account_router
 from app.features.admin.admin_router import admin_router
 from app.features.appointments.appointment_router import appointments_router
 from app.features.community_threads.thread_router import community_threads_router
+from app.features.dashboard.dashboard_router import dashboard_router
 from app.features.educational_articles.edu_article_router import edu_articles_router
 from app.features.feedback.feedback_router import feedback_router
+from app.features.feedback.service import sentiment_scoring_service
 from app.features.getstream.stream_router import stream_router
 from app.features.journal.journal_router import journal_router
 from app.features.kick_tracker.kick_tracker_router import kick_tracker_router
@@ -25,15 +32,36 @@ from app.features.notifications.notification_router import notification_router
 from app.features.products.product_router import product_router
 from app.features.recipes.recipe_router import recipe_router
 from app.features.risk.risk_router import router as risk_router
+from app.features.storage.storage_router import storage_router
 from app.schemas import UserCreate, UserRead, UserUpdate
+from app.shared.image_validation import MAX_IMAGE_BYTES
+from app.shared.reference_data import reference_data_cache
 
 if not settings.APP_ENV:
     raise ValueError("APP_ENV is not set in environment variables")
 
 APP_TITLE: str = "MyPregnancy API"
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Load the reference data (categories, metric definitions...) before the first request needs it.
+    # Only a warm-up: the app must still boot without the database (e.g. before "alembic upgrade" on a first deploy),
+    # in which case the first request that needs the reference data loads it instead
+    try:
+        async with AsyncSessionLocal() as db:
+            await reference_data_cache.get(db)
+    except Exception as e:
+        logger.warning(f"Could not preload the reference data, it will be loaded on demand: {str(e)}")
+    yield
+    # Stops the sentiment scoring's worker processes (if any were started)
+    sentiment_scoring_service.close()
+
+
 app = (
     FastAPI(
         title=APP_TITLE,
+        lifespan=lifespan,
         redirect_slashes=False,
         docs_url=None,
         redoc_url=None,
@@ -45,8 +73,11 @@ app = (
         and (settings.DOCS_PASSWORD and len(settings.DOCS_PASSWORD) > 1)
         and settings.APP_ENV != "dev"  # Unless explicitly set to dev....will protect the docs
     )
-    else FastAPI(title=APP_TITLE, redirect_slashes=False)
+    else FastAPI(title=APP_TITLE, redirect_slashes=False, lifespan=lifespan)
 )
+# Leave some headroom on top of the largest image, for the other form fields.
+# Added before (i.e. inside) the CORS middleware, so that its 413s still carry the CORS headers
+app.add_middleware(MultipartBodySizeLimitMiddleware, max_body_bytes=MAX_IMAGE_BYTES + 1024 * 1024)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -75,6 +106,7 @@ app.include_router(admin_router)
 app.include_router(edu_articles_router)
 app.include_router(appointments_router)
 app.include_router(journal_router)
+app.include_router(dashboard_router)
 app.include_router(account_router)
 app.include_router(stream_router)
 app.include_router(feedback_router)
@@ -86,6 +118,7 @@ app.include_router(kick_tracker_router)
 app.include_router(misc_router)
 app.include_router(router)
 app.include_router(feedback_router_yh)
+app.include_router(storage_router)
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 
 
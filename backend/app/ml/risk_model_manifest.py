@@ -0,0 +1,92 @@
+"""
+The layout of the versioned risk model artifacts, shared by the trainer (writes) and the API's registry (reads).
+
+    models/
+        manifest.json           - Which version is active, and which (if any) runs in shadow mode
+        <version>/
+            risk_model.joblib
+            risk_scaler.joblib
+            risk_label_map.joblib
+            metrics.json        - The trainer's evaluation report & timings
+
+Older deployments only have the 3 joblib files directly under "models/" (and no manifest),
+which the registry still serves as the "legacy" version.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+MANIFEST_FILENAME = "manifest.json"
+MODEL_FILENAME = "risk_model.joblib"
+SCALER_FILENAME = "risk_scaler.joblib"
+LABEL_MAP_FILENAME = "risk_label_map.joblib"
+METRICS_FILENAME = "metrics.json"
+
+LEGACY_VERSION = "legacy"
+
+
+@dataclass
+class ModelManifest:
+    active: str | None = None
+    shadow: str | None = None
+    # Version -> free-form metadata (i.e. when it was trained, its evaluation metrics, ...)
+    versions: dict[str, dict] = field(default_factory=dict)
+
+
+def version_dir(models_dir: Path, version: str) -> Path:
+    return models_dir if version == LEGACY_VERSION else models_dir / version
+
+
+def new_version_name() -> str:
+    """Versions are named by their (UTC) training time, so that they sort chronologically."""
+    return datetime.now(timezone.utc).strftime("v%Y%m%dT%H%M%SZ")
+
+
+def read_manifest(models_dir: Path) -> ModelManifest | None:
+    manifest_path = models_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    data = json.loads(manifest_path.read_text())
+    return ModelManifest(active=data.get("active"), shadow=data.get("shadow"), versions=data.get("versions", {}))
+
+
+def write_manifest(models_dir: Path, manifest: ModelManifest) -> None:
+    """Written to a temp file and renamed over the old manifest, so that readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=models_dir, prefix=".manifest-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(asdict(manifest), tmp_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, models_dir / MANIFEST_FILENAME)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def register_version(models_dir: Path, version: str, metadata: dict, role: str = "active") -> ModelManifest:
+    """
+    Adds an already exported version (i.e. "models/<version>/" is fully written) to the manifest.
+
+    Args:
+        role: "active" to serve it right away, "shadow" to score it alongside the active model
+              (without affecting responses), or "none" to only record it.
+    """
+    if role not in ("active", "shadow", "none"):
+        raise ValueError(f"Unknown role: {role}")
+
+    manifest = read_manifest(models_dir) or ModelManifest()
+    manifest.versions[version] = metadata
+    if role == "active":
+        manifest.active = version
+        if manifest.shadow == version:
+            manifest.shadow = None
+    elif role == "shadow":
+        manifest.shadow = version
+
+    write_manifest(models_dir, manifest)
+    return manifest
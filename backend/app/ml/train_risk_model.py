@@ -1,7 +1,7 @@
 """
 Risk prediction model trainer.
 Trains logistic regression model on health metrics data.
-Exports model and scaler to joblib files.
+Exports model and scaler to joblib files, as a new version under "models/" (see risk_model_manifest.py).
 changes:
 blood pressure lower than 90/60 is considered mid risk. any thing below this is high risk.
 blood pressure above 140/90 is considered mid risk. anything above this is high risk.
@@ -11,93 +11,156 @@ for heart rate if anything above 120 is high risk. anything between 100-120 is m
 for confidence replace it with (go to nearby hospital for checkup)
 """
 
+import argparse
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, classification_report
-from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
+from app.features.risk.risk_inference import (
+    DEFAULT_LABEL_MAP,
+    NO_OVERRIDE,
+    RISK_LEVELS,
+    RiskInferenceEngine,
+    build_raw_features,
+    rule_based_override_levels,
+)
+from app.ml.risk_model_manifest import (
+    LABEL_MAP_FILENAME,
+    METRICS_FILENAME,
+    MODEL_FILENAME,
+    SCALER_FILENAME,
+    new_version_name,
+    register_version,
+)
+
 # Paths
 SCRIPT_DIR = Path(__file__).resolve().parent
-MODEL_DIR = SCRIPT_DIR / "models"
-MODEL_PATH = MODEL_DIR / "risk_model.joblib"
-SCALER_PATH = MODEL_DIR / "risk_scaler.joblib"
+MODELS_DIR = SCRIPT_DIR / "models"
+DEFAULT_CSV_PATH = SCRIPT_DIR / "health_v1.csv"
+
+FEATURE_COLUMNS = ["Age", "SystolicBP", "DiastolicBP", "BS", "HeartRate"]
+REQUIRED_COLUMNS = [*FEATURE_COLUMNS, "RiskLevel"]
+
+# Searched with cross-validation (the "model__" prefix targets the pipeline's LogisticRegression step)
+PARAM_GRID = {
+    "model__C": [0.01, 0.1, 1.0, 10.0, 100.0],
+    "model__class_weight": ["balanced", None],
+}
+CV_FOLDS = 5
+
+
+@contextmanager
+def _timed(timings: dict[str, float], stage: str):
+    start = time.perf_counter()
+    yield
+    timings[stage] = round(time.perf_counter() - start, 4)
+
+
+def derive_labels(data: pd.DataFrame) -> np.ndarray:
+    """
+    Applies the clinical heuristics (overrides) to derive a risk label for every row at once.
+    The rules are `rule_based_override_levels`, i.e. the very same ones the API applies at prediction time.
+    Rows no rule applies to fall back to the CSV's "RiskLevel" ("high" / "mid" / anything else is "low").
+
+    Returns: An int array of indices into RISK_LEVELS (which match DEFAULT_LABEL_MAP)
+    """
+    override_idx = rule_based_override_levels(
+        data["SystolicBP"].to_numpy(dtype=np.float64),
+        data["DiastolicBP"].to_numpy(dtype=np.float64),
+        data["BS"].to_numpy(dtype=np.float64),
+        data["HeartRate"].to_numpy(dtype=np.float64),
+    )
+
+    csv_label = data["RiskLevel"].astype(str).str.lower()
+    csv_idx = np.select(
+        [csv_label.str.contains("high", regex=False), csv_label.str.contains("mid", regex=False)],
+        [RISK_LEVELS.index("high"), RISK_LEVELS.index("mid")],
+        default=RISK_LEVELS.index("low"),
+    )
+    return np.where(override_idx != NO_OVERRIDE, override_idx, csv_idx)
+
+
+def _base_model() -> LogisticRegression:
+    # Train multi-class model (attempt multinomial solver; fallback to default if unsupported)
+    try:
+        return LogisticRegression(max_iter=1000, random_state=42, multi_class="multinomial", solver="lbfgs")
+    except TypeError:
+        # Newer scikit-learn versions dropped 'multi_class' (lbfgs is multinomial by default)
+        return LogisticRegression(max_iter=1000, random_state=42, solver="lbfgs")
 
 
-def train_and_export(csv_path: str = "health_v1.csv") -> dict:
-    # Ensure model directory exists
-    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+def _benchmark_inference(scaler, model, X_test: pd.DataFrame, timings: dict[str, float]) -> dict:
+    """How fast the API's compiled engine scores the test set, compared to sklearn (see risk_inference.py)."""
+    engine = RiskInferenceEngine.from_sklearn(scaler, model, DEFAULT_LABEL_MAP)
+    raw_features = build_raw_features(*(X_test[column].to_numpy(dtype=np.float64) for column in FEATURE_COLUMNS))
+
+    with _timed(timings, "benchmark_engine"):
+        engine_probs = engine.predict_proba(raw_features)
+    with _timed(timings, "benchmark_sklearn"):
+        sklearn_probs = model.predict_proba(scaler.transform(X_test))
 
-    # Read dataset
-    data = pd.read_csv(csv_path)
+    n_rows = len(X_test)
+    return {
+        "rows": n_rows,
+        "engine_rows_per_second": round(n_rows / max(timings["benchmark_engine"], 1e-9)),
+        "sklearn_rows_per_second": round(n_rows / max(timings["benchmark_sklearn"], 1e-9)),
+        "max_abs_probability_diff": float(np.abs(engine_probs[:, : sklearn_probs.shape[1]] - sklearn_probs).max()),
+    }
+
+
+def train_and_export(csv_path: str | Path = DEFAULT_CSV_PATH, role: str = "active", n_jobs: int = -1) -> dict:
+    """
+    Args:
+        role: What the new version is registered as in the manifest ("active", "shadow" or "none"),
+              see `register_version`
+        n_jobs: How many processes the hyperparameter search uses (-1 = all CPUs)
+    """
+    timings: dict[str, float] = {}
+    total_start = time.perf_counter()
+
+    # Each run is exported to its own directory, and only registered in the manifest once fully written
+    version = new_version_name()
+    MODEL_DIR = MODELS_DIR / version
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    MODEL_PATH = MODEL_DIR / MODEL_FILENAME
+    SCALER_PATH = MODEL_DIR / SCALER_FILENAME
+    LABEL_MAP_PATH = MODEL_DIR / LABEL_MAP_FILENAME
+    METRICS_PATH = MODEL_DIR / METRICS_FILENAME
 
-    # Trim whitespace from column names
-    data.columns = [c.strip() for c in data.columns]
+    with _timed(timings, "load_csv"):
+        # Trim whitespace from column names
+        data = pd.read_csv(csv_path).rename(columns=str.strip)
 
-    # Check if required columns exist
-    required = ["Age", "SystolicBP", "DiastolicBP", "BS", "HeartRate", "RiskLevel"]
-    missing = [c for c in required if c not in data.columns]
-    if missing:
-        raise KeyError(f"Missing required columns in CSV: {missing}")
+        # Check if required columns exist
+        missing = [c for c in REQUIRED_COLUMNS if c not in data.columns]
+        if missing:
+            raise KeyError(f"Missing required columns in CSV: {missing}")
 
-    # Drop rows with missing values
-    data = data.dropna(subset=required)
+        # Drop rows with missing values
+        data = data.dropna(subset=REQUIRED_COLUMNS)
 
     # Prepare features (use SBP/DBP directly; MeanBP can hide extremes)
-    X = data[["Age", "SystolicBP", "DiastolicBP", "BS", "HeartRate"]]
+    X = data[FEATURE_COLUMNS].astype(np.float64)
 
     # Prepare multi-class target (low=0, mid=1, high=2) with rule-based overrides
-    data["RiskLevel"] = data["RiskLevel"].astype(str).str.lower().str.strip()
-
-    def derive_label(row):
-        """Apply clinical heuristics (overrides) to derive a risk label for training.
-        High-risk overrides take precedence, then mid-risk. Unknown falls back to CSV label or 'low'.
-        Rules implemented:
-        - High risk if: BS < 4.0 OR HR > 120 OR SBP > 160 OR DBP > 100 OR SBP < 80 OR DBP < 50
-        - Mid risk if: HR in (100, 120] OR SBP > 140 OR DBP > 90 OR SBP < 90 OR DBP < 60
-        (Note: the earlier 'HR > 40' rule is ignored as requested.)
-        """
-        sbp = float(row["SystolicBP"])
-        dbp = float(row["DiastolicBP"])
-        bs_val = float(row["BS"])
-        hr = float(row["HeartRate"])
-
-        # High-risk overrides
-        if bs_val < 4.0:
-            return "high"
-        if hr > 120:
-            return "high"
-        if sbp > 160 or dbp > 100:
-            return "high"
-        if sbp < 80 or dbp < 50:
-            return "high"
-
-        # Mid-risk overrides
-        if 100 < hr <= 120:
-            return "mid"
-        if sbp > 140 or dbp > 90:
-            return "mid"
-        if sbp < 90 or dbp < 60:
-            return "mid"
-
-        # Fallback to CSV label if available
-        txt = str(row.get("RiskLevel", "")).lower()
-        if "high" in txt:
-            return "high"
-        if "mid" in txt:
-            return "mid"
-        return "low"
-
-    data["derived_label"] = data.apply(derive_label, axis=1)
-
-    label_to_num = {"low": 0, "mid": 1, "high": 2}
-    y = data["derived_label"].map(label_to_num).astype(int)
+    with _timed(timings, "derive_labels"):
+        y = pd.Series(derive_labels(data), index=data.index, name="derived_label")
+
+    label_to_num = dict(DEFAULT_LABEL_MAP)
 
     # Show class distribution
-    class_counts = y.value_counts().to_dict()
+    class_counts = {RISK_LEVELS[idx]: int(count) for idx, count in y.value_counts().sort_index().items()}
     print(f"Class distribution (derived labels): {class_counts}")
 
     # Split data with stratify to keep class ratios in train/test when possible
@@ -108,79 +171,121 @@ def train_and_export(csv_path: str = "health_v1.csv") -> dict:
         print("Warning: stratify split failed (not enough samples per class). Falling back to unstratified split.")
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-
-    # Train multi-class model (attempt multinomial solver; fallback to default if unsupported)
-    # Use class_weight to help with imbalanced classes
-    try:
-        model = LogisticRegression(
-            max_iter=1000, random_state=42, multi_class="multinomial", solver="lbfgs", class_weight="balanced"
-        )
-    except TypeError:
-        # Older scikit-learn versions may not support some params; fall back but keep class_weight if available
-        print(
-            "Warning: installed scikit-learn does not support one or more parameters; falling back to a simpler LogisticRegression constructor with class_weight if available."
-        )
-        try:
-            model = LogisticRegression(max_iter=1000, random_state=42, class_weight="balanced")
-        except TypeError:
-            model = LogisticRegression(max_iter=1000, random_state=42)
-
-    model.fit(X_train_scaled, y_train)
+    # The scaler is part of the pipeline, so that each CV fold is only scaled with its own training rows
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", _base_model())])
+    cv_folds = max(2, min(CV_FOLDS, int(y_train.value_counts().min())))
+    search = GridSearchCV(
+        pipeline,
+        PARAM_GRID,
+        cv=StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42),
+        scoring="f1_macro",
+        n_jobs=n_jobs,
+        refit=True,
+    )
+    with _timed(timings, "hyperparameter_search"):
+        search.fit(X_train, y_train)
+
+    scaler: StandardScaler = search.best_estimator_.named_steps["scaler"]
+    model: LogisticRegression = search.best_estimator_.named_steps["model"]
+    print(f"Best parameters ({cv_folds}-fold CV, macro F1 = {search.best_score_:.4f}): {search.best_params_}")
 
     # Evaluate
-    predictions = model.predict(X_test_scaled)
+    with _timed(timings, "evaluate"):
+        predictions = model.predict(scaler.transform(X_test))
     accuracy = accuracy_score(y_test, predictions)
-    report = classification_report(y_test, predictions, target_names=["low", "mid", "high"])
+    report = classification_report(y_test, predictions, labels=[0, 1, 2], target_names=list(RISK_LEVELS))
+    report_dict = classification_report(
+        y_test, predictions, labels=[0, 1, 2], target_names=list(RISK_LEVELS), output_dict=True, zero_division=0
+    )
+    cm = confusion_matrix(y_test, predictions, labels=[0, 1, 2])
 
     # Print model classes and some diagnostics to help debugging (e.g., missing 'mid')
-    try:
-        print(f"model.classes_: {getattr(model, 'classes_', None)}")
-    except Exception:
-        pass
-
-    # Show confusion matrix counts for further insight
-    try:
-        from sklearn.metrics import confusion_matrix
+    print(f"model.classes_: {getattr(model, 'classes_', None)}")
+    print("Confusion matrix (rows=true, cols=pred) for [low,mid,high]:")
+    print(cm)
 
-        cm = confusion_matrix(y_test, predictions, labels=[0, 1, 2])
-        print("Confusion matrix (rows=true, cols=pred) for [low,mid,high]:")
-        print(cm)
-    except Exception:
-        pass
+    benchmark = _benchmark_inference(scaler, model, X_test, timings)
 
     # Export label map as well for consistent runtime mapping
-    LABEL_MAP_PATH = MODEL_DIR / "risk_label_map.joblib"
-    joblib.dump(label_to_num, LABEL_MAP_PATH)
-
-    # Export model and scaler
-    joblib.dump(model, MODEL_PATH)
-    joblib.dump(scaler, SCALER_PATH)
+    with _timed(timings, "export"):
+        joblib.dump(label_to_num, LABEL_MAP_PATH)
+        joblib.dump(model, MODEL_PATH)
+        joblib.dump(scaler, SCALER_PATH)
+    timings["total"] = round(time.perf_counter() - total_start, 4)
+
+    metrics = {
+        "version": version,
+        "dataset": Path(csv_path).name,
+        "n_samples": int(len(data)),
+        "class_distribution": class_counts,
+        "best_params": {key.removeprefix("model__"): value for key, value in search.best_params_.items()},
+        "cv_folds": cv_folds,
+        "cv_best_f1_macro": float(search.best_score_),
+        "cv_results": [
+            {"params": params, "mean_f1_macro": float(mean), "std_f1_macro": float(std)}
+            for params, mean, std in zip(
+                search.cv_results_["params"],
+                search.cv_results_["mean_test_score"],
+                search.cv_results_["std_test_score"],
+            )
+        ],
+        "test_accuracy": float(accuracy),
+        "classification_report": report_dict,
+        "confusion_matrix": cm.tolist(),
+        "inference_benchmark": benchmark,
+        "timings_seconds": timings,
+    }
+    METRICS_PATH.write_text(json.dumps(metrics, indent=2, default=str))
 
     print(f"✓ Model saved to {MODEL_PATH}")
     print(f"✓ Scaler saved to {SCALER_PATH}")
     print(f"✓ Label map saved to {LABEL_MAP_PATH}")
+    print(f"✓ Metrics report saved to {METRICS_PATH}")
     print(f"\nAccuracy: {accuracy:.4f}")
     print(f"\n{report}")
+    print("Timings (seconds): " + ", ".join(f"{stage}={seconds}" for stage, seconds in timings.items()))
+
+    register_version(
+        MODELS_DIR,
+        version,
+        {
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "dataset": Path(csv_path).name,
+            "n_samples": int(len(data)),
+            "accuracy": float(accuracy),
+            "cv_best_f1_macro": float(search.best_score_),
+            "best_params": metrics["best_params"],
+        },
+        role=role,
+    )
+    print(f"✓ Version '{version}' registered in the manifest as: {role}")
 
     return {
+        "version": version,
         "accuracy": float(accuracy),
         "classification_report": report,
         "model_path": str(MODEL_PATH),
         "scaler_path": str(SCALER_PATH),
         "label_map_path": str(LABEL_MAP_PATH),
+        "metrics_path": str(METRICS_PATH),
     }
 
 
 if __name__ == "__main__":
     import sys
 
-    csv_path = sys.argv[1] if len(sys.argv) > 1 else "health_v1.csv"
+    parser = argparse.ArgumentParser(description="Train the risk model and export it as a new version")
+    parser.add_argument("csv_path", nargs="?", default=str(DEFAULT_CSV_PATH))
+    parser.add_argument(
+        "--role",
+        choices=("active", "shadow", "none"),
+        default="active",
+        help="'shadow' scores the new version alongside the active one (without affecting responses)",
+    )
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Processes for the hyperparameter search (-1 = all)")
+    args = parser.parse_args()
     try:
-        train_and_export(csv_path)
+        train_and_export(args.csv_path, role=args.role, n_jobs=args.n_jobs)
     except Exception as e:
         print(f"Error training model: {e}")
         sys.exit(1)
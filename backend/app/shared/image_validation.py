@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, UnidentifiedImageError
+
+from app.shared.s3_storage_interface import S3StorageInterface
+
+
+@dataclass(frozen=True)
+class ImageLimits:
+    max_bytes: int
+    max_pixels: int  # width * height, checked from the header BEFORE anything gets decoded
+    allowed_formats: frozenset[str] = frozenset({"JPEG", "PNG", "WEBP"})
+
+
+_MiB = 1024 * 1024
+
+DEFAULT_IMAGE_LIMITS = ImageLimits(max_bytes=5 * _MiB, max_pixels=25_000_000)
+
+# Keyed by the S3 prefix that the image will eventually be stored under
+IMAGE_LIMITS: dict[str, ImageLimits] = {
+    S3StorageInterface.PROFILE_PREFIX: ImageLimits(max_bytes=5 * _MiB, max_pixels=16_000_000),
+    S3StorageInterface.PRODUCT_PREFIX: ImageLimits(max_bytes=8 * _MiB, max_pixels=25_000_000),
+    S3StorageInterface.PRODUCT_DRAFT_PREFIX: ImageLimits(max_bytes=8 * _MiB, max_pixels=25_000_000),
+    S3StorageInterface.RECIPE_PREFIX: ImageLimits(max_bytes=8 * _MiB, max_pixels=25_000_000),
+    S3StorageInterface.RECIPE_DRAFT_PREFIX: ImageLimits(max_bytes=8 * _MiB, max_pixels=25_000_000),
+    # Scanned certificates tend to be large, high-resolution images
+    S3StorageInterface.STAGING_QUALIFICATION_PREFIX: ImageLimits(max_bytes=10 * _MiB, max_pixels=40_000_000),
+    S3StorageInterface.QUALIFICATION_PREFIX: ImageLimits(max_bytes=10 * _MiB, max_pixels=40_000_000),
+    S3StorageInterface.BACKGROUND_IMAGE_PREFIX: ImageLimits(max_bytes=10 * _MiB, max_pixels=40_000_000),
+}
+
+# The largest single image we accept anywhere (used to cut off oversized request bodies early)
+MAX_IMAGE_BYTES: int = max(limits.max_bytes for limits in [DEFAULT_IMAGE_LIMITS, *IMAGE_LIMITS.values()])
+
+# "Magic bytes" at the start of the file, for the formats we accept
+_MAGIC_BYTES: list[tuple[bytes, str]] = [
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+]
+
+
+def sniff_image_format(header: bytes) -> str | None:
+    """Identifies the image format from the first few bytes of the file, without involving Pillow."""
+    for magic, image_format in _MAGIC_BYTES:
+        if header.startswith(magic):
+            return image_format
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def _get_upload_size(upload_file: UploadFile) -> int:
+    if upload_file.size is not None:
+        return upload_file.size
+    upload_file.file.seek(0, 2)  # Seek to the end of the spooled file
+    size = upload_file.file.tell()
+    upload_file.file.seek(0)
+    return size
+
+
+def validate_image_upload(upload_file: UploadFile, prefix: str) -> None:
+    """
+    Cheap, bounded-memory validation of an uploaded image, done in order of increasing cost:
+        1. The byte size of the upload
+        2. The magic bytes at the start of the file
+        3. The dimensions, as parsed from the image header (Pillow's 'Image.open' is lazy, NO pixels are decoded)
+
+    The full decode is left for whenever a derivative (thumbnail, etc...) actually needs to be produced.
+    Raises an HTTPException (413/422) if the image should be rejected.
+    """
+    limits = IMAGE_LIMITS.get(prefix, DEFAULT_IMAGE_LIMITS)
+
+    if _get_upload_size(upload_file) > limits.max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Image must be at most {limits.max_bytes // _MiB} MiB",
+        )
+
+    try:
+        upload_file.file.seek(0)
+        sniffed_format = sniff_image_format(upload_file.file.read(16))
+        if sniffed_format not in limits.allowed_formats:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"Image must be one of: {', '.join(sorted(limits.allowed_formats))}",
+            )
+
+        upload_file.file.seek(0)
+        with Image.open(upload_file.file, formats=[sniffed_format]) as img:
+            width, height = img.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail="Invalid image file")
+    finally:
+        upload_file.file.seek(0)
+
+    if width * height > limits.max_pixels:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Image dimensions are too large ({width}x{height})",
+        )
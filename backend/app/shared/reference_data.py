@@ -0,0 +1,197 @@
+"""
+An in-memory (per worker process) copy of the reference data, i.e. the small tables that (almost) never change:
+journal metric definitions, product / recipe / thread / article categories and doctor specialisations.
+
+Reads are served from an immutable snapshot. Every snapshot is tagged with the version in `reference_data_version`,
+which each worker re-checks at most once per `REFERENCE_DATA_CHECK_INTERVAL_SECONDS` (a single-row lookup),
+and reloads everything only when it changed.
+
+Anything that changes reference data must call `bump_reference_data_version` in the same transaction:
+the worker that made the change drops its snapshot as soon as it commits, and the others within the interval.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.db.db_schema import (
+    BinaryMetric,
+    DoctorSpecialisation,
+    EduArticleCategory,
+    ProductCategory,
+    RecipeCategory,
+    ReferenceDataVersion,
+    ScalarMetric,
+    ThreadCategory,
+)
+from app.db.db_upsert import dialect_insert
+
+REFERENCE_DATA_VERSION_ROW_ID = 1
+
+# The journal preview's fields, and the keyword that identifies their scalar metric (by label)
+PREVIEW_METRIC_KEYWORDS: dict[str, str] = {"sugar_level": "sugar", "heart_rate": "heart", "weight": "weight"}
+
+
+@dataclass(frozen=True)
+class BinaryMetricDefinition:
+    id: int
+    label: str
+    category: str
+
+
+@dataclass(frozen=True)
+class ScalarMetricDefinition:
+    id: int
+    label: str
+    unit_of_measurement: str
+
+
+@dataclass(frozen=True)
+class CategoryDefinition:
+    id: int
+    label: str
+
+
+@dataclass(frozen=True)
+class SpecialisationDefinition:
+    id: int
+    specialisation: str
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    version: int
+    binary_metrics: tuple[BinaryMetricDefinition, ...]  # By ID
+    scalar_metrics: tuple[ScalarMetricDefinition, ...]  # By ID
+    product_categories: tuple[CategoryDefinition, ...]  # By ID
+    recipe_categories: tuple[CategoryDefinition, ...]  # By ID
+    thread_categories: tuple[CategoryDefinition, ...]  # By label
+    article_categories: tuple[CategoryDefinition, ...]  # By label
+    doctor_specialisations: tuple[SpecialisationDefinition, ...]  # By name
+
+    @cached_property
+    def binary_metrics_by_id(self) -> dict[int, BinaryMetricDefinition]:
+        return {metric.id: metric for metric in self.binary_metrics}
+
+    @cached_property
+    def scalar_metrics_by_id(self) -> dict[int, ScalarMetricDefinition]:
+        return {metric.id: metric for metric in self.scalar_metrics}
+
+    @cached_property
+    def preview_metric_ids(self) -> dict[str, int]:
+        """The journal preview's fields -> the ID of their scalar metric (the fields without one are left out)."""
+        metric_ids: dict[str, int] = {}
+        for field, keyword in PREVIEW_METRIC_KEYWORDS.items():
+            for metric in self.scalar_metrics:
+                if keyword in metric.label.lower():
+                    metric_ids[field] = metric.id
+                    break
+        return metric_ids
+
+    @cached_property
+    def metric_catalog_etag(self) -> str:
+        """Changes when (and only when) a journal metric definition does, unlike `version`."""
+        digest = hashlib.sha256(repr((self.binary_metrics, self.scalar_metrics)).encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+
+async def _read_version(db: AsyncSession) -> int:
+    """0 when there is no version yet, including when its table doesn't exist (not migrated yet)."""
+    stmt = select(ReferenceDataVersion.version).where(ReferenceDataVersion.id == REFERENCE_DATA_VERSION_ROW_ID)
+    try:
+        # In a savepoint, so that a missing table doesn't abort the caller's transaction
+        async with db.begin_nested():
+            return (await db.execute(stmt)).scalar_one_or_none() or 0
+    except (OperationalError, ProgrammingError):
+        return 0
+
+
+async def _load(db: AsyncSession, version: int) -> ReferenceData:
+    async def categories(model, order_by) -> tuple[CategoryDefinition, ...]:
+        rows = (await db.execute(select(model.id, model.label).order_by(order_by))).all()
+        return tuple(CategoryDefinition(id=row.id, label=row.label) for row in rows)
+
+    binary_rows = (
+        await db.execute(select(BinaryMetric.id, BinaryMetric.label, BinaryMetric.category).order_by(BinaryMetric.id))
+    ).all()
+    scalar_rows = (
+        await db.execute(
+            select(ScalarMetric.id, ScalarMetric.label, ScalarMetric.unit_of_measurement).order_by(ScalarMetric.id)
+        )
+    ).all()
+    specialisation_rows = (
+        await db.execute(
+            select(DoctorSpecialisation.id, DoctorSpecialisation.specialisation).order_by(
+                DoctorSpecialisation.specialisation
+            )
+        )
+    ).all()
+
+    return ReferenceData(
+        version=version,
+        binary_metrics=tuple(
+            BinaryMetricDefinition(id=row.id, label=row.label, category=row.category.value) for row in binary_rows
+        ),
+        scalar_metrics=tuple(
+            ScalarMetricDefinition(id=row.id, label=row.label, unit_of_measurement=row.unit_of_measurement)
+            for row in scalar_rows
+        ),
+        product_categories=await categories(ProductCategory, ProductCategory.id),
+        recipe_categories=await categories(RecipeCategory, RecipeCategory.id),
+        thread_categories=await categories(ThreadCategory, ThreadCategory.label),
+        article_categories=await categories(EduArticleCategory, EduArticleCategory.label),
+        doctor_specialisations=tuple(
+            SpecialisationDefinition(id=row.id, specialisation=row.specialisation) for row in specialisation_rows
+        ),
+    )
+
+
+class ReferenceDataCache:
+    def __init__(self, check_interval_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.check_interval_seconds = check_interval_seconds
+        self._clock = clock
+        self._snapshot: ReferenceData | None = None
+        self._next_check_at = 0.0
+
+    async def get(self, db: AsyncSession) -> ReferenceData:
+        """The current snapshot, (re)loaded through `db` when there is none yet or the version changed."""
+        snapshot = self._snapshot
+        now = self._clock()
+        if snapshot is not None and now < self._next_check_at:
+            return snapshot
+
+        version = await _read_version(db)
+        if snapshot is None or snapshot.version != version:
+            snapshot = await _load(db, version)
+            self._snapshot = snapshot
+        self._next_check_at = now + self.check_interval_seconds
+        return snapshot
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+
+reference_data_cache = ReferenceDataCache(settings.REFERENCE_DATA_CHECK_INTERVAL_SECONDS)
+
+
+async def bump_reference_data_version(db: AsyncSession) -> None:
+    """
+    To be called in the transaction that changes reference data (doesn't commit).
+    Once it commits, this worker's snapshot is dropped, and the other workers' become stale.
+    """
+    stmt = dialect_insert(db, ReferenceDataVersion).values(id=REFERENCE_DATA_VERSION_ROW_ID, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReferenceDataVersion.id],
+        set_={"version": ReferenceDataVersion.version + 1},
+    )
+    await db.execute(stmt)
+    event.listen(db.sync_session, "after_commit", lambda _: reference_data_cache.invalidate(), once=True)
@@ -1,35 +1,43 @@
+import hashlib
 import mimetypes
-import uuid
-from typing import BinaryIO
-from uuid import UUID
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+from pathlib import PurePosixPath
+from typing import BinaryIO, Iterable, Iterator
 
-from botocore.exceptions import BotoCoreError, ClientError
 from fastapi import UploadFile
 
-from app.core.clients import s3_client
-from app.core.settings import settings
+from app.shared.storage_backends import StorageBackend, StorageError, StoredObject, create_storage_backend
 
 
 class S3StorageInterface:
+    """
+    Every upload is stored under a content-addressed key, i.e. "<prefix>/<sha256 of the bytes><extension>".
+
+    > Uploading bytes that are already in the bucket skips the PUT entirely (just a HEAD request)
+    > An object's content can never change under the same key, so they can be cached forever
+    > The same object may be referenced by several rows (e.g. 2 drafts with the same image), so they
+      are NEVER deleted eagerly. Once no row references an object anymore, "app.jobs.s3_gc" reclaims it.
+
+    The actual object store is pluggable (S3, local disk, in-memory), see "app.shared.storage_backends".
+    """
+
+    backend: StorageBackend = create_storage_backend()
+
     # =================================================================
     # =========================== PRODUCT =============================
     # =================================================================
     PRODUCT_PREFIX = "products"
 
     @staticmethod
-    def put_product_img(product_id: int, product_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.PRODUCT_PREFIX,
-            file_name=str(product_id),
-            file_obj=product_img.file,
-            content_type=str(product_img.content_type),
-        )
+    def put_product_img(product_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.PRODUCT_PREFIX, product_img)
 
     @staticmethod
-    def put_product_img_from_filepath(product_id: int, product_img_filepath: str) -> str | None:
+    def put_product_img_from_filepath(product_img_filepath: str) -> str | None:
         return S3StorageInterface._put_img_from_filepath(
             prefix=S3StorageInterface.PRODUCT_PREFIX,
-            file_name=str(product_id),
             img_filepath=product_img_filepath,
         )
 
@@ -39,39 +47,21 @@ class S3StorageInterface:
     PRODUCT_DRAFT_PREFIX = "product-drafts"
 
     @staticmethod
-    def put_product_draft_img(draft_id: int, draft_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.PRODUCT_DRAFT_PREFIX,
-            file_name=str(draft_id),
-            file_obj=draft_img.file,
-            content_type=str(draft_img.content_type),
-        )
+    def put_product_draft_img(draft_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.PRODUCT_DRAFT_PREFIX, draft_img)
 
     @staticmethod
-    def promote_product_draft_img(product_id: int, draft_img_key: str) -> str | None:
+    def promote_product_draft_img(draft_img_key: str) -> str | None:
         """
         Copies a product draft image to the published product storage.
         Returns the new image key for the published product, or None on failure.
         """
-        try:
-            # Parse the extension from the draft key
-            extension = draft_img_key.split(".")[-1] if "." in draft_img_key else "jpg"
-            new_key = f"{S3StorageInterface.PRODUCT_PREFIX}/{product_id}.{extension}"
-
-            # Copy the object from draft to product location
-            s3_client.copy_object(
-                Bucket=settings.S3_BUCKET_NAME,
-                CopySource={"Bucket": settings.S3_BUCKET_NAME, "Key": draft_img_key},
-                Key=new_key,
-            )
-
-            # Optionally delete the draft image after successful copy
-            s3_client.delete_object(Bucket=settings.S3_BUCKET_NAME, Key=draft_img_key)
+        return S3StorageInterface._promote_obj(draft_img_key, S3StorageInterface.PRODUCT_PREFIX)
 
-            return new_key
-        except (BotoCoreError, ClientError) as e:
-            print(f"Error promoting product draft image: {e}")
-            return None
+    @staticmethod
+    def promote_product_draft_imgs(draft_img_keys: Iterable[str]) -> dict[str, str | None]:
+        """Bulk version of 'promote_product_draft_img', see 'promote_objs'."""
+        return S3StorageInterface.promote_objs(draft_img_keys, S3StorageInterface.PRODUCT_PREFIX)
 
     # =================================================================
     # =========================== RECIPES =============================
@@ -79,19 +69,13 @@ class S3StorageInterface:
     RECIPE_PREFIX = "recipes"
 
     @staticmethod
-    def put_recipe_img(recipe_id: int, recipe_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.RECIPE_PREFIX,
-            file_name=str(recipe_id),
-            file_obj=recipe_img.file,
-            content_type=str(recipe_img.content_type),
-        )
+    def put_recipe_img(recipe_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.RECIPE_PREFIX, recipe_img)
 
     @staticmethod
-    def put_recipe_img_from_filepath(recipe_id: int, recipe_img_filepath: str) -> str | None:
+    def put_recipe_img_from_filepath(recipe_img_filepath: str) -> str | None:
         return S3StorageInterface._put_img_from_filepath(
             prefix=S3StorageInterface.RECIPE_PREFIX,
-            file_name=str(recipe_id),
             img_filepath=recipe_img_filepath,
         )
 
@@ -101,39 +85,21 @@ class S3StorageInterface:
     RECIPE_DRAFT_PREFIX = "recipe-drafts"
 
     @staticmethod
-    def put_recipe_draft_img(draft_id: int, draft_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.RECIPE_DRAFT_PREFIX,
-            file_name=str(draft_id),
-            file_obj=draft_img.file,
-            content_type=str(draft_img.content_type),
-        )
+    def put_recipe_draft_img(draft_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.RECIPE_DRAFT_PREFIX, draft_img)
 
     @staticmethod
-    def promote_recipe_draft_img(recipe_id: int, draft_img_key: str) -> str | None:
+    def promote_recipe_draft_img(draft_img_key: str) -> str | None:
         """
         Copies a recipe draft image to the published recipe storage.
         Returns the new image key for the published recipe, or None on failure.
         """
-        try:
-            # Parse the extension from the draft key
-            extension = draft_img_key.split(".")[-1] if "." in draft_img_key else "jpg"
-            new_key = f"{S3StorageInterface.RECIPE_PREFIX}/{recipe_id}.{extension}"
-
-            # Copy the object from draft to recipe location
-            s3_client.copy_object(
-                Bucket=settings.S3_BUCKET_NAME,
-                CopySource={"Bucket": settings.S3_BUCKET_NAME, "Key": draft_img_key},
-                Key=new_key,
-            )
-
-            # Optionally delete the draft image after successful copy
-            s3_client.delete_object(Bucket=settings.S3_BUCKET_NAME, Key=draft_img_key)
+        return S3StorageInterface._promote_obj(draft_img_key, S3StorageInterface.RECIPE_PREFIX)
 
-            return new_key
-        except (BotoCoreError, ClientError) as e:
-            print(f"Error promoting recipe draft image: {e}")
-            return None
+    @staticmethod
+    def promote_recipe_draft_imgs(draft_img_keys: Iterable[str]) -> dict[str, str | None]:
+        """Bulk version of 'promote_recipe_draft_img', see 'promote_objs'."""
+        return S3StorageInterface.promote_objs(draft_img_keys, S3StorageInterface.RECIPE_PREFIX)
 
     # =======================================================================================
     # ============== STAGING AREA FOR QUALIFICATIONS (DOCTOR + NUTRITIONIST) ================
@@ -149,41 +115,24 @@ class S3StorageInterface:
 
     @staticmethod
     def put_staging_qualification_img(staging_qualification_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.STAGING_QUALIFICATION_PREFIX,
-            file_name=str(uuid.uuid4()),
-            file_obj=staging_qualification_img.file,
-            content_type=str(staging_qualification_img.content_type),
+        return S3StorageInterface.put_uploadfile(
+            S3StorageInterface.STAGING_QUALIFICATION_PREFIX, staging_qualification_img
         )
 
     @staticmethod
-    def promote_staging_qualification_img(user_id: UUID, staging_img_key: str) -> str | None:
+    def promote_staging_qualification_img(staging_img_key: str) -> str | None:
         """
-        Moves a qualification image from the staging area to the permanent qualifications storage.
+        Copies a qualification image from the staging area to the permanent qualifications storage.
 
         Args:
-            staging_obj_key: The S3 object key of the staging qualification image.
-            user_id: The user ID to associate with the permanent qualification image.
+            staging_img_key: The S3 object key of the staging qualification image.
         """
-        try:
-            permanent_obj_key: str = f"{S3StorageInterface.QUALIFICATION_PREFIX}/{user_id}"
-            s3_client.copy_object(
-                CopySource={
-                    "Bucket": settings.S3_BUCKET_NAME,
-                    "Key": staging_img_key,
-                },
-                Bucket=settings.S3_BUCKET_NAME,
-                Key=permanent_obj_key,
-            )
+        return S3StorageInterface._promote_obj(staging_img_key, S3StorageInterface.QUALIFICATION_PREFIX)
 
-            s3_client.delete_object(
-                Bucket=settings.S3_BUCKET_NAME,
-                Key=staging_img_key,
-            )
-            return permanent_obj_key
-        except (BotoCoreError, ClientError) as e:
-            print(f"Error promoting staging qualification image {staging_img_key}: {e}")
-            return None
+    @staticmethod
+    def promote_staging_qualification_imgs(staging_img_keys: Iterable[str]) -> dict[str, str | None]:
+        """Bulk version of 'promote_staging_qualification_img', see 'promote_objs'."""
+        return S3StorageInterface.promote_objs(staging_img_keys, S3StorageInterface.QUALIFICATION_PREFIX)
 
     # =======================================================
     # ================= EDU ARTICLE IMAGES ==================
@@ -191,13 +140,8 @@ class S3StorageInterface:
     ARTICLE_PREFIX = "edu-articles"
 
     @staticmethod
-    def put_article_img(article_id: int, article_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.ARTICLE_PREFIX,
-            file_name=str(article_id),
-            file_obj=article_img.file,
-            content_type=str(article_img.content_type),
-        )
+    def put_article_img(article_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.ARTICLE_PREFIX, article_img)
 
     # =====================================================
     # ================ QUALIFICATIONS =====================
@@ -205,18 +149,12 @@ class S3StorageInterface:
     QUALIFICATION_PREFIX = "qualifications"
 
     @staticmethod
-    def put_qualification_img(user_id: UUID, qualification_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.QUALIFICATION_PREFIX,
-            file_name=str(user_id),
-            file_obj=qualification_img.file,
-            content_type=str(qualification_img.content_type),
-        )
+    def put_qualification_img(qualification_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.QUALIFICATION_PREFIX, qualification_img)
 
     @staticmethod
-    def put_qualification_img_from_filepath(user_id: UUID, qualification_img_filepath: str) -> str | None:
+    def put_qualification_img_from_filepath(qualification_img_filepath: str) -> str | None:
         return S3StorageInterface._put_img_from_filepath(
-            file_name=str(user_id),
             img_filepath=qualification_img_filepath,
             prefix=S3StorageInterface.QUALIFICATION_PREFIX,
         )
@@ -227,18 +165,12 @@ class S3StorageInterface:
     PROFILE_PREFIX = "profile-images"
 
     @staticmethod
-    def put_profile_img(user_id: UUID, profile_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.PROFILE_PREFIX,
-            file_name=str(user_id),
-            file_obj=profile_img.file,
-            content_type=str(profile_img.content_type),
-        )
+    def put_profile_img(profile_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.PROFILE_PREFIX, profile_img)
 
     @staticmethod
-    def put_profile_img_from_filepath(user_id: UUID, profile_img_filepath: str) -> str | None:
+    def put_profile_img_from_filepath(profile_img_filepath: str) -> str | None:
         return S3StorageInterface._put_img_from_filepath(
-            file_name=str(user_id),
             img_filepath=profile_img_filepath,
             prefix=S3StorageInterface.PROFILE_PREFIX,
         )
@@ -249,22 +181,24 @@ class S3StorageInterface:
     BACKGROUND_IMAGE_PREFIX = "background-images"
 
     @staticmethod
-    def put_background_image(page_slug: str, background_img: UploadFile) -> str | None:
-        return S3StorageInterface._upload_file_stream(
-            prefix=S3StorageInterface.BACKGROUND_IMAGE_PREFIX,
-            file_name=page_slug,
-            file_obj=background_img.file,
-            content_type=str(background_img.content_type),
-        )
+    def put_background_image(background_img: UploadFile) -> str | None:
+        return S3StorageInterface.put_uploadfile(S3StorageInterface.BACKGROUND_IMAGE_PREFIX, background_img)
 
     # =====================================================
     # ==================== COMMON ========================
     # ====================================================
+    # Content-addressed objects never change, so clients/CDNs may cache them indefinitely
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+    # Size of the chunks read from the upload's spooled file while hashing it
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    _CONTENT_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
     @staticmethod
-    def put_uploadfile(prefix: str, file_name: str, uploadfile: UploadFile) -> str | None:
+    def put_uploadfile(prefix: str, uploadfile: UploadFile) -> str | None:
         return S3StorageInterface._upload_file_stream(
             prefix=prefix,
-            file_name=file_name,
             file_obj=uploadfile.file,
             content_type=str(uploadfile.content_type),
         )
@@ -272,28 +206,73 @@ class S3StorageInterface:
     @staticmethod
     def get_presigned_url(obj_key: str, expires_in_seconds: int) -> str | None:
         """
-        Generates a temporary, presigned URL for a private S3 object.
+        Generates a temporary, presigned URL for a private S3 object (or a signed "/storage" URL for the
+        local/in-memory backends).
 
         Args:
-            obj_key: The full object key (e.g., "profile-images/user-id.jpg").
+            obj_key: The full object key (e.g., "profile-images/<sha256>.jpg").
 
         Returns:
             A string containing the presigned URL, or None if the
             obj_key was empty or an error occurred.
         """
         try:
-            url: str = s3_client.generate_presigned_url(
-                ClientMethod="get_object",
-                Params={"Bucket": settings.S3_BUCKET_NAME, "Key": obj_key},
-                ExpiresIn=expires_in_seconds,
-            )
-            return url
-        except (BotoCoreError, ClientError) as e:
+            return S3StorageInterface.backend.get_url(obj_key, expires_in_seconds)
+        except StorageError as e:
             print(f"Error generating presigned URL for {obj_key}: {e}")
             return None
 
     @staticmethod
-    def _put_img_from_filepath(file_name: str, img_filepath: str, prefix: str) -> str | None:
+    def is_content_addressed(obj_key: str) -> bool:
+        """Whether the key was produced by the content-addressed upload path (older keys were named by ID)."""
+        return bool(S3StorageInterface._CONTENT_HASH_PATTERN.match(PurePosixPath(obj_key).stem))
+
+    @staticmethod
+    def _hash_file_stream(file_obj: BinaryIO) -> str:
+        """Streams through the (spooled) file in fixed-size chunks, so memory stays flat for large uploads."""
+        file_obj.seek(0)
+        digest = hashlib.sha256()
+        while chunk := file_obj.read(S3StorageInterface.HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        file_obj.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _promote_obj(src_key: str, dest_prefix: str) -> str | None:
+        """
+        Copies an object into another prefix, under the same content-addressed file name.
+        The copy is skipped altogether if the destination already holds the same content
+        (which is then touched, since it may be an orphan that the GC job is about to collect).
+
+        The source is left in place: a content-addressed object may be shared by several rows,
+        so it is only reclaimed (by the GC job) once nothing references it anymore.
+        """
+        try:
+            dest_key = f"{dest_prefix}/{S3StorageInterface._content_addressed_name(src_key)}"
+            if not S3StorageInterface.backend.touch_object(dest_key):
+                S3StorageInterface.backend.copy_object(src_key, dest_key)
+            return dest_key
+        except StorageError as e:
+            print(f"Error promoting {src_key} into {dest_prefix}: {e}")
+            return None
+
+    @staticmethod
+    def _content_addressed_name(obj_key: str) -> str:
+        """
+        Returns the "<sha256><extension>" file name for an existing object.
+        Objects uploaded before content-addressing (named by ID) have to be streamed down once to hash them.
+        """
+        path = PurePosixPath(obj_key)
+        if S3StorageInterface.is_content_addressed(obj_key):
+            return path.name
+
+        digest = hashlib.sha256()
+        for chunk in S3StorageInterface.backend.iter_object_chunks(obj_key, S3StorageInterface.HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        return f"{digest.hexdigest()}{path.suffix}"
+
+    @staticmethod
+    def _put_img_from_filepath(img_filepath: str, prefix: str) -> str | None:
         content_type, _ = mimetypes.guess_type(img_filepath)  # Guess the type from file path
         if not content_type:
             content_type = "application/octet-stream"  # Default generic type
@@ -302,7 +281,6 @@ class S3StorageInterface:
             with open(img_filepath, "rb") as f:
                 return S3StorageInterface._upload_file_stream(
                     prefix=prefix,
-                    file_name=file_name,
                     file_obj=f,
                     content_type=content_type,
                 )
@@ -314,10 +292,8 @@ class S3StorageInterface:
             return None
 
     @staticmethod
-    def _upload_file_stream(prefix: str, file_name: str, file_obj: BinaryIO, content_type: str) -> str | None:
+    def _upload_file_stream(prefix: str, file_obj: BinaryIO, content_type: str) -> str | None:
         try:
-            file_obj.seek(0)
-
             extension = mimetypes.guess_extension(content_type)
             if not extension:
                 if "jpeg" in content_type:
@@ -327,33 +303,80 @@ class S3StorageInterface:
                 else:
                     extension = ".jpg"
 
-            obj_key = f"{prefix}/{file_name}{extension}"
+            obj_key = f"{prefix}/{S3StorageInterface._hash_file_stream(file_obj)}{extension}"
+
+            # Identical bytes were already uploaded (i.e. a default avatar, a re-uploaded product shot, etc...).
+            # The existing object may be an old orphan, so it's touched to keep the GC job away from it
+            if S3StorageInterface.backend.touch_object(obj_key):
+                return obj_key
 
-            s3_client.upload_fileobj(
-                Fileobj=file_obj,
-                Bucket=settings.S3_BUCKET_NAME,
-                Key=obj_key,
-                ExtraArgs={"ContentType": content_type},
+            S3StorageInterface.backend.put_object(
+                obj_key, file_obj, content_type, cache_control=S3StorageInterface.IMMUTABLE_CACHE_CONTROL
             )
 
             return obj_key
-        except (BotoCoreError, ClientError) as e:
+        except StorageError as e:
             print(f"Error uploading file stream: {e}")
             return None
 
-    # @staticmethod
-    # def clear_bucket() -> None:
-    #     response = s3_client.list_objects_v2(Bucket=bucket_name)
-
-    #     if "Contents" in response:
-    #         # Loop through each object and delete it
-    #         for obj in response["Contents"]:
-    #             print(f"Deleting {obj['Key']}...")
-    #             s3.delete_object(Bucket=bucket_name, Key=obj["Key"])
-
-    #         # Check for pagination
-    #         while response.get("IsTruncated"):  # If there are more objects to be listed
-    #             response = s3.list_objects_v2(Bucket=bucket_name, ContinuationToken=response["NextContinuationToken"])
-    #             for obj in response["Contents"]:
-    #                 print(f"Deleting {obj['Key']}...")
-    #                 s3.delete_object(Bucket=bucket_name, Key=obj["Key"])
+    # =====================================================
+    # ================= BULK OPERATIONS ===================
+    # =====================================================
+    # Upper bound on the number of copies in flight at once (boto3 clients are thread-safe)
+    PROMOTE_MAX_WORKERS = 16
+
+    @staticmethod
+    def promote_objs(src_keys: Iterable[str], dest_prefix: str) -> dict[str, str | None]:
+        """
+        Promotes many objects at once, running the HEAD/COPY round trips concurrently on a bounded thread pool,
+        so N promotions take roughly as long as the slowest one (instead of N round trips back to back).
+
+        Duplicate source keys are only promoted once. As with '_promote_obj', the sources are NOT deleted.
+
+        Returns:
+            A mapping of every source key to its promoted key, or to None if that promotion failed.
+        """
+        unique_src_keys = list(dict.fromkeys(src_keys))
+        if not unique_src_keys:
+            return {}
+
+        max_workers = min(S3StorageInterface.PROMOTE_MAX_WORKERS, len(unique_src_keys))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            dest_keys = executor.map(
+                lambda src_key: S3StorageInterface._promote_obj(src_key, dest_prefix), unique_src_keys
+            )
+            return dict(zip(unique_src_keys, dest_keys))
+
+    # =====================================================
+    # ================ BUCKET MAINTENANCE =================
+    # =====================================================
+    # S3's 'DeleteObjects' accepts at most 1000 keys per call
+    DELETE_OBJECTS_BATCH_SIZE = 1000
+
+    @staticmethod
+    def iter_objects(prefix: str) -> Iterator[StoredObject]:
+        """
+        Lazily pages through every object stored under the given prefix (via 'list_objects_v2' on S3).
+        Yields the object summaries (key, size, last modified) in key order.
+        """
+        try:
+            yield from S3StorageInterface.backend.iter_objects(prefix)
+        except StorageError as e:
+            print(f"Error listing objects under prefix {prefix}: {e}")
+
+    @staticmethod
+    def delete_objects(obj_keys: Iterable[str]) -> list[str]:
+        """
+        Deletes the given objects, in batches of up to 1000 keys per 'delete_objects' call.
+
+        Returns:
+            The keys that could NOT be deleted (empty if everything went through).
+        """
+        failed_keys: list[str] = []
+        for batch in batched(obj_keys, S3StorageInterface.DELETE_OBJECTS_BATCH_SIZE):
+            try:
+                failed_keys.extend(S3StorageInterface.backend.delete_objects(list(batch)))
+            except StorageError as e:
+                print(f"Error deleting a batch of {len(batch)} objects: {e}")
+                failed_keys.extend(batch)
+        return failed_keys
@@ -0,0 +1,334 @@
+"""
+The low-level object stores that "S3StorageInterface" sits on top of.
+
+    > S3StorageBackend       - S3 in production, LocalStack during development (the default)
+    > LocalStorageBackend    - Plain files on disk, served by the "/storage" routes (offline development, seeding)
+    > InMemoryStorageBackend - A dict, served by the "/storage" routes (tests, benchmarks)
+
+The backend is picked with the "STORAGE_BACKEND" setting.
+"""
+
+import hashlib
+import hmac
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, Protocol
+from urllib.parse import quote, urlencode
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.core.clients import s3_client
+from app.core.settings import settings
+
+
+class StorageError(Exception):
+    """Raised by every backend when an operation fails (so callers don't need to know about botocore)."""
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    key: str
+    size: int
+    last_modified: datetime
+
+
+class StorageBackend(Protocol):
+    def put_object(self, obj_key: str, file_obj: BinaryIO, content_type: str, cache_control: str) -> None: ...
+
+    def object_exists(self, obj_key: str) -> bool: ...
+
+    def touch_object(self, obj_key: str) -> bool:
+        """
+        Refreshes the object's last modified time (so the GC job treats it as freshly uploaded), if it exists.
+        Returns whether it exists.
+        """
+        ...
+
+    def copy_object(self, src_key: str, dest_key: str) -> None: ...
+
+    def iter_object_chunks(self, obj_key: str, chunk_size: int) -> Iterator[bytes]: ...
+
+    def iter_objects(self, prefix: str) -> Iterator[StoredObject]:
+        """Every object under "<prefix>/", in lexicographic key order."""
+        ...
+
+    def delete_objects(self, obj_keys: list[str]) -> list[str]:
+        """Returns the keys that could NOT be deleted."""
+        ...
+
+    def get_url(self, obj_key: str, expires_in_seconds: int) -> str:
+        """A temporary URL that the client can fetch the object from."""
+        ...
+
+
+# =====================================================
+# ======================== S3 =========================
+# =====================================================
+@contextmanager
+def _boto_errors_as_storage_errors():
+    try:
+        yield
+    except (BotoCoreError, ClientError) as e:
+        raise StorageError(str(e)) from e
+
+
+class S3StorageBackend:
+    def __init__(self, client, bucket_name: str):
+        self.client = client
+        self.bucket_name = bucket_name
+
+    def put_object(self, obj_key: str, file_obj: BinaryIO, content_type: str, cache_control: str) -> None:
+        with _boto_errors_as_storage_errors():
+            self.client.upload_fileobj(
+                Fileobj=file_obj,
+                Bucket=self.bucket_name,
+                Key=obj_key,
+                ExtraArgs={"ContentType": content_type, "CacheControl": cache_control},
+            )
+
+    def object_exists(self, obj_key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=obj_key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise StorageError(str(e)) from e
+        except BotoCoreError as e:
+            raise StorageError(str(e)) from e
+
+    def touch_object(self, obj_key: str) -> bool:
+        try:
+            head = self.client.head_object(Bucket=self.bucket_name, Key=obj_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise StorageError(str(e)) from e
+        except BotoCoreError as e:
+            raise StorageError(str(e)) from e
+
+        # A copy onto itself is only allowed when the metadata is replaced (here, by the same metadata)
+        extra_args = {"CacheControl": head["CacheControl"]} if head.get("CacheControl") else {}
+        with _boto_errors_as_storage_errors():
+            self.client.copy_object(
+                Bucket=self.bucket_name,
+                CopySource={"Bucket": self.bucket_name, "Key": obj_key},
+                Key=obj_key,
+                MetadataDirective="REPLACE",
+                ContentType=head.get("ContentType", "application/octet-stream"),
+                Metadata=head.get("Metadata", {}),
+                **extra_args,
+            )
+        return True
+
+    def copy_object(self, src_key: str, dest_key: str) -> None:
+        with _boto_errors_as_storage_errors():
+            self.client.copy_object(
+                Bucket=self.bucket_name,
+                CopySource={"Bucket": self.bucket_name, "Key": src_key},
+                Key=dest_key,
+            )
+
+    def iter_object_chunks(self, obj_key: str, chunk_size: int) -> Iterator[bytes]:
+        with _boto_errors_as_storage_errors():
+            body = self.client.get_object(Bucket=self.bucket_name, Key=obj_key)["Body"]
+            yield from body.iter_chunks(chunk_size)
+
+    def iter_objects(self, prefix: str) -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        with _boto_errors_as_storage_errors():
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=f"{prefix}/"):
+                for obj in page.get("Contents", []):
+                    yield StoredObject(key=obj["Key"], size=obj["Size"], last_modified=obj["LastModified"])
+
+    def delete_objects(self, obj_keys: list[str]) -> list[str]:
+        with _boto_errors_as_storage_errors():
+            response = self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in obj_keys], "Quiet": True},
+            )
+        return [error["Key"] for error in response.get("Errors", [])]
+
+    def get_url(self, obj_key: str, expires_in_seconds: int) -> str:
+        with _boto_errors_as_storage_errors():
+            return self.client.generate_presigned_url(
+                ClientMethod="get_object",
+                Params={"Bucket": self.bucket_name, "Key": obj_key},
+                ExpiresIn=expires_in_seconds,
+            )
+
+
+# ==========================================================
+# ============= URL SIGNING (LOCAL + IN-MEMORY) ============
+# ==========================================================
+def _url_signature(obj_key: str, expires_at: int) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"{obj_key}:{expires_at}".encode(), hashlib.sha256).hexdigest()
+
+
+def build_signed_url(base_url: str, obj_key: str, expires_in_seconds: int) -> str:
+    """The local equivalent of an S3 presigned URL, to be verified by 'verify_signed_url'."""
+    expires_at = int(time.time()) + expires_in_seconds
+    query = urlencode({"expires": expires_at, "signature": _url_signature(obj_key, expires_at)})
+    return f"{base_url.rstrip('/')}/{quote(obj_key)}?{query}"
+
+
+def verify_signed_url(obj_key: str, expires_at: int, signature: str) -> bool:
+    if expires_at < time.time():
+        return False
+    return hmac.compare_digest(_url_signature(obj_key, expires_at), signature)
+
+
+# =====================================================
+# ==================== LOCAL DISK =====================
+# =====================================================
+class LocalStorageBackend:
+    def __init__(self, root_dir: str | Path, base_url: str):
+        self.root_dir = Path(root_dir).resolve()
+        self.base_url = base_url
+
+    def path_for(self, obj_key: str) -> Path:
+        path = (self.root_dir / obj_key).resolve()
+        if not path.is_relative_to(self.root_dir):
+            raise StorageError(f"Object key escapes the storage directory: {obj_key}")
+        return path
+
+    def _write_atomically(self, dest_path: Path, file_obj: BinaryIO) -> None:
+        """Writes to a temp file first, so that readers never see a partially written object."""
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=dest_path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                shutil.copyfileobj(file_obj, tmp_file)
+            os.replace(tmp_path, dest_path)
+        except OSError as e:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise StorageError(str(e)) from e
+
+    def put_object(self, obj_key: str, file_obj: BinaryIO, content_type: str, cache_control: str) -> None:
+        self._write_atomically(self.path_for(obj_key), file_obj)
+
+    def object_exists(self, obj_key: str) -> bool:
+        return self.path_for(obj_key).is_file()
+
+    def touch_object(self, obj_key: str) -> bool:
+        try:
+            os.utime(self.path_for(obj_key))
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            raise StorageError(str(e)) from e
+
+    def copy_object(self, src_key: str, dest_key: str) -> None:
+        try:
+            with open(self.path_for(src_key), "rb") as src_file:
+                self._write_atomically(self.path_for(dest_key), src_file)
+        except OSError as e:
+            raise StorageError(str(e)) from e
+
+    def iter_object_chunks(self, obj_key: str, chunk_size: int) -> Iterator[bytes]:
+        try:
+            with open(self.path_for(obj_key), "rb") as f:
+                while chunk := f.read(chunk_size):
+                    yield chunk
+        except OSError as e:
+            raise StorageError(str(e)) from e
+
+    def iter_objects(self, prefix: str) -> Iterator[StoredObject]:
+        prefix_dir = self.path_for(prefix)
+        if not prefix_dir.is_dir():
+            return
+        paths = sorted(path for path in prefix_dir.rglob("*") if path.is_file() and not path.name.startswith(".tmp-"))
+        for path in paths:
+            stat = path.stat()
+            yield StoredObject(
+                key=path.relative_to(self.root_dir).as_posix(),
+                size=stat.st_size,
+                last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            )
+
+    def delete_objects(self, obj_keys: list[str]) -> list[str]:
+        failed_keys: list[str] = []
+        for obj_key in obj_keys:
+            try:
+                self.path_for(obj_key).unlink(missing_ok=True)
+            except (OSError, StorageError):
+                failed_keys.append(obj_key)
+        return failed_keys
+
+    def get_url(self, obj_key: str, expires_in_seconds: int) -> str:
+        return build_signed_url(self.base_url, obj_key, expires_in_seconds)
+
+
+# =====================================================
+# ===================== IN-MEMORY =====================
+# =====================================================
+@dataclass(frozen=True)
+class InMemoryObject:
+    content: bytes
+    content_type: str
+    last_modified: datetime
+
+
+class InMemoryStorageBackend:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.objects: dict[str, InMemoryObject] = {}
+
+    def get_object(self, obj_key: str) -> InMemoryObject | None:
+        return self.objects.get(obj_key)
+
+    def put_object(self, obj_key: str, file_obj: BinaryIO, content_type: str, cache_control: str) -> None:
+        self.objects[obj_key] = InMemoryObject(file_obj.read(), content_type, datetime.now(timezone.utc))
+
+    def object_exists(self, obj_key: str) -> bool:
+        return obj_key in self.objects
+
+    def touch_object(self, obj_key: str) -> bool:
+        obj = self.objects.get(obj_key)
+        if obj is None:
+            return False
+        self.objects[obj_key] = InMemoryObject(obj.content, obj.content_type, datetime.now(timezone.utc))
+        return True
+
+    def copy_object(self, src_key: str, dest_key: str) -> None:
+        src = self.objects.get(src_key)
+        if src is None:
+            raise StorageError(f"No such object: {src_key}")
+        self.objects[dest_key] = InMemoryObject(src.content, src.content_type, datetime.now(timezone.utc))
+
+    def iter_object_chunks(self, obj_key: str, chunk_size: int) -> Iterator[bytes]:
+        obj = self.objects.get(obj_key)
+        if obj is None:
+            raise StorageError(f"No such object: {obj_key}")
+        for offset in range(0, len(obj.content), chunk_size):
+            yield obj.content[offset : offset + chunk_size]
+
+    def iter_objects(self, prefix: str) -> Iterator[StoredObject]:
+        for key in sorted(key for key in self.objects if key.startswith(f"{prefix}/")):
+            obj = self.objects[key]
+            yield StoredObject(key=key, size=len(obj.content), last_modified=obj.last_modified)
+
+    def delete_objects(self, obj_keys: list[str]) -> list[str]:
+        for obj_key in obj_keys:
+            self.objects.pop(obj_key, None)
+        return []
+
+    def get_url(self, obj_key: str, expires_in_seconds: int) -> str:
+        return build_signed_url(self.base_url, obj_key, expires_in_seconds)
+
+
+def create_storage_backend() -> StorageBackend:
+    match settings.STORAGE_BACKEND:
+        case "local":
+            return LocalStorageBackend(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_BASE_URL)
+        case "memory":
+            return InMemoryStorageBackend(settings.LOCAL_STORAGE_BASE_URL)
+        case _:
+            return S3StorageBackend(s3_client, settings.S3_BUCKET_NAME)
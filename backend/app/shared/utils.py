@@ -1,8 +1,8 @@
 import random
 import string
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
 
-from fastapi import UploadFile
-from PIL import Image, UnidentifiedImageError
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -16,27 +16,30 @@ def clear_db(db: Session):
 
     table_names = db.execute(text("SELECT tablename FROM pg_tables WHERE schemaname='public';")).scalars().all()
     for table in table_names:  # Truncate all tables
-        if table not in ["alembic_version", "pages"]:
+        # The reference data version must only ever go up (the running workers compare theirs against it)
+        if table not in ["alembic_version", "pages", "reference_data_version"]:
             db.execute(text(f"TRUNCATE TABLE {table} RESTART IDENTITY CASCADE;"))
 
     db.execute(text("SET session_replication_role = 'origin';"))  # Re-enable foreign key constraints
     db.commit()
 
 
-def is_valid_image(upload_file: UploadFile) -> bool:
-    try:
-        Image.open(upload_file.file)
-        upload_file.file.seek(0)
-        return True
-    except UnidentifiedImageError:
-        upload_file.file.seek(0)
-        return False
-
-
 def format_user_fullname(user: User) -> str:
     return " ".join(name_part for name_part in [user.first_name, user.middle_name, user.last_name] if name_part).strip()
 
 
+def local_timezone(timezone: str | None) -> ZoneInfo:
+    """A mother's own timezone (`PregnantWoman.timezone`), or the default one when she hasn't set it"""
+    return ZoneInfo(timezone or settings.DEFAULT_TIMEZONE)
+
+
+def local_date(moment: datetime, zone: ZoneInfo) -> date:
+    """The date of a stored moment (e.g. a kick's `kick_at`) in `zone`"""
+    if moment.tzinfo is None:  # SQLite doesn't keep the offset (they are all stored in UTC)
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(zone).date()
+
+
 def generate_mcr_like_string() -> str:
     digit_count: int = random.choice([4, 5])
     digits: str = "".join(random.choices(string.digits, k=digit_count))
@@ -39,7 +39,18 @@ async def ensure_author_exists(db, author_id: uuid.UUID) -> None:
 
 async def insert_feedback(db, author_id: uuid.UUID) -> None:
     for rating, content in SAMPLE_FEEDBACK:
-        db.add(UserAppFeedback(author_id=author_id, rating=rating, content=content))
+        # Scored afterwards, in bulk, by the sentiment backfill job
+        db.add(
+            UserAppFeedback(
+                author_id=author_id,
+                rating=rating,
+                content=content,
+                positive_score=0.0,
+                neutral_score=0.0,
+                negative_score=0.0,
+                compound_score=0.0,
+            )
+        )
     await db.commit()
 
 
@@ -54,7 +65,7 @@ async def main() -> None:
         await ensure_author_exists(db, author_id)
         await insert_feedback(db, author_id)
 
-    print("Inserted sample feedback rows. You can now call /feedback/positive.")
+    print("Inserted sample feedback rows. Score them with: python -m app.jobs.feedback_sentiment_backfill")
 
 
 if __name__ == "__main__":
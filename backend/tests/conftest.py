@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio.engine import AsyncEngine
 from sqlalchemy.pool import StaticPool
 
 from app.core.users_manager import get_jwt_strategy
-from app.db.db_config import get_db
+from app.db.db_config import get_db, get_db_sessionmaker
 from app.db.db_schema import (
     Admin,
     Base,
@@ -20,6 +20,9 @@ from app.db.db_schema import (
     VolunteerDoctor,
 )
 from app.main import app
+from app.shared.reference_data import reference_data_cache
+from app.shared.s3_storage_interface import S3StorageInterface
+from app.shared.storage_backends import InMemoryStorageBackend
 
 # Use an in-memory SQLite database for testing with aiosqlite
 # check_same_thread=False is needed for SQLite with async
@@ -60,11 +63,26 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_sessionmaker] = lambda: TestingSessionLocal
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
         yield c
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def fresh_reference_data() -> None:
+    """Every test gets its own database, so nothing cached by a previous test may be served."""
+    reference_data_cache.invalidate()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def in_memory_storage(monkeypatch: pytest.MonkeyPatch) -> InMemoryStorageBackend:
+    """Every test gets its own, empty object store (so that no test ever talks to S3/LocalStack)."""
+    backend = InMemoryStorageBackend(base_url="http://test/storage")
+    monkeypatch.setattr(S3StorageInterface, "backend", backend)
+    return backend
+
+
 @pytest.fixture(scope="session")
 def img_file_fixture() -> tuple[str, bytes, str]:
     """
@@ -1,3 +1,7 @@
+import io
+import struct
+import zlib
+
 import pytest
 from fastapi import status
 from httpx import AsyncClient
@@ -8,8 +12,13 @@ from app.db.db_schema import (
     AccountCreationRequestStatus,
     Admin,
     DoctorAccountCreationRequest,
+    DoctorSpecialisation,
+    MCRNumber,
+    Nutritionist,
     NutritionistAccountCreationRequest,
 )
+from app.shared.image_validation import MAX_IMAGE_BYTES
+from app.shared.storage_backends import InMemoryStorageBackend
 from tests.conftest import CreateDoctorCallable
 
 
@@ -178,3 +187,159 @@ async def test_process_request_unauthorized(
     assert response.status_code == status.HTTP_401_UNAUTHORIZED, (
         "Should not allow unauthorized access to process requests"
     )
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def _png_header_with_size(width: int, height: int) -> bytes:
+    """A PNG whose header claims the given dimensions, but which carries (almost) no pixel data"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", ihdr) + _png_chunk(b"IDAT", b"")
+
+
+DOCTOR_REQUEST_FORM = {
+    "email": "new_doctor@test.com",
+    "password": "password123",
+    "first_name": "New",
+    "last_name": "Doctor",
+    "mcr_no": "M12345A",
+    "specialisation": "Obstetrics",
+}
+
+
+@pytest.mark.asyncio
+async def test_submit_doctor_request_non_image_rejected(client: AsyncClient) -> None:
+    response = await client.post(
+        "/accounts/doctors",
+        data=DOCTOR_REQUEST_FORM,
+        files={"qualification_img": ("degree.png", b"definitely not an image", "image/png")},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_submit_doctor_request_decompression_bomb_rejected(client: AsyncClient) -> None:
+    response = await client.post(
+        "/accounts/doctors",
+        data=DOCTOR_REQUEST_FORM,
+        files={"qualification_img": ("degree.png", _png_header_with_size(10_000, 10_000), "image/png")},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert "too large" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_submit_doctor_request_oversized_body_rejected(client: AsyncClient) -> None:
+    oversized_img = _png_header_with_size(1, 1) + b"\x00" * (MAX_IMAGE_BYTES + 2 * 1024 * 1024)
+    response = await client.post(
+        "/accounts/doctors",
+        data=DOCTOR_REQUEST_FORM,
+        files={"qualification_img": ("degree.png", oversized_img, "image/png")},
+        headers={"Origin": "http://localhost:8081"},
+    )
+    assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+    # So that browsers let the client read the 413 (instead of it failing as a CORS error)
+    assert "access-control-allow-origin" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_accept_all_pending_requests(
+    authenticated_admin_client: tuple[AsyncClient, Admin],
+    db_session: AsyncSession,
+    in_memory_storage: InMemoryStorageBackend,
+    img_file_fixture: tuple[str, bytes, str],
+) -> None:
+    client, _ = authenticated_admin_client
+    _, img_bytes, content_type = img_file_fixture
+    in_memory_storage.put_object("staging-qualifications/legacy-1.png", io.BytesIO(img_bytes), content_type, "")
+
+    ok_req = NutritionistAccountCreationRequest(
+        first_name="Nutri",
+        last_name="Ok",
+        email="nutri.ok@test.com",
+        password="password",
+        qualification_img_key="staging-qualifications/legacy-1.png",
+    )
+    missing_img_req = NutritionistAccountCreationRequest(
+        first_name="Nutri",
+        last_name="Missing",
+        email="nutri.missing@test.com",
+        password="password",
+        qualification_img_key="staging-qualifications/does-not-exist.png",
+    )
+    db_session.add_all([ok_req, missing_img_req])
+    await db_session.commit()
+
+    response = await client.patch("/accounts/accept-all")
+    assert response.status_code == status.HTTP_200_OK
+    results = {result["request_id"]: result for result in response.json()}
+    assert results[ok_req.id]["approved"] is True
+    assert results[missing_img_req.id]["approved"] is False
+
+    await db_session.refresh(ok_req)
+    await db_session.refresh(missing_img_req)
+    assert ok_req.account_status == AccountCreationRequestStatus.APPROVED
+    assert missing_img_req.account_status == AccountCreationRequestStatus.PENDING
+
+    nutritionist = (
+        await db_session.execute(select(Nutritionist).where(Nutritionist.email == ok_req.email))
+    ).scalar_one()
+    assert nutritionist.qualification_img_key.startswith("qualifications/")
+    assert in_memory_storage.object_exists(nutritionist.qualification_img_key)
+
+
+@pytest.mark.asyncio
+async def test_accept_all_reports_conflicting_requests_instead_of_failing(
+    authenticated_admin_client: tuple[AsyncClient, Admin],
+    db_session: AsyncSession,
+    in_memory_storage: InMemoryStorageBackend,
+    img_file_fixture: tuple[str, bytes, str],
+    volunteer_doctor_factory: CreateDoctorCallable,
+) -> None:
+    client, admin = authenticated_admin_client
+    _, img_bytes, content_type = img_file_fixture
+    in_memory_storage.put_object("staging-qualifications/legacy-1.png", io.BytesIO(img_bytes), content_type, "")
+
+    specialisation = DoctorSpecialisation(specialisation="Obstetrics")
+    taken_mcr_no = MCRNumber(value="M12345A")
+    db_session.add_all([specialisation, taken_mcr_no, MCRNumber(value="M54321B")])
+    await db_session.flush()
+    await volunteer_doctor_factory(mcr_no_id=taken_mcr_no.id, specialisation_id=specialisation.id)
+
+    def doctor_req(email: str, mcr_no: str) -> DoctorAccountCreationRequest:
+        return DoctorAccountCreationRequest(
+            first_name="Doc",
+            last_name="Request",
+            email=email,
+            password="password",
+            qualification_img_key="staging-qualifications/legacy-1.png",
+            mcr_no=mcr_no,
+            specialisation="Obstetrics",
+        )
+
+    taken_email_req = doctor_req(admin.email, "M54321B")
+    taken_mcr_req = doctor_req("doc.taken-mcr@test.com", "M12345A")
+    ok_req = doctor_req("same@test.com", "M54321B")
+    # The doctor requests are processed first, so 'ok_req' claims the email
+    same_email_req = NutritionistAccountCreationRequest(
+        first_name="Nutri",
+        last_name="Request",
+        email="same@test.com",
+        password="password",
+        qualification_img_key="staging-qualifications/legacy-1.png",
+    )
+    db_session.add_all([taken_email_req, taken_mcr_req, ok_req, same_email_req])
+    await db_session.commit()
+
+    response = await client.patch("/accounts/accept-all")
+    assert response.status_code == status.HTTP_200_OK
+    results = {(result["user_role"], result["request_id"]): result for result in response.json()}
+    assert results["VOLUNTEER_DOCTOR", taken_email_req.id]["detail"] == "Email already in use"
+    assert results["VOLUNTEER_DOCTOR", taken_mcr_req.id]["detail"] == "MCR number already in use"
+    assert results["VOLUNTEER_DOCTOR", ok_req.id]["approved"] is True
+    assert results["NUTRITIONIST", same_email_req.id]["detail"] == "Email already in use"
+
+    await db_session.refresh(taken_mcr_req)
+    assert taken_mcr_req.account_status == AccountCreationRequestStatus.PENDING
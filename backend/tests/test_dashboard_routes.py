@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_schema import (
+    Appointment,
+    AppointmentStatus,
+    DoctorSpecialisation,
+    JournalEntry,
+    JournalScalarMetricLog,
+    KickDailyRollup,
+    Notification,
+    NotificationType,
+    PregnantWoman,
+    ScalarMetric,
+)
+from tests.conftest import CreateDoctorCallable
+
+
+@pytest.mark.asyncio
+async def test_dashboard_gathers_the_home_screen_in_one_response(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    volunteer_doctor_factory: CreateDoctorCallable,
+    db_session: AsyncSession,
+) -> None:
+    client, mother = authenticated_pregnant_woman_client
+    today = date.today()
+    specialisation = DoctorSpecialisation(specialisation="Obstetrics")
+    db_session.add(specialisation)
+    await db_session.flush()
+    volunteer_doctor = await volunteer_doctor_factory(specialisation_id=specialisation.id)
+
+    weight = ScalarMetric(label="Weight", unit_of_measurement="KG")
+    heart_rate = ScalarMetric(label="Heart Rate", unit_of_measurement="BPM")
+    water = ScalarMetric(label="Water", unit_of_measurement="Litres")
+    db_session.add_all([weight, heart_rate, water])
+    await db_session.flush()
+
+    entry = JournalEntry(author_id=mother.id, content="", logged_on=today, systolic=118, diastolic=76)
+    entry.journal_scalar_metric_logs = [
+        JournalScalarMetricLog(scalar_metric_id=weight.id, value=64.2),
+        JournalScalarMetricLog(scalar_metric_id=water.id, value=2.0),
+    ]
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        [
+            entry,
+            KickDailyRollup(mother_id=mother.id, day=today, kick_count=3),
+            KickDailyRollup(mother_id=mother.id, day=today - timedelta(days=1), kick_count=1),
+            Appointment(
+                volunteer_doctor_id=volunteer_doctor.id,
+                mother_id=mother.id,
+                start_time=now + timedelta(days=1),
+                status=AppointmentStatus.REJECTED,
+            ),
+            Appointment(
+                volunteer_doctor_id=volunteer_doctor.id,
+                mother_id=mother.id,
+                start_time=now + timedelta(days=2),
+                status=AppointmentStatus.ACCEPTED,
+            ),
+            Appointment(
+                volunteer_doctor_id=volunteer_doctor.id,
+                mother_id=mother.id,
+                start_time=now + timedelta(days=9),
+                status=AppointmentStatus.PENDING_ACCEPT_REJECT,
+            ),
+            *(
+                Notification(
+                    recipient_id=mother.id,
+                    content="Someone liked your thread",
+                    sent_at=now,
+                    is_seen=is_seen,
+                    type=NotificationType.THREAD_LIKE,
+                    data="{}",
+                )
+                for is_seen in (False, False, True)
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get(f"/dashboard/{today.isoformat()}")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["journal"] == {
+        "bp_systolic": 118,
+        "bp_diastolic": 76,
+        "sugar_level": 0,
+        "heart_rate": 0,
+        "weight": 64,
+        "kick_count": 3,
+    }
+    assert data["next_appointment"]["status"] == AppointmentStatus.ACCEPTED.value
+    assert data["next_appointment"]["doctor_fname"] == volunteer_doctor.first_name
+    assert data["unread_notification_count"] == 2
+
+    # The same journal preview as the journal's own endpoint
+    response = await client.get(f"/journals/{today.isoformat()}")
+    assert response.json() == data["journal"]
+
+    response = await client.get(f"/dashboard/{(today - timedelta(days=5)).isoformat()}")
+    assert response.json()["journal"]["bp_systolic"] is None
+    assert response.json()["journal"]["kick_count"] == 0
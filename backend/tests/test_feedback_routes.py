@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.db.db_config import get_async_db
+from app.db.db_schema import FeedbackDailyRollup, PregnantWoman, UserAppFeedback
+from app.features.feedback.feedback_rollups import rebuild_feedback_rollups, record_feedback
+from app.features.feedback.service import SentimentScoringService, content_hash
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_sentiment_scoring_service_batches_and_memoizes() -> None:
+    service = SentimentScoringService(max_workers=1, batch_window_seconds=0.05)
+    texts = ["I love this app, it is great!", "This is terrible and slow.", "I love this app, it is great!"]
+    try:
+        # Submitted concurrently, so they are scored as a single batch (and the duplicate only once)
+        scores = await asyncio.gather(*(service.analyze(text) for text in texts))
+        assert len(service._memo) == 2
+        assert content_hash(texts[0]) in service._memo
+
+        analyzer = SentimentIntensityAnalyzer()
+        assert scores == [analyzer.polarity_scores(text) for text in texts]
+
+        # Answered from the memo, without touching the pool
+        service.close()
+        assert await service.analyze(texts[1]) == scores[1]
+        assert service._pool is None
+    finally:
+        service.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def feedback_client(client: AsyncClient, db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+    async def override_get_async_db():
+        yield db_session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield client
+
+
+async def _add_feedback(db_session: AsyncSession, author: PregnantWoman, compound_scores: list[float]) -> None:
+    db_session.add_all(
+        UserAppFeedback(
+            author_id=author.id,
+            rating=3,
+            content=f"feedback {idx}",
+            positive_score=0.0,
+            neutral_score=1.0,
+            negative_score=0.0,
+            compound_score=compound,
+        )
+        for idx, compound in enumerate(compound_scores)
+    )
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_positive_feedback_keyset_pagination(
+    feedback_client: AsyncClient, db_session: AsyncSession, pregnant_woman: PregnantWoman
+) -> None:
+    await _add_feedback(db_session, pregnant_woman, [0.9, -0.5, 0.5, 0.5, 0.01, 0.7])
+
+    seen, cursor = [], None
+    while True:
+        params = {"threshold": 0.05, "limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = await feedback_client.get("/feedback/positive", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        seen.extend((item["compound_score"], item["id"]) for item in page["items"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+
+    assert seen == [(0.9, 1), (0.7, 6), (0.5, 4), (0.5, 3)]
+    response = await feedback_client.get("/feedback/positive", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_feedback_by_sentiment_as_text_streams_every_row(
+    feedback_client: AsyncClient, db_session: AsyncSession, pregnant_woman: PregnantWoman
+) -> None:
+    await _add_feedback(db_session, pregnant_woman, [0.9, -0.5, 0.5, -0.8])
+
+    response = await feedback_client.get("/feedback/sentiment", params={"limit": 1})
+    data = response.json()
+    assert data["counts"] == {"positive": 2, "negative": 2}
+    assert [item["id"] for item in data["positive"]] == [1]
+    assert [item["id"] for item in data["negative"]] == [4]
+    assert data["next_positive_cursor"] is not None
+
+    response = await feedback_client.get("/feedback/sentiment", params={"as_text": True})
+    assert response.status_code == status.HTTP_200_OK
+    lines = response.text.splitlines()
+    assert lines[:2] == ["threshold=0.05", "positive (2):"]
+    assert [line.split(" | ")[0].strip() for line in lines if line.startswith("  ")] == [
+        "id=1",
+        "id=3",
+        "id=4",
+        "id=2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_feedback_stats_read_the_daily_rollups(
+    feedback_client: AsyncClient, db_session: AsyncSession, pregnant_woman: PregnantWoman
+) -> None:
+    for rating, content in ((5, "I love this app, it is great!"), (4, "I love this app, it is great!"), (1, "Awful.")):
+        response = await feedback_client.post(
+            "/feedback/", json={"author_id": str(pregnant_woman.id), "rating": rating, "content": content}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    rollups = (await db_session.execute(select(FeedbackDailyRollup))).scalars().all()
+    assert sorted((r.rating, r.sentiment, r.count) for r in rollups) == [
+        (1, "negative", 1),
+        (4, "positive", 1),
+        (5, "positive", 1),
+    ]
+
+    response = await feedback_client.get("/feedback/stats")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total_count"] == 3
+    assert data["average_rating"] == round(10 / 3, 2)
+    assert data["rating_distribution"] == {"1": 1, "2": 0, "3": 0, "4": 1, "5": 1}
+    assert data["sentiment_distribution"] == {"positive": 2, "neutral": 0, "negative": 1}
+
+    tomorrow = (datetime.now(timezone.utc) + timedelta(days=1)).date()
+    response = await feedback_client.get("/feedback/stats", params={"start": tomorrow.isoformat()})
+    assert response.json()["total_count"] == 0
+
+    response = await feedback_client.get("/feedback/stats/trend", params={"bucket": "month"})
+    assert response.status_code == status.HTTP_200_OK
+    [point] = response.json()["points"]
+    assert point["period_start"] == datetime.now(timezone.utc).date().replace(day=1).isoformat()
+    assert point["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_feedback_rollups_are_bucketed_by_utc_date(
+    db_session: AsyncSession, pregnant_woman: PregnantWoman
+) -> None:
+    # 01:30 on Jan 2 in Singapore is still Jan 1 in UTC
+    feedback = UserAppFeedback(
+        author_id=pregnant_woman.id,
+        rating=5,
+        content="Great",
+        positive_score=1.0,
+        neutral_score=0.0,
+        negative_score=0.0,
+        compound_score=0.6,
+        created_at=datetime(2026, 1, 2, 1, 30, tzinfo=timezone(timedelta(hours=8))),
+    )
+    db_session.add(feedback)
+    await record_feedback(db_session, feedback)
+    # Stored as UTC, like the routes do (SQLite would keep the +08:00 wall time, unlike PostgreSQL)
+    feedback.created_at = feedback.created_at.astimezone(timezone.utc)
+    await db_session.commit()
+
+    async def rollups() -> list[tuple]:
+        rows = (await db_session.execute(select(FeedbackDailyRollup))).scalars().all()
+        return [(r.day.isoformat(), r.rating, r.sentiment, r.count) for r in rows]
+
+    recorded = await rollups()
+    assert recorded == [("2026-01-01", 5, "positive", 1)]
+
+    await db_session.run_sync(rebuild_feedback_rollups)
+    await db_session.commit()
+    assert await rollups() == recorded
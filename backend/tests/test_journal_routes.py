@@ -1,7 +1,398 @@
+import csv
+import io
+from datetime import date, datetime, timedelta, timezone
+
 import httpx
 import pytest
+import pytest_asyncio
+from fastapi import status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.users_manager import get_jwt_strategy
+from app.db.db_schema import (
+    Appointment,
+    AppointmentStatus,
+    BinaryMetric,
+    BinaryMetricCategory,
+    DoctorSpecialisation,
+    JournalBinaryMetricLog,
+    JournalEntry,
+    JournalScalarMetricLog,
+    KickTrackerDataPoint,
+    KickTrackerSession,
+    PregnantWoman,
+    ScalarMetric,
+)
+from tests.conftest import CreateDoctorCallable
+
+
+@pytest_asyncio.fixture(scope="function")
+async def journal_metrics(db_session: AsyncSession) -> tuple[list[BinaryMetric], list[ScalarMetric]]:
+    binary_metrics = [
+        BinaryMetric(label="Happy", category=BinaryMetricCategory.MOOD),
+        BinaryMetric(label="Sad", category=BinaryMetricCategory.MOOD),
+        BinaryMetric(label="Cramps", category=BinaryMetricCategory.SYMPTOMS),
+    ]
+    scalar_metrics = [
+        ScalarMetric(label="Weight", unit_of_measurement="KG"),
+        ScalarMetric(label="Heart Rate", unit_of_measurement="BPM"),
+    ]
+    db_session.add_all(binary_metrics + scalar_metrics)
+    await db_session.commit()
+    return binary_metrics, scalar_metrics
+
+
+@pytest.mark.asyncio
+async def test_metric_catalog_revalidates_with_etag(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+) -> None:
+    client, _ = authenticated_pregnant_woman_client
+
+    response = await client.get("/journals/metrics/catalog")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    data = response.json()
+    assert [metric["label"] for metric in data["binary_metrics"]] == ["Happy", "Sad", "Cramps"]
+    assert [metric["unit_of_measurement"] for metric in data["scalar_metrics"]] == ["KG", "BPM"]
+
+    response = await client.get("/journals/metrics/catalog", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_compact_journal_entries_match_full_entries(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+    db_session: AsyncSession,
+) -> None:
+    client, mother = authenticated_pregnant_woman_client
+    (happy, _, cramps), (weight, _) = journal_metrics
+    today = date.today()
+    for days_ago in range(3):
+        entry = JournalEntry(author_id=mother.id, content=f"Day {days_ago}", logged_on=today - timedelta(days=days_ago))
+        entry.journal_binary_metric_logs = [JournalBinaryMetricLog(binary_metric_id=happy.id)]
+        if days_ago == 1:
+            entry.journal_binary_metric_logs.append(JournalBinaryMetricLog(binary_metric_id=cramps.id))
+            entry.journal_scalar_metric_logs = [JournalScalarMetricLog(scalar_metric_id=weight.id, value=61.5)]
+        db_session.add(entry)
+    await db_session.commit()
+
+    response = await client.get(
+        "/journals/compact",
+        params={"start_date": (today - timedelta(days=1)).isoformat(), "end_date": today.isoformat()},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    compact = response.json()
+    catalog_response = await client.get("/journals/metrics/catalog")
+    assert compact["catalog_etag"] == catalog_response.headers["ETag"]
+    assert [entry["content"] for entry in compact["entries"]] == ["Day 0", "Day 1"]
+    assert compact["entries"][1]["binary_metric_ids"] == [happy.id, cramps.id]
+    assert compact["entries"][1]["scalar_metrics"] == [{"metric_id": weight.id, "value": 61.5}]
+
+    # The same selections as the expanded format
+    full = (await client.get("/journals")).json()["entries"]
+    assert len(full) == 3
+    for full_entry, compact_entry in zip(full, compact["entries"]):
+        selected = [
+            log["metric_id"]
+            for group in full_entry["binary_metrics"]
+            for log in group["binary_metric_logs"]
+            if log["is_selected"]
+        ]
+        assert sorted(selected) == compact_entry["binary_metric_ids"]
+        assert [(m["metric_id"], m["value"]) for m in full_entry["scalar_metrics"]] == [
+            (m["metric_id"], m["value"]) for m in compact_entry["scalar_metrics"]
+        ]
+
+
+@pytest.mark.asyncio
+async def test_journal_entries_paginated_by_date(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+    db_session: AsyncSession,
+) -> None:
+    client, mother = authenticated_pregnant_woman_client
+    today = date.today()
+    db_session.add_all(
+        JournalEntry(author_id=mother.id, content=f"Day {days_ago}", logged_on=today - timedelta(days=days_ago))
+        for days_ago in range(5)
+    )
+    await db_session.commit()
+
+    contents: list[str] = []
+    cursor = None
+    for expected_has_more in (True, True, False):
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = await client.get("/journals", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert page["has_more"] is expected_has_more
+        contents += [entry["content"] for entry in page["entries"]]
+        cursor = page["next_cursor"]
+    assert contents == [f"Day {days_ago}" for days_ago in range(5)]
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_upsert_journal_entry_applies_only_the_changes(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+) -> None:
+    client, mother = authenticated_pregnant_woman_client
+    (happy, sad, cramps), (weight, heart_rate) = journal_metrics
+    entry_date = date.today().isoformat()
+
+    response = await client.put(
+        f"/journals/{entry_date}",
+        json={
+            "content": "First",
+            "binary_metric_ids": [happy.id, cramps.id],
+            "scalar_metrics": [{"metric_id": weight.id, "value": 60.0}, {"metric_id": heart_rate.id, "value": 80}],
+            "blood_pressure": {"systolic": 120, "diastolic": 80},
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    # Only the logs are provided, so the content & blood pressure are kept
+    response = await client.put(
+        f"/journals/{entry_date}",
+        json={"binary_metric_ids": [sad.id, cramps.id], "scalar_metrics": [{"metric_id": weight.id, "value": 61.0}]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    entries = (await client.get("/journals/compact")).json()["entries"]
+    assert len(entries) == 1
+    assert entries[0]["content"] == "First"
+    assert entries[0]["blood_pressure"] == {"systolic": 120, "diastolic": 80}
+    assert entries[0]["binary_metric_ids"] == sorted([sad.id, cramps.id])
+    assert entries[0]["scalar_metrics"] == [{"metric_id": weight.id, "value": 61.0}]
+
+    response = await client.put(f"/journals/{entry_date}", json={"content": "Second", "binary_metric_ids": []})
+    entries = (await client.get("/journals/compact")).json()["entries"]
+    assert entries[0]["content"] == "Second"
+    assert entries[0]["binary_metric_ids"] == []
+    assert entries[0]["scalar_metrics"] == [{"metric_id": weight.id, "value": 61.0}]
+
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    response = await client.put(f"/journals/{tomorrow}", json={"content": "Too early"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_sync_journal_entries_applies_each_day_or_reports_why_not(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+) -> None:
+    client, _ = authenticated_pregnant_woman_client
+    (happy, sad, _), (weight, _) = journal_metrics
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    two_days_ago = today - timedelta(days=2)
+
+    await client.put(f"/journals/{today.isoformat()}", json={"content": "Online", "binary_metric_ids": [happy.id]})
+    entry = (await client.get("/journals")).json()["entries"][0]
+    assert entry["revision"] == 1
+
+    response = await client.post(
+        "/journals/sync",
+        json={
+            "entries": [
+                {"logged_on": today.isoformat(), "base_revision": 1, "binary_metric_ids": [sad.id]},
+                {
+                    "logged_on": yesterday.isoformat(),
+                    "content": "Offline",
+                    "scalar_metrics": [{"metric_id": weight.id, "value": 60.5}],
+                },
+                {"logged_on": today.isoformat(), "base_revision": 1, "content": "Again"},
+                {"logged_on": two_days_ago.isoformat(), "base_revision": 3, "content": "Deleted meanwhile"},
+                {"logged_on": (today + timedelta(days=1)).isoformat(), "content": "Tomorrow"},
+                {"logged_on": (today - timedelta(days=3)).isoformat(), "binary_metric_ids": [999]},
+            ]
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["status"], r["revision"]) for r in results] == [
+        ("applied", 2),
+        ("applied", 1),
+        ("invalid", None),
+        ("conflict", None),
+        ("invalid", None),
+        ("invalid", None),
+    ]
+
+    entries = (await client.get("/journals/compact")).json()["entries"]
+    assert [(e["logged_on"], e["content"], e["revision"]) for e in entries] == [
+        (today.isoformat(), "Online", 2),
+        (yesterday.isoformat(), "Offline", 1),
+    ]
+    assert entries[0]["binary_metric_ids"] == [sad.id]
+    assert entries[1]["scalar_metrics"] == [{"metric_id": weight.id, "value": 60.5}]
+
+    # An edit of the template (revision 0) is based on the day having no entry yet
+    template = (await client.get("/journals/metrics/template")).json()
+    three_days_ago = (today - timedelta(days=3)).isoformat()
+    response = await client.post(
+        "/journals/sync",
+        json={"entries": [{"logged_on": three_days_ago, "base_revision": template["revision"], "content": "New"}]},
+    )
+    assert [(r["status"], r["revision"]) for r in response.json()["results"]] == [("applied", 1)]
+
+    # Replaying an edit made on the old revision is a conflict (and reports the current one)
+    response = await client.post(
+        "/journals/sync", json={"entries": [{"logged_on": today.isoformat(), "base_revision": 1, "content": "Stale"}]}
+    )
+    assert response.json()["results"] == [
+        {
+            "logged_on": today.isoformat(),
+            "status": "conflict",
+            "revision": 2,
+            "detail": "The entry was changed since this edit was made",
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metric_series_aggregates_per_bucket_and_revalidates(
+    authenticated_pregnant_woman_client: tuple[httpx.AsyncClient, PregnantWoman],
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+) -> None:
+    client, _ = authenticated_pregnant_woman_client
+    _, (weight, _) = journal_metrics
+    monday = date.today() - timedelta(days=date.today().weekday() + 14)
+    weights = {monday: 60.0, monday + timedelta(days=2): 62.0, monday + timedelta(days=8): 63.0}
+    for day, value in weights.items():
+        await client.put(
+            f"/journals/{day.isoformat()}",
+            json={
+                "scalar_metrics": [{"metric_id": weight.id, "value": value}],
+                "blood_pressure": {"systolic": 110, "diastolic": 70},
+            },
+        )
+
+    params = {"metric_id": weight.id, "bucket": "week", "start_date": monday.isoformat()}
+    response = await client.get("/journals/metrics/series", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    series = response.json()
+    assert (series["label"], series["unit_of_measurement"], series["downsampled"]) == ("Weight", "KG", False)
+    assert series["points"] == [
+        {"period_start": monday.isoformat(), "min": 60.0, "max": 62.0, "avg": 61.0, "last": 62.0, "count": 2},
+        {
+            "period_start": (monday + timedelta(days=7)).isoformat(),
+            "min": 63.0,
+            "max": 63.0,
+            "avg": 63.0,
+            "last": 63.0,
+            "count": 1,
+        },
+    ]
+
+    etag = response.headers["ETag"]
+    response = await client.get("/journals/metrics/series", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Any write to the range's entries invalidates it
+    await client.put(
+        f"/journals/{monday.isoformat()}", json={"scalar_metrics": [{"metric_id": weight.id, "value": 59.0}]}
+    )
+    response = await client.get("/journals/metrics/series", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["points"][0]["min"] == 59.0
+
+    # The daily points, downsampled to 2 (the last one being the third day on its own)
+    response = await client.get(
+        "/journals/metrics/series", params={"blood_pressure": "systolic", "bucket": "day", "max_points": 2}
+    )
+    series = response.json()
+    assert series["downsampled"] is True
+    assert [(p["period_start"], p["count"], p["avg"]) for p in series["points"]] == [
+        (monday.isoformat(), 2, 110.0),
+        ((monday + timedelta(days=8)).isoformat(), 1, 110.0),
+    ]
+
+    response = await client.get("/journals/metrics/series", params={"bucket": "day"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = await client.get("/journals/metrics/series", params={"metric_id": 999})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_doctor_exports_mothers_journal_as_csv(
+    client: httpx.AsyncClient,
+    journal_metrics: tuple[list[BinaryMetric], list[ScalarMetric]],
+    pregnant_woman: PregnantWoman,
+    volunteer_doctor_factory: CreateDoctorCallable,
+    db_session: AsyncSession,
+) -> None:
+    (happy, _, cramps), (weight, _) = journal_metrics
+    specialisation = DoctorSpecialisation(specialisation="Obstetrics")
+    db_session.add(specialisation)
+    await db_session.flush()
+    doctor = await volunteer_doctor_factory(specialisation_id=specialisation.id)
+    client.headers["Authorization"] = f"Bearer {await get_jwt_strategy().write_token(doctor)}"
+
+    day = date(2025, 11, 2)
+    entry = JournalEntry(author_id=pregnant_woman.id, content='Tired, "a bit" dizzy', logged_on=day, systolic=118)
+    entry.journal_binary_metric_logs = [
+        JournalBinaryMetricLog(binary_metric_id=cramps.id),
+        JournalBinaryMetricLog(binary_metric_id=happy.id),
+    ]
+    entry.journal_scalar_metric_logs = [JournalScalarMetricLog(scalar_metric_id=weight.id, value=64.2)]
+    session = KickTrackerSession(mother_id=pregnant_woman.id, started_at=datetime(2025, 11, 2, 9, tzinfo=timezone.utc))
+    session.kicks = [
+        KickTrackerDataPoint(kick_at=datetime(2025, 11, 2, 9, 14, 3, tzinfo=timezone.utc)),
+        # 21:30 on Nov 2 in New York (UTC-5), although it's already Nov 3 in UTC
+        KickTrackerDataPoint(kick_at=datetime(2025, 11, 3, 2, 30, tzinfo=timezone.utc)),
+    ]
+    pregnant_woman.timezone = "America/New_York"
+    db_session.add_all(
+        [
+            pregnant_woman,
+            entry,
+            session,
+            JournalEntry(author_id=pregnant_woman.id, content="", logged_on=day + timedelta(days=1)),
+            JournalEntry(
+                author_id=pregnant_woman.id, content='=HYPERLINK("http://x")', logged_on=day + timedelta(days=2)
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    # Not one of the doctor's (accepted) patients
+    response = await client.get(f"/journals/mothers/{pregnant_woman.id}/export")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    db_session.add(
+        Appointment(
+            volunteer_doctor_id=doctor.id,
+            mother_id=pregnant_woman.id,
+            start_time=datetime.now(timezone.utc),
+            status=AppointmentStatus.ACCEPTED,
+        )
+    )
+    await db_session.commit()
 
-from app.db.db_schema import PregnantWoman
+    response = await client.get(f"/journals/mothers/{pregnant_woman.id}/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows == [
+        ["record_type", "date", "recorded_at", "category", "name", "value", "unit"],
+        ["note", "2025-11-02", "", "", "", 'Tired, "a bit" dizzy', ""],
+        ["blood_pressure", "2025-11-02", "", "", "systolic", "118", "mmHg"],
+        ["note", "2025-11-04", "", "", "", '\'=HYPERLINK("http://x")', ""],  # Not run as a formula by spreadsheets
+        ["scalar_metric", "2025-11-02", "", "", "Weight", "64.2", "KG"],
+        ["binary_metric", "2025-11-02", "", "MOOD", "Happy", "1", ""],
+        ["binary_metric", "2025-11-02", "", "SYMPTOMS", "Cramps", "1", ""],
+        ["kick", "2025-11-02", rows[-2][2], f"session {session.id}", "kick", "1", ""],
+        ["kick", "2025-11-02", rows[-1][2], f"session {session.id}", "kick", "1", ""],
+    ]
+    assert [datetime.fromisoformat(row[2]).replace(tzinfo=timezone.utc) for row in rows[-2:]] == [
+        datetime(2025, 11, 2, 9, 14, 3, tzinfo=timezone.utc),
+        datetime(2025, 11, 3, 2, 30, tzinfo=timezone.utc),
+    ]
 
 
 @pytest.mark.asyncio
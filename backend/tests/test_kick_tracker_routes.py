@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+from datetime import date
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_schema import KickDailyRollup, KickTrackerSession, PregnantWoman
+from app.features.kick_tracker.kick_tracker_rollups import rebuild_kick_counts
+from tests.conftest import engine
 
 
 @pytest.mark.asyncio
@@ -56,3 +64,79 @@ async def test_record_kick_and_get_counts(authenticated_pregnant_woman_client: t
         {"date": "2026-01-02", "kick_count": 2},
         {"date": "2026-01-03", "kick_count": 0},
     ]
+
+
+@pytest.mark.asyncio
+async def test_record_kick_maintains_counters_without_counting(
+    authenticated_pregnant_woman_client: tuple[AsyncClient, PregnantWoman],
+    db_session: AsyncSession,
+):
+    client, mother = authenticated_pregnant_woman_client
+    kick_statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "kick" in statement:
+            kick_statements.append(statement)
+
+    # No session was started, so the first kick starts one
+    kick = await client.post("/kick-tracker/kicks", json={"kick_at": "2026-01-01T10:00:00Z"})
+    assert kick.json()["session_kick_count"] == 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        for minute in range(1, 6):
+            kick = await client.post("/kick-tracker/kicks", json={"kick_at": f"2026-01-01T10:0{minute}:00Z"})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    assert kick.json()["session_kick_count"] == 6
+    assert kick.json()["today_kick_count"] == 6
+    assert len(kick_statements) == 5 * 3  # The session's increment, the kick's insert & the day's increment
+    assert not any("count(" in statement.lower() for statement in kick_statements)
+
+    # Rebuilding from the kicks themselves (as after seeding) gives the same counters
+    await db_session.run_sync(rebuild_kick_counts)
+    rollup = (await db_session.execute(select(KickDailyRollup))).scalar_one()
+    assert (rollup.mother_id, rollup.day, rollup.kick_count) == (mother.id, date(2026, 1, 1), 6)
+    session_count = (await db_session.execute(select(KickTrackerSession.kick_count))).scalar_one()
+    assert session_count == 6
+
+
+@pytest.mark.asyncio
+async def test_record_kicks_in_batch_counted_on_mothers_local_days(
+    authenticated_pregnant_woman_client: tuple[AsyncClient, PregnantWoman],
+):
+    client, mother = authenticated_pregnant_woman_client
+
+    # The default timezone (Asia/Singapore, UTC+8): 23:30 on Jan 1, then 00:30 & 01:00 on Jan 2
+    kicks = ["2026-01-01T15:30:00Z", "2026-01-01T16:30:00Z", "2026-01-02T01:00:00+08:00"]
+    batch = await client.post("/kick-tracker/kicks/batch", json={"kick_at": kicks})
+    assert batch.status_code == 200, batch.text
+    assert batch.json()["recorded_count"] == 3
+    assert batch.json()["session_kick_count"] == 3
+    assert batch.json()["days"] == [
+        {"date": "2026-01-01", "kick_count": 1},
+        {"date": "2026-01-02", "kick_count": 2},
+    ]
+
+    kick = await client.post("/kick-tracker/kicks", json={"kick_at": "2026-01-02T02:00:00Z"})
+    assert kick.json()["session_id"] == batch.json()["session_id"]
+    assert kick.json()["session_kick_count"] == 4
+    assert kick.json()["today_kick_count"] == 3
+
+    # In New York (UTC-5), all of those moments are still Jan 1, and so are the past kicks once she moves there
+    profile = {"first_name": mother.first_name, "last_name": mother.last_name, "email": mother.email}
+    response = await client.put("/accounts/pregnant-woman", json={**profile, "timezone": "Mars/Olympus_Mons"})
+    assert response.status_code == 400
+    response = await client.put("/accounts/pregnant-woman", json={**profile, "timezone": "America/New_York"})
+    assert response.status_code == 200, response.text
+    kick = await client.post("/kick-tracker/kicks", json={"kick_at": "2026-01-02T02:00:00Z"})
+    assert kick.json()["today_kick_count"] == 5
+
+    counts = await client.get("/kick-tracker/counts", params={"start_date": "2026-01-01", "end_date": "2026-01-02"})
+    assert counts.json()["days"] == [
+        {"date": "2026-01-01", "kick_count": 5},
+        {"date": "2026-01-02", "kick_count": 0},
+    ]
+
+    response = await client.post("/kick-tracker/kicks/batch", json={"kick_at": []})
+    assert response.status_code == 422
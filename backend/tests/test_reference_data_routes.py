@@ -0,0 +1,71 @@
+import httpx
+import pytest
+from fastapi import status
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_schema import Admin, DoctorSpecialisation, ReferenceDataVersion
+from app.shared.reference_data import reference_data_cache
+
+
+@pytest.mark.asyncio
+async def test_specialisations_served_from_cache_until_admin_changes_them(
+    authenticated_admin_client: tuple[httpx.AsyncClient, Admin],
+    db_session: AsyncSession,
+) -> None:
+    client, _ = authenticated_admin_client
+    db_session.add(DoctorSpecialisation(specialisation="Obstetrics"))
+    await db_session.commit()
+
+    response = await client.get("/accounts/doctors/specialisations")
+    assert response.status_code == status.HTTP_200_OK
+    assert [spec["specialisation"] for spec in response.json()] == ["Obstetrics"]
+
+    # Changed behind the cache's back (no version bump), so it isn't noticed
+    db_session.add(DoctorSpecialisation(specialisation="Cardiology"))
+    await db_session.commit()
+    response = await client.get("/accounts/doctors/specialisations")
+    assert [spec["specialisation"] for spec in response.json()] == ["Obstetrics"]
+
+    # An admin change bumps the version, and this worker drops its copy on commit
+    response = await client.post("/admin/specialisations", json={"specialisation": "Paediatrics"})
+    assert response.status_code == status.HTTP_201_CREATED
+    response = await client.get("/admin/specialisations")
+    assert [spec["specialisation"] for spec in response.json()] == ["Cardiology", "Obstetrics", "Paediatrics"]
+
+
+@pytest.mark.asyncio
+async def test_version_bumped_by_another_worker_reloads_after_check_interval(
+    authenticated_admin_client: tuple[httpx.AsyncClient, Admin],
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client, _ = authenticated_admin_client
+    now = [1000.0]
+    monkeypatch.setattr(reference_data_cache, "_clock", lambda: now[0])
+
+    db_session.add_all([ReferenceDataVersion(id=1, version=0), DoctorSpecialisation(specialisation="Obstetrics")])
+    await db_session.commit()
+    assert len((await client.get("/accounts/doctors/specialisations")).json()) == 1
+
+    # What another worker's admin change looks like from here: new rows & a new version, but no local invalidation
+    db_session.add(DoctorSpecialisation(specialisation="Cardiology"))
+    await db_session.execute(update(ReferenceDataVersion).values(version=ReferenceDataVersion.version + 1))
+    await db_session.commit()
+    assert len((await client.get("/accounts/doctors/specialisations")).json()) == 1
+
+    now[0] += reference_data_cache.check_interval_seconds
+    assert len((await client.get("/accounts/doctors/specialisations")).json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_version_table_reads_as_version_zero(db_session: AsyncSession) -> None:
+    # As before "alembic upgrade head" on a first deploy
+    await db_session.execute(text("DROP TABLE reference_data_version"))
+    db_session.add(DoctorSpecialisation(specialisation="Obstetrics"))
+    await db_session.flush()
+
+    ref = await reference_data_cache.get(db_session)
+    assert ref.version == 0
+    assert [spec.specialisation for spec in ref.doctor_specialisations] == ["Obstetrics"]
+    await db_session.commit()  # The caller's transaction is still usable
@@ -0,0 +1,220 @@
+import shutil
+from datetime import date
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_schema import JournalEntry, JournalScalarMetricLog, PregnantWoman, ScalarMetric
+from app.features.risk import risk_service
+from app.features.risk.risk_inference import build_raw_features, predict_levels, score_readings
+from app.features.risk.risk_metrics import RiskMetrics
+from app.features.risk.risk_registry import RiskModelRegistry
+from app.features.risk.risk_router import MODEL_PATH, SCALER_PATH
+from app.ml.risk_model_manifest import register_version
+from app.ml.train_risk_model import derive_labels
+
+NORMAL_READING = {"age": 28, "systolic_bp": 118, "diastolic_bp": 76, "bs": 5.6, "heart_rate": 78}
+
+
+@pytest.mark.asyncio
+async def test_predict_risk_matches_sklearn(client: AsyncClient) -> None:
+    response = await client.post("/risk/predict", json=NORMAL_READING)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+
+    scaler, model = joblib.load(SCALER_PATH), joblib.load(MODEL_PATH)
+    features = pd.DataFrame([{"Age": 28.0, "SystolicBP": 118.0, "DiastolicBP": 76.0, "BS": 5.6, "HeartRate": 78.0}])[
+        list(scaler.feature_names_in_)
+    ]
+    expected = model.predict_proba(scaler.transform(features))[0]
+
+    assert data["rule_override"] is None
+    assert [data["model_probabilities"][level] for level in ("low", "mid", "high")] == expected.tolist()
+    assert data["risk_level"] == ("low", "mid", "high")[int(np.argmax(expected))]
+    assert data["mean_bp"] == 97.0
+
+
+@pytest.mark.asyncio
+async def test_predict_risk_rule_override(client: AsyncClient) -> None:
+    response = await client.post("/risk/predict", json=NORMAL_READING | {"systolic_bp": 170})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["rule_override"] == "high"
+    assert data["risk_level"] == "high"
+    assert data["probabilities"] == {"low": 0.0, "mid": 0.0, "high": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_predict_risk_batch_matches_single_predictions(client: AsyncClient) -> None:
+    readings = [
+        NORMAL_READING,
+        NORMAL_READING | {"systolic_bp": 170},  # High-risk override
+        NORMAL_READING | {"heart_rate": 110},  # Mid-risk override
+        {"age": 35, "blood_pressure": "150/95", "bs": 12.0, "heart_rate": 88},
+        NORMAL_READING | {"bs": 3.5},  # High-risk override
+    ]
+
+    response = await client.post("/risk/predict/batch", json={"readings": readings})
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert len(results) == len(readings)
+
+    # Probabilities may differ in the last bit (a matrix product vs a vector product), nothing else may
+    prob_keys = ("probabilities", "model_probabilities", "risk_probability")
+    for reading, result in zip(readings, results):
+        expected = (await client.post("/risk/predict", json=reading)).json()
+        assert {k: v for k, v in result.items() if k not in prob_keys} == {
+            k: v for k, v in expected.items() if k not in prob_keys
+        }
+        for key in prob_keys:
+            assert result[key] == pytest.approx(expected[key], rel=1e-12)
+
+
+@pytest.mark.asyncio
+async def test_risk_trajectory_scores_complete_journal_days(
+    authenticated_pregnant_woman_client: tuple[AsyncClient, PregnantWoman],
+    db_session: AsyncSession,
+) -> None:
+    client, mother = authenticated_pregnant_woman_client
+    mother.date_of_birth = date(1996, 5, 1)
+
+    sugar = ScalarMetric(label="Sugar Level", unit_of_measurement="mmol/L")
+    heart_rate = ScalarMetric(label="Heart Rate", unit_of_measurement="BPM")
+    db_session.add_all([sugar, heart_rate])
+    await db_session.flush()
+
+    def entry(day: int, systolic: int, diastolic: int, logs: dict[ScalarMetric, float]) -> JournalEntry:
+        return JournalEntry(
+            author_id=mother.id,
+            content="",
+            logged_on=date(2025, 3, day),
+            systolic=systolic,
+            diastolic=diastolic,
+            journal_scalar_metric_logs=[
+                JournalScalarMetricLog(scalar_metric_id=metric.id, value=value) for metric, value in logs.items()
+            ],
+        )
+
+    first_day = entry(1, 118, 76, {sugar: 5.6, heart_rate: 78})
+    db_session.add_all(
+        [
+            entry(3, 170, 95, {sugar: 5.0, heart_rate: 80}),
+            first_day,
+            entry(2, 120, 80, {sugar: 5.0}),  # No heart rate logged
+        ]
+    )
+    await db_session.commit()
+
+    risk_service._trajectory_cache.clear()
+    scored_row_counts: list[int] = []
+
+    def counting_score_readings(engine, raw_features):
+        scored_row_counts.append(len(raw_features))
+        return score_readings(engine, raw_features)
+
+    params = {"start": "2025-03-01", "end": "2025-03-31"}
+    with patch.object(risk_service, "score_readings", counting_score_readings):
+        response = await client.get("/risk/trajectory", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [point["logged_on"] for point in data["points"]] == ["2025-03-01", "2025-03-03"]
+    assert data["skipped_dates"] == ["2025-03-02"]
+    assert data["points"][1]["risk_level"] == "high"
+    assert data["points"][1]["rule_override"] == "high"
+
+    expected = (await client.post("/risk/predict", json=NORMAL_READING)).json()
+    assert data["points"][0]["risk_level"] == expected["risk_level"]
+    assert data["points"][0]["risk_probability"] == pytest.approx(expected["risk_probability"], rel=1e-12)
+
+    # Served from the cache the second time around
+    with patch.object(risk_service, "score_readings", counting_score_readings):
+        assert (await client.get("/risk/trajectory", params=params)).json() == data
+    assert scored_row_counts == [2]
+
+    # Only the edited and the new days are scored again
+    first_day.systolic = 125
+    db_session.add(entry(4, 118, 76, {sugar: 5.6, heart_rate: 78}))
+    await db_session.commit()
+    with patch.object(risk_service, "score_readings", counting_score_readings):
+        response = await client.get("/risk/trajectory", params=params)
+    assert scored_row_counts == [2, 2]
+    assert [point["systolic_bp"] for point in response.json()["points"]] == [125, 170, 118]
+
+
+def test_risk_model_registry_hot_swaps_versions(tmp_path) -> None:
+    for version in ("v1", "v2"):
+        (tmp_path / version).mkdir()
+        for path in (MODEL_PATH, SCALER_PATH):
+            shutil.copy(path, tmp_path / version / path.name)
+
+    register_version(tmp_path, "v1", {}, role="active")
+    registry = RiskModelRegistry(tmp_path, reload_interval_seconds=0)
+    assert registry.refresh().active.version == "v1"
+    assert registry.refresh().shadow is None
+
+    register_version(tmp_path, "v2", {}, role="shadow")
+    snapshot = registry.refresh(force=True)
+    assert (snapshot.active.version, snapshot.shadow.version) == ("v1", "v2")
+
+    raw_features = build_raw_features(*np.array([[28.0, 118.0, 76.0, 5.6, 78.0], [28.0, 170.0, 76.0, 5.6, 78.0]]).T)
+    _, _, active_levels = predict_levels(snapshot.active.engine, raw_features)
+    _, _, shadow_levels = predict_levels(snapshot.shadow.engine, raw_features)
+    registry.record_shadow_levels(snapshot, active_levels, shadow_levels)
+    assert registry.shadow_stats.as_dict()["agreement_rate"] == 1.0
+
+    register_version(tmp_path, "v2", {}, role="active")
+    snapshot = registry.refresh(force=True)
+    assert (snapshot.active.version, snapshot.shadow) == ("v2", None)
+    assert registry.shadow_stats is None
+
+    # A broken version is never swapped in
+    (tmp_path / "v3").mkdir()
+    register_version(tmp_path, "v3", {}, role="active")
+    assert registry.refresh(force=True).active.version == "v2"
+    assert registry.load_error is not None
+
+
+@pytest.mark.asyncio
+async def test_risk_models_endpoint(client: AsyncClient) -> None:
+    response = await client.get("/risk/models")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["active_version"] is not None
+
+
+def test_training_labels_use_runtime_override_rules() -> None:
+    data = pd.DataFrame(
+        {
+            "SystolicBP": [118, 170, 145, 118],
+            "DiastolicBP": [76, 76, 76, 76],
+            "BS": [5.6, 5.6, 5.6, 5.6],
+            "HeartRate": [78, 78, 78, 78],
+            "RiskLevel": ["low risk", "low risk", "high risk", "mid risk"],
+        }
+    )
+    # Overrides win over the CSV's label, which is only the fallback
+    assert derive_labels(data).tolist() == [0, 2, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_risk_stats_aggregates_predictions(client: AsyncClient) -> None:
+    metrics = RiskMetrics()
+    with patch("app.features.risk.risk_router._METRICS", metrics):
+        await client.post("/risk/predict", json=NORMAL_READING)
+        await client.post("/risk/predict/batch", json={"readings": [NORMAL_READING, NORMAL_READING | {"bs": 3.0}]})
+        response = await client.get("/risk/stats", params={"window_minutes": 5})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["requests"] == {"predict": 1, "predict_batch": 1}
+    assert data["readings"] == 3
+    assert data["override_rate"] == pytest.approx(1 / 3)
+    assert data["class_distribution"]["high"] == pytest.approx(1 / 3)
+    assert sum(bucket["count"] for bucket in data["latency_ms"]["predict_batch"]["buckets"]) == 1
+    assert data["feature_drift"]["SystolicBP"]["live_mean"] == 118.0
+    assert data["feature_drift"]["SystolicBP"]["drifting"] is False
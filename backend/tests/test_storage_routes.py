@@ -0,0 +1,66 @@
+import io
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.shared.s3_storage_interface import S3StorageInterface
+from app.shared.storage_backends import InMemoryStorageBackend
+
+
+def _put_test_img(img_file_fixture: tuple[str, bytes, str]) -> str:
+    _, img_bytes, content_type = img_file_fixture
+    obj_key = S3StorageInterface._upload_file_stream(
+        prefix=S3StorageInterface.PRODUCT_PREFIX,
+        file_obj=io.BytesIO(img_bytes),
+        content_type=content_type,
+    )
+    assert obj_key is not None
+    return obj_key
+
+
+@pytest.mark.asyncio
+async def test_get_stored_object_with_signed_url(client: AsyncClient, img_file_fixture: tuple[str, bytes, str]) -> None:
+    obj_key = _put_test_img(img_file_fixture)
+    url = S3StorageInterface.get_presigned_url(obj_key, expires_in_seconds=60)
+    assert url is not None
+
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert response.content == img_file_fixture[1]
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_get_stored_object_tampered_signature_rejected(
+    client: AsyncClient, img_file_fixture: tuple[str, bytes, str]
+) -> None:
+    obj_key = _put_test_img(img_file_fixture)
+    response = await client.get(f"/storage/{obj_key}", params={"expires": 9999999999, "signature": "0" * 64})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_stored_once(
+    in_memory_storage: InMemoryStorageBackend, img_file_fixture: tuple[str, bytes, str]
+) -> None:
+    first_key = _put_test_img(img_file_fixture)
+    second_key = _put_test_img(img_file_fixture)
+    assert first_key == second_key
+    assert list(in_memory_storage.objects) == [first_key]
+
+
+@pytest.mark.asyncio
+async def test_identical_upload_refreshes_the_existing_object(
+    in_memory_storage: InMemoryStorageBackend, img_file_fixture: tuple[str, bytes, str]
+) -> None:
+    obj_key = _put_test_img(img_file_fixture)
+    # i.e. an orphan that the GC job would collect
+    two_days_ago = datetime.now(timezone.utc) - timedelta(days=2)
+    in_memory_storage.objects[obj_key] = replace(in_memory_storage.objects[obj_key], last_modified=two_days_ago)
+
+    assert _put_test_img(img_file_fixture) == obj_key
+    assert in_memory_storage.objects[obj_key].last_modified > two_days_ago
+    assert in_memory_storage.objects[obj_key].content == img_file_fixture[1]